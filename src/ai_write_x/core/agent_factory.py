@@ -1,10 +1,291 @@
-from typing import Dict, Type, Optional, Any
+import hashlib
+import itertools
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Type, Optional, Any, Tuple
+
+import litellm
 from crewai import Agent, LLM
+from crewai.llm import suppress_warnings
+from crewai.utilities.exceptions.context_window_exceeding_exception import (
+    LLMContextLengthExceededException,
+)
 
 from src.ai_write_x.core.base_framework import AgentConfig
 from src.ai_write_x.config.config import Config
 from src.ai_write_x.core.tool_registry import GlobalToolRegistry
 from src.ai_write_x.utils import log
+from src.ai_write_x.utils.llm_cache import LLMCacheMiss, LLMResponseCache, get_cache_mode
+
+
+# 大模型流式输出配置
+LLM_STREAM_CONFIGS = {
+    "enabled": True,  # Web 界面生成时把大模型输出逐段推送到前端
+    "flush_interval": 0.1,  # 片段合并后发送的最长间隔（秒）
+    "flush_chars": 200,  # 累积到多少字符立即发送
+}
+
+# 当前执行的工作流名称，由 ContentGenerationEngine 在执行期间设置，只有工作流中的调用才流式输出
+stream_stage: ContextVar[Optional[str]] = ContextVar("stream_stage", default=None)
+
+
+class _TokenStream:
+    """把大模型的输出片段按时间和长度合并后发往日志队列，避免每个 token 一条消息"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.stream_id = f"{os.getpid()}-{next(self._ids)}"
+        self._parts: list = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._size += len(text)
+        if (
+            self._size >= LLM_STREAM_CONFIGS["flush_chars"]
+            or time.monotonic() - self._last_flush >= LLM_STREAM_CONFIGS["flush_interval"]
+        ):
+            self.flush()
+
+    def flush(self, end: bool = False):
+        if self._parts or end:
+            log.print_token("".join(self._parts), self.stream_id, self.stage, end)
+            self._parts, self._size = [], 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush(end=True)
+
+
+class CachedLLM(LLM):
+    """
+    带响应缓存和流式输出的 LLM：
+    - 缓存模式见 llm_cache.LLM_CACHE_CONFIGS（默认关闭），只缓存纯文本调用
+    - Web 界面交互生成、且有日志连接接收时，纯文本调用改为流式请求，输出片段以 token 消息实时发送；
+      批量、排队任务和命令行运行时与 LLM.call 完全相同
+    - 带 function calling 工具的调用直接透传
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        mode = get_cache_mode()
+        if mode == "off" or tools or available_functions:
+            return self._call(messages, tools, callbacks, available_functions)
+
+        cache = LLMResponseCache.get_instance()
+        key = cache.make_key(
+            self.model,
+            messages,
+            self.temperature,
+            self.max_tokens or self.max_completion_tokens,
+            self.stop,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            stage = self._stream_stage(tools, available_functions)
+            if stage is not None:
+                stream = _TokenStream(stage)
+                stream.write(cached)
+                stream.close()
+            return cached
+        if mode == "read-only":
+            raise LLMCacheMiss(f"LLM 响应缓存未命中（回放模式）：{self.model} {key[:12]}")
+
+        response = self._call(messages, tools, callbacks, available_functions)
+        if isinstance(response, str) and response:
+            cache.put(key, self.model, response)
+        return response
+
+    @staticmethod
+    def _stream_stage(tools, available_functions) -> Optional[str]:
+        """需要流式输出时返回当前工作流名称，否则返回 None"""
+        if tools or available_functions or not LLM_STREAM_CONFIGS["enabled"]:
+            return None
+        if not log.token_stream_enabled():
+            return None
+        return stream_stage.get()
+
+    def _call(self, messages, tools, callbacks, available_functions):
+        stage = self._stream_stage(tools, available_functions)
+        if stage is None:
+            return super().call(messages, tools, callbacks, available_functions)
+        return self._stream_call(messages, callbacks, stage)
+
+    def _stream_call(self, messages, callbacks, stage: str) -> str:
+        """
+        流式调用：除 stream 外与 LLM.call 的纯文本路径一致（参数校验、o1 的 system 消息转换、
+        消息格式、请求参数、用量回调、失败时的日志），片段实时发往日志队列，返回完整文本
+        """
+        self._validate_call_params()
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        # o1 模型不支持 system 消息，与 LLM.call 相同改为 assistant
+        if "o1" in self.model.lower():
+            for message in messages:
+                if message.get("role") == "system":
+                    message["role"] = "assistant"
+
+        with suppress_warnings():
+            if callbacks:
+                self.set_callbacks(callbacks)
+            try:
+                return self._stream_completion(self._stream_params(messages), callbacks, stage)
+            except Exception as e:
+                # 超出上下文长度由 CrewAI 处理（总结后重试），不记录为失败
+                if not LLMContextLengthExceededException(str(e))._is_context_limit_error(str(e)):
+                    log.print_log(f"LiteLLM 调用失败: {str(e)}", "error")
+                raise
+
+    def _stream_params(self, messages) -> Dict[str, Any]:
+        """与 LLM.call 相同的请求参数（纯文本调用不带工具），改为流式"""
+        params = {
+            "model": self.model,
+            "messages": self._format_messages_for_provider(messages),
+            "timeout": self.timeout,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            "logprobs": self.logprobs,
+            "top_logprobs": self.top_logprobs,
+            "api_base": self.api_base,
+            "base_url": self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            "reasoning_effort": self.reasoning_effort,
+            **self.additional_params,
+            "stream": True,
+        }
+        return {k: v for k, v in params.items() if v is not None}
+
+    @staticmethod
+    def _stream_completion(params: Dict[str, Any], callbacks, stage: str) -> str:
+        """逐段读取流式响应并发送；用量由全部片段合成后交给回调"""
+        chunks, parts = [], []
+        stream = _TokenStream(stage)
+        try:
+            for chunk in litellm.completion(**params):
+                chunks.append(chunk)
+                choices = getattr(chunk, "choices", None)
+                delta = getattr(choices[0], "delta", None) if choices else None
+                text = getattr(delta, "content", None) if delta else None
+                if text:
+                    parts.append(text)
+                    stream.write(text)
+        finally:
+            stream.close()
+
+        usage = None
+        try:
+            usage = getattr(
+                litellm.stream_chunk_builder(chunks, messages=params["messages"]), "usage", None
+            )
+        except Exception:
+            pass
+        for callback in callbacks or []:
+            if usage and hasattr(callback, "log_success_event"):
+                callback.log_success_event(
+                    kwargs=params, response_obj={"usage": usage}, start_time=0, end_time=0
+                )
+        return "".join(parts)
+
+
+class LLMPool:
+    """
+    进程级 LLM 客户端池
+
+    按 (服务商, 模型, API 地址, KEY 指纹) 复用 LLM 实例，同一进程中的多次运行、
+    多个工作流阶段共享同一个客户端；KEY 轮换后自然使用新的实例
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self._pool: Dict[Tuple, LLM] = {}
+        self._pool_lock = threading.Lock()
+        self._llm_class: Type[LLM] = CachedLLM
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def make_key(provider, model, api_base, api_key, **kwargs) -> Tuple:
+        fingerprint = hashlib.sha1(str(api_key or "").encode("utf-8")).hexdigest()[:12]
+        extra = tuple(sorted((k, repr(v)) for k, v in kwargs.items()))
+        return (provider or "", model or "", api_base or "", fingerprint) + extra
+
+    def get(self, key: Tuple, factory) -> LLM:
+        with self._pool_lock:
+            llm = self._pool.get(key)
+            if llm is None:
+                llm = self._pool[key] = factory()
+            return llm
+
+    def default_key(self) -> Optional[Tuple]:
+        """全局配置对应的客户端键，未配置 KEY 时为 None"""
+        config = Config.get_instance()
+        if not config.api_key:
+            return None
+        return self.make_key(config.api_type, config.api_model, config.api_apibase, config.api_key)
+
+    def get_default(self) -> Optional[LLM]:
+        key = self.default_key()
+        if key is None:
+            return None
+        config = Config.get_instance()
+        return self.get(
+            key,
+            lambda: self._llm_class(
+                model=config.api_model, api_key=config.api_key, max_tokens=8192
+            ),
+        )
+
+    def get_custom(self, llm_config: Dict[str, Any]) -> LLM:
+        other = {
+            k: v
+            for k, v in llm_config.items()
+            if k not in ("provider", "model", "base_url", "api_base", "api_key")
+        }
+        key = self.make_key(
+            llm_config.get("provider"),
+            llm_config.get("model", "default"),
+            llm_config.get("base_url") or llm_config.get("api_base"),
+            llm_config.get("api_key"),
+            **other,
+        )
+        return self.get(key, lambda: self._llm_class(**llm_config))
+
+    def set_llm_class(self, llm_class: Optional[Type[LLM]] = None):
+        """
+        替换创建客户端使用的 LLM 类（如基准测试中的离线替身），None 恢复默认。
+        已创建的客户端会被清空；已编译工作流缓存中的实例需要调用方自行清空
+        """
+        with self._pool_lock:
+            self._llm_class = llm_class or CachedLLM
+            self._pool.clear()
+
+    def clear(self):
+        with self._pool_lock:
+            self._pool.clear()
+
+    def __len__(self):
+        return len(self._pool)
 
 
 class AgentFactory:
@@ -14,7 +295,8 @@ class AgentFactory:
         self._agent_templates: Dict[str, Type] = {}
         # 使用全局工具注册表
         self._tool_registry = GlobalToolRegistry.get_instance()
-        self._llm_cache: Dict[str, LLM] = {}
+        # LLM 实例由进程级客户端池统一管理
+        self._llm_pool = LLMPool.get_instance()
 
     def register_agent_template(self, name: str, template_class: Type):
         """注册智能体模板"""
@@ -25,26 +307,13 @@ class AgentFactory:
         self._tool_registry.register_tool(name, tool_class)
 
     def _get_llm(self, llm_config: Dict[str, Any] | None = None) -> Optional[LLM]:
-        """获取LLM实例，支持缓存"""
-        config = Config.get_instance()
-
+        """获取LLM实例，从进程级客户端池复用"""
         # 如果没有指定特殊配置，使用全局配置
         if not llm_config:
-            cache_key = f"{config.api_type}_{config.api_model}"
-            if cache_key not in self._llm_cache:
-                if config.api_key:
-                    self._llm_cache[cache_key] = LLM(
-                        model=config.api_model, api_key=config.api_key, max_tokens=8192
-                    )
-                else:
-                    return None
-            return self._llm_cache.get(cache_key)
+            return self._llm_pool.get_default()
 
         # 使用自定义LLM配置
-        cache_key = f"{llm_config.get('model', 'default')}_{llm_config.get('api_key', 'default')}"
-        if cache_key not in self._llm_cache:
-            self._llm_cache[cache_key] = LLM(**llm_config)
-        return self._llm_cache[cache_key]
+        return self._llm_pool.get_custom(llm_config)
 
     def create_agent(self, config: AgentConfig, custom_llm: LLM | None = None) -> Agent:
         """创建智能体实例"""
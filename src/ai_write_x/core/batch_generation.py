@@ -0,0 +1,394 @@
+import copy
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, Future
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from src.ai_write_x.config.config import Config
+from src.ai_write_x.tools import hotnews
+from src.ai_write_x.utils import log, utils
+
+
+# 批量生成配置
+BATCH_CONFIGS = {
+    "max_workers": 4,  # 同时运行的生成进程上限
+    "llm_rpm_per_key": 60,  # 每个 API KEY 每分钟允许的 LLM 请求数（按服务商限额调整）
+    "task_rpm": 20,  # 单个生成任务运行时平均每分钟发出的 LLM 请求数（估算值）
+    "max_topics": 100,  # 单批最多话题数
+}
+
+
+@dataclass
+class BatchTask:
+    """批量生成中的单个任务"""
+
+    task_id: str
+    topic: str
+    platform: str = ""
+    urls: List[str] = field(default_factory=list)
+    reference_ratio: float = 0.0
+    key_index: Optional[int] = None  # 该任务使用的 API KEY 序号，None 表示使用配置中的当前 KEY
+
+
+@dataclass
+class BatchTaskResult:
+    """单个任务的执行结果"""
+
+    task_id: str
+    topic: str
+    platform: str = ""
+    status: str = "queued"  # queued / running / success / failed / cancelled
+    title: str = ""
+    path: str = ""
+    error: str = ""
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        if not self.started_at:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["duration"] = round(self.duration, 2)
+        return data
+
+
+def get_api_key_indexes(config: Config) -> List[int]:
+    """当前 API 类型下非空 KEY 在 api_key 列表中的位置"""
+    try:
+        api_config = config.config["api"][config.api_type]
+        return [i for i, key in enumerate(api_config.get("api_key", [])) if key]
+    except Exception:
+        return []
+
+
+def get_api_key_count(config: Config) -> int:
+    """当前 API 类型下已配置的有效 KEY 数量"""
+    return max(1, len(get_api_key_indexes(config)))
+
+
+def resolve_concurrency(config: Config, requested: Optional[int] = None) -> int:
+    """
+    根据 LLM 限速计算并发数：所有 KEY 的每分钟请求额度 / 单任务每分钟请求数，
+    再受 requested（默认 max_workers）限制，至少为 1
+    """
+    rate_limit = (
+        get_api_key_count(config) * BATCH_CONFIGS["llm_rpm_per_key"] // BATCH_CONFIGS["task_rpm"]
+    )
+    requested = requested or BATCH_CONFIGS["max_workers"]
+    return max(1, min(requested, rate_limit))
+
+
+def build_batch_tasks(
+    config: Config, topics: Optional[List[str]] = None, hot_count: int = 0, platform: str = ""
+) -> List[BatchTask]:
+    """
+    构建批量任务：topics 为自定义话题列表；hot_count 为额外从热榜中选取的话题数，
+    按平台权重随机选择平台，同一批内不重复，并跳过已生成过的近似话题。
+    多个 API KEY 时按任务轮换使用，分摊限速。
+    """
+    entries = [(topic.strip(), platform) for topic in topics or [] if topic and topic.strip()]
+
+    chosen = {topic for topic, _ in entries}
+    for _ in range(max(0, hot_count)):
+        hot_platform = utils.get_random_platform(config.platforms)
+        topic = hotnews.select_platform_topic(hot_platform, 5, exclude=chosen)
+        chosen.add(topic)
+        entries.append((topic, hot_platform))
+
+    entries = entries[: BATCH_CONFIGS["max_topics"]]
+    # 只在非空 KEY 之间轮换，key_index 是其在 api_key 列表中的实际位置
+    key_indexes = get_api_key_indexes(config)
+    batch_id = uuid.uuid4().hex[:6]
+    return [
+        BatchTask(
+            task_id=f"{batch_id}-{i + 1}",
+            topic=topic,
+            platform=task_platform,
+            key_index=key_indexes[i % len(key_indexes)] if len(key_indexes) > 1 else None,
+        )
+        for i, (topic, task_platform) in enumerate(entries)
+    ]
+
+
+# ==================== 工作进程 ====================
+
+
+class _TaggedQueue:
+    """给工作进程发出的每条日志加上当前任务 id，便于在主进程中按任务区分"""
+
+    def __init__(self, queue):
+        self._queue = queue
+        self.task_id = ""
+
+    def put(self, item, *args, **kwargs):
+        if isinstance(item, dict):
+            item = {**item, "task_id": self.task_id}
+        self._queue.put(item, *args, **kwargs)
+
+
+_worker_queue: _TaggedQueue = None  # type: ignore
+_worker_transport: log.BatchedLogQueue = None  # type: ignore
+_worker_base_config: Dict[Any, Any] = {}
+
+
+def _init_batch_worker(log_queue, base_config, aiforge_config, environ, config_data):
+    """工作进程初始化：恢复环境变量、配置和进程日志（每个工作进程只执行一次）"""
+    global _worker_queue, _worker_transport, _worker_base_config
+
+    os.environ.update(environ)
+
+    # 批量发送的每一帧带当前任务 id，切换任务前先发送完上一个任务的日志
+    _worker_queue = _TaggedQueue(log_queue)
+    _worker_transport = log.setup_process_logging(_worker_queue)
+    log.set_process_queue(_worker_transport)
+
+    _worker_base_config = base_config
+    config = Config.get_instance()
+    config.config = copy.deepcopy(base_config)
+    config.aiforge_config = aiforge_config
+    for key, value in (config_data or {}).items():
+        setattr(config, key, value)
+
+
+def _run_batch_task(task: BatchTask) -> BatchTaskResult:
+    """在工作进程中执行单个任务，异常转换为失败结果，不影响同一进程中的后续任务"""
+    from src.ai_write_x.crew_main import run
+
+    result = BatchTaskResult(
+        task_id=task.task_id, topic=task.topic, platform=task.platform, status="running"
+    )
+    result.started_at = time.time()
+    _worker_queue.task_id = task.task_id
+
+    try:
+        config = Config.get_instance()
+        # 每个任务从初始配置开始，避免上一个任务的修改残留
+        config.config = copy.deepcopy(_worker_base_config)
+        config.custom_topic = task.topic
+        config.urls = task.urls
+        config.reference_ratio = task.reference_ratio
+        if task.key_index is not None:
+            config.config["api"][config.api_type]["key_index"] = task.key_index
+            os.environ[config.api_key_name] = config.api_key
+
+        _worker_transport.put(
+            {"type": "internal", "message": "任务开始", "timestamp": time.time()}
+        )
+        log.print_log(f"[批量任务 {task.task_id}] 开始：{task.topic}", "status")
+        output = run(
+            {
+                "topic": task.topic,
+                "platform": task.platform,
+                "urls": task.urls,
+                "reference_ratio": task.reference_ratio,
+            }
+        )
+
+        save_result = (output or {}).get("save_result") or {}
+        result.status = "success" if save_result.get("success") else "failed"
+        result.title = save_result.get("title", "")
+        result.path = save_result.get("path", "")
+        if result.status == "failed":
+            result.error = "文章保存失败"
+    except Exception as e:
+        result.status = "failed"
+        result.error = str(e)
+    finally:
+        result.finished_at = time.time()
+        log.print_log(
+            f"[批量任务 {task.task_id}] {'完成' if result.status == 'success' else '失败'}"
+            f"（{result.duration:.1f}s）{result.error}",
+            "status" if result.status == "success" else "error",
+        )
+        # 输出缓冲中的内容属于当前任务，切换任务前发送
+        _worker_transport.flush()
+
+    return result
+
+
+# ==================== 批量执行器 ====================
+
+
+class BatchRunner:
+    """
+    批量内容生成
+
+    任务在有界进程池（spawn）中执行，每个工作进程复用初始化好的配置和日志；
+    所有工作进程的日志写入同一个 log_queue，每条消息带 task_id。log_queue 由执行器自己的
+    转发线程读取：更新任务状态（没有人查看日志时状态也会更新）并转发给 subscribe() 的订阅者，
+    全部任务结束且日志取完后向订阅者发送 None；
+    results 按任务汇总状态、标题、保存路径和耗时。
+    """
+
+    def __init__(
+        self,
+        tasks: List[BatchTask],
+        max_workers: Optional[int] = None,
+        config_data: Optional[Dict[str, Any]] = None,
+    ):
+        config = Config.get_instance()
+        self.batch_id = tasks[0].task_id.split("-")[0] if tasks else uuid.uuid4().hex[:6]
+        self.tasks = tasks
+        self.max_workers = min(resolve_concurrency(config, max_workers), max(1, len(tasks)))
+        self.config_data = config_data or {}
+
+        context = multiprocessing.get_context("spawn")
+        self.log_queue = context.Queue()
+        self.results: Dict[str, BatchTaskResult] = {
+            task.task_id: BatchTaskResult(task.task_id, task.topic, task.platform)
+            for task in tasks
+        }
+        self.created_at = time.time()
+        self.finished_at = 0.0
+        self._context = context
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._done_event = threading.Event()
+        self._subscribers: List[queue.Queue] = []
+        self._drained = False
+        self._pump_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        config = Config.get_instance()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=_init_batch_worker,
+            initargs=(
+                self.log_queue,
+                config.get_config(),
+                config.aiforge_config,
+                dict(os.environ),
+                self.config_data,
+            ),
+        )
+        log.print_log(
+            f"批量生成开始：共 {len(self.tasks)} 个话题，并发 {self.max_workers}", "status"
+        )
+        for task in self.tasks:
+            self._futures[task.task_id] = self._executor.submit(_run_batch_task, task)
+        for task in self.tasks:
+            self._futures[task.task_id].add_done_callback(
+                lambda f, task=task: self._on_task_done(task, f)
+            )
+        self._executor.shutdown(wait=False)
+
+        self._pump_thread = threading.Thread(
+            target=self._pump, name=f"batch-log-{self.batch_id}", daemon=True
+        )
+        self._pump_thread.start()
+
+    def subscribe(self) -> "queue.Queue[Optional[Dict[str, Any]]]":
+        """订阅之后的日志消息；批量任务全部结束并且日志取完后收到 None"""
+        subscriber: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        with self._lock:
+            if self._drained:
+                subscriber.put(None)
+            else:
+                self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def wait_drained(self, timeout: Optional[float] = None):
+        if self._pump_thread:
+            self._pump_thread.join(timeout)
+
+    def _pump(self):
+        """转发线程：持续取出 log_queue，全部任务结束且队列为空后退出"""
+        while True:
+            try:
+                frame = self.log_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self.is_running():
+                    continue
+                break
+            except (OSError, ValueError, EOFError):
+                break
+            for msg in log.unpack_messages(frame):
+                self.track_message(msg)
+                with self._lock:
+                    subscribers = list(self._subscribers)
+                for subscriber in subscribers:
+                    subscriber.put(msg)
+
+        with self._lock:
+            self._drained = True
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.put(None)
+
+    def track_message(self, msg: Dict[str, Any]):
+        """转发线程对每条消息调用，用于更新任务的运行状态"""
+        task_id = msg.get("task_id")
+        if msg.get("type") == "internal" and msg.get("message") == "任务开始":
+            with self._lock:
+                result = self.results.get(task_id)
+                if result and result.status == "queued":
+                    result.status = "running"
+                    result.started_at = msg.get("timestamp", time.time())
+
+    def _on_task_done(self, task: BatchTask, future: Future):
+        with self._lock:
+            if future.cancelled():
+                self.results[task.task_id].status = "cancelled"
+            else:
+                try:
+                    self.results[task.task_id] = future.result()
+                except Exception as e:
+                    # 工作进程异常退出（BrokenProcessPool 等）
+                    result = self.results[task.task_id]
+                    result.status = "failed"
+                    result.error = str(e) or type(e).__name__
+                    result.finished_at = time.time()
+
+            if len(self._futures) == len(self.tasks) and all(
+                f.done() for f in self._futures.values()
+            ):
+                self.finished_at = time.time()
+                self._done_event.set()
+
+    def is_running(self) -> bool:
+        return bool(self._futures) and not self._done_event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done_event.wait(timeout)
+
+    def cancel(self):
+        """取消尚未开始的任务，并终止正在执行的工作进程"""
+        for future in self._futures.values():
+            future.cancel()
+        if self._executor:
+            for process in list(getattr(self._executor, "_processes", {}).values()):
+                if process.is_alive():
+                    process.terminate()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            results = [self.results[task.task_id].to_dict() for task in self.tasks]
+        counts: Dict[str, int] = {}
+        for item in results:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return {
+            "batch_id": self.batch_id,
+            "status": "running" if self.is_running() else "finished",
+            "total": len(results),
+            "max_workers": self.max_workers,
+            "counts": counts,
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 2),
+            "results": results,
+        }
@@ -1,18 +1,116 @@
+import hashlib
+import threading
 import time
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from crewai import Crew, Process, Task, Agent
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
 from src.ai_write_x.core.base_framework import (
     BaseWorkflowFramework,
     WorkflowConfig,
     ContentResult,
     WorkflowType,
 )
-from src.ai_write_x.core.agent_factory import AgentFactory
+from src.ai_write_x.core.agent_factory import AgentFactory, LLMPool, stream_stage
 from src.ai_write_x.core.monitoring import WorkflowMonitor
+from src.ai_write_x.core.stage_graph import StageGraph
 from src.ai_write_x.utils.content_parser import ContentParser
 from src.ai_write_x.utils import utils
 
 
+# 已编译工作流缓存配置
+WORKFLOW_CACHE_CONFIGS = {
+    "enabled": True,
+    "max_entries": 16,  # 最多缓存的工作流配置数（按最近使用淘汰）
+}
+
+# WorkflowType.PARALLEL 执行配置
+PARALLEL_WORKFLOW_CONFIGS = {
+    "max_workers": 4,  # 同时执行的任务数上限
+    "separator": "\n\n",  # 合并各末端任务输出时使用的分隔符
+}
+
+# (智能体名称 -> 智能体, 任务名称 -> 执行该任务的智能体)
+CompiledWorkflow = Tuple[Dict[str, Agent], Dict[str, Agent]]
+
+
+class WorkflowCache:
+    """
+    进程级已编译工作流缓存
+
+    以 WorkflowConfig 的完整内容和所用 LLM 客户端为键，缓存创建好的智能体（含工具、LLM）。
+    任务不缓存：Task 会累计工具调用次数、委派次数、输出等单次运行的状态，每次执行都新建。
+    同一个键下可以有多份实例：使用时取出（acquire），成功执行后清除智能体的运行状态再放回（release），
+    并发执行的相同工作流各自使用独立的实例
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or WORKFLOW_CACHE_CONFIGS["max_entries"]
+        self._idle: "OrderedDict[str, List[CompiledWorkflow]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def make_key(config: WorkflowConfig) -> str:
+        """dataclass 的 repr 包含全部字段（智能体、任务描述、模板等），再加上默认 LLM 客户端"""
+        raw = repr(config) + repr(LLMPool.get_instance().default_key())
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def acquire(self, key: str) -> Optional[CompiledWorkflow]:
+        with self._cache_lock:
+            entries = self._idle.get(key)
+            if entries:
+                self._idle.move_to_end(key)
+                self.hits += 1
+                return entries.pop()
+            self.misses += 1
+            return None
+
+    def release(self, key: str, compiled: CompiledWorkflow):
+        agents, task_agents = compiled
+        unique = {id(agent): agent for agent in [*agents.values(), *task_agents.values()]}
+        for agent in unique.values():
+            self.reset_agent(agent)
+        with self._cache_lock:
+            self._idle.setdefault(key, []).append(compiled)
+            self._idle.move_to_end(key)
+            while len(self._idle) > self.max_entries:
+                self._idle.popitem(last=False)
+
+    @staticmethod
+    def reset_agent(agent: Agent):
+        """清除智能体上一次运行累计的状态：格式错误计数、工具结果、重试次数、token 统计"""
+        agent.formatting_errors = 0
+        agent.tools_results = []
+        agent._times_executed = 0
+        agent._token_process = TokenProcess()
+
+    def clear(self):
+        with self._cache_lock:
+            self._idle.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._cache_lock:
+            return {
+                "entries": len(self._idle),
+                "instances": sum(len(v) for v in self._idle.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
 class ContentGenerationEngine(BaseWorkflowFramework):
     """纯内容生成引擎，与平台无关"""
 
@@ -21,6 +119,8 @@ class ContentGenerationEngine(BaseWorkflowFramework):
         self.agent_factory = AgentFactory()
         # 添加监控器
         self.monitor = WorkflowMonitor.get_instance()
+        self._cache_key: Optional[str] = None
+        self.task_agents: Dict[str, Agent] = {}
 
     def setup_agents(self) -> Dict[str, Agent]:
         """设置智能体"""
@@ -30,6 +130,21 @@ class ContentGenerationEngine(BaseWorkflowFramework):
             agents[agent_config.name] = agent
         return agents
 
+    def setup_task_agents(self) -> Dict[str, Agent]:
+        """为每个任务分配执行的智能体"""
+        task_agents = {}
+        parallel = self.config.workflow_type == WorkflowType.PARALLEL
+        agent_configs = {agent_config.name: agent_config for agent_config in self.config.agents}
+        used_agents = set()
+        for task_config in self.config.tasks:
+            agent = self.agents[task_config.agent_name]
+            if parallel and task_config.agent_name in used_agents:
+                # 并行执行时同一个智能体实例不能同时执行多个任务，后续任务使用独立的实例
+                agent = self.agent_factory.create_agent(agent_configs[task_config.agent_name])
+            used_agents.add(task_config.agent_name)
+            task_agents[task_config.name] = agent
+        return task_agents
+
     def setup_tasks(self) -> Dict[str, Task]:
         """设置任务"""
         tasks = {}
@@ -38,7 +153,7 @@ class ContentGenerationEngine(BaseWorkflowFramework):
             task = Task(
                 description=task_config.description,
                 expected_output=task_config.expected_output,
-                agent=self.agents[task_config.agent_name],
+                agent=self.task_agents[task_config.name],
             )
 
             # 设置上下文依赖
@@ -48,34 +163,60 @@ class ContentGenerationEngine(BaseWorkflowFramework):
             tasks[task_config.name] = task
         return tasks
 
+    def compile(self):
+        """创建智能体和任务；启用缓存时优先复用进程内已创建好的智能体，任务每次新建"""
+        self.validate_config()
+
+        compiled = None
+        if WORKFLOW_CACHE_CONFIGS["enabled"]:
+            self._cache_key = WorkflowCache.make_key(self.config)
+            compiled = WorkflowCache.get_instance().acquire(self._cache_key)
+        if compiled is None:
+            # setup_task_agents 依赖 self.agents
+            self.agents = self.setup_agents()
+            compiled = (self.agents, self.setup_task_agents())
+        self.agents, self.task_agents = compiled
+        self.tasks = self.setup_tasks()
+
+    def release(self):
+        """执行成功后把智能体放回缓存供下次复用"""
+        if self._cache_key and self.agents and self.task_agents:
+            WorkflowCache.get_instance().release(self._cache_key, (self.agents, self.task_agents))
+        self._cache_key = None
+
     def execute_workflow(self, input_data: Dict[str, Any]) -> ContentResult:
         """执行工作流并记录监控数据"""
         start_time = time.time()
         success = False
+        # 执行期间的大模型调用以该工作流名称流式输出
+        stage_token = stream_stage.set(self.config.name)
+        task_outputs: Dict[str, str] = {}
 
         try:
-            self.validate_config()
-            self.agents = self.setup_agents()
-            self.tasks = self.setup_tasks()
-
-            # 根据工作流类型选择执行策略
-            process_map = {
-                WorkflowType.SEQUENTIAL: Process.sequential,
-                WorkflowType.HIERARCHICAL: Process.hierarchical,
-                WorkflowType.PARALLEL: Process.sequential,  # CrewAI暂不支持真正的并行
-                WorkflowType.CUSTOM: Process.sequential,
-            }
+            self.compile()
 
-            process = process_map.get(self.config.workflow_type, Process.sequential)
+            if self.config.workflow_type == WorkflowType.PARALLEL:
+                task_outputs = self._kickoff_parallel(input_data)
+                result = self._merge_task_outputs(task_outputs)
+            else:
+                # 根据工作流类型选择执行策略
+                process_map = {
+                    WorkflowType.SEQUENTIAL: Process.sequential,
+                    WorkflowType.HIERARCHICAL: Process.hierarchical,
+                    WorkflowType.CUSTOM: Process.sequential,
+                }
 
-            crew = Crew(
-                agents=list(self.agents.values()),
-                tasks=list(self.tasks.values()),
-                process=process,
-                verbose=True,
-            )
+                process = process_map.get(self.config.workflow_type, Process.sequential)
 
-            result = crew.kickoff(inputs=input_data)
+                # Crew 每次新建：其工具结果缓存只在单次运行内有效
+                crew = Crew(
+                    agents=list(self.agents.values()),
+                    tasks=list(self.tasks.values()),
+                    process=process,
+                    verbose=True,
+                )
+
+                result = crew.kickoff(inputs=input_data)
             result = utils.remove_code_blocks(str(result))
             if input_data.get("parse_result", True):
                 parsed_result = self._parse_result(result, input_data)
@@ -100,16 +241,54 @@ class ContentGenerationEngine(BaseWorkflowFramework):
                     },
                 )
 
+            if task_outputs:
+                # 并行工作流保留每个任务的输出（按声明顺序），如同一篇文章的多平台版本
+                parsed_result.metadata["task_outputs"] = task_outputs
+
             success = True
+            self.release()
             return parsed_result
         except Exception as e:
+            # 失败时不放回缓存，避免复用状态异常的实例
+            self._cache_key = None
             self.monitor.log_error(self.config.name, str(e), input_data)
             raise
         finally:
+            stream_stage.reset(stage_token)
             # 记录执行指标
             duration = time.time() - start_time
             self.monitor.track_execution(self.config.name, duration, success)
 
+    def _kickoff_parallel(self, input_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        并行执行任务：每个任务单独组成一个 Crew，没有上下文依赖的任务并发执行，
+        有依赖的任务在其 context 中的任务完成后执行（依赖任务的输出由 CrewAI 作为上下文传入）。
+        返回按声明顺序排列的各任务输出
+        """
+        graph = StageGraph(PARALLEL_WORKFLOW_CONFIGS["max_workers"])
+        for task_config in self.config.tasks:
+            # 与 setup_tasks 一致：只有先声明的任务才能作为上下文
+            deps = [ctx for ctx in task_config.context if ctx in graph.stages]
+            graph.add(
+                task_config.name,
+                lambda _, name=task_config.name: self._kickoff_task(name, input_data),
+                deps,
+            )
+
+        results = graph.run()
+        return {task_config.name: results[task_config.name] for task_config in self.config.tasks}
+
+    def _kickoff_task(self, name: str, input_data: Dict[str, Any]) -> str:
+        task = self.tasks[name]
+        crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=True)
+        return str(crew.kickoff(inputs=input_data))
+
+    def _merge_task_outputs(self, task_outputs: Dict[str, str]) -> str:
+        """按声明顺序合并末端任务（不被其他任务作为上下文）的输出"""
+        referenced = {ctx for task_config in self.config.tasks for ctx in task_config.context}
+        outputs = [output for name, output in task_outputs.items() if name not in referenced]
+        return PARALLEL_WORKFLOW_CONFIGS["separator"].join(outputs)
+
     def _parse_result(self, raw_result: str, input_data: Dict[str, Any]) -> ContentResult:
         parser = ContentParser()
         parsed_content = parser.parse(raw_result)
@@ -0,0 +1,624 @@
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from src.ai_write_x.config.config import Config
+from src.ai_write_x.tools import hotnews
+from src.ai_write_x.utils import log, utils
+from src.ai_write_x.utils.path_manager import PathManager
+
+
+# 任务队列配置
+JOB_QUEUE_CONFIGS = {
+    # Web 服务启动时是否运行任务调度。默认关闭：调度器的并发与交互任务、批量生成各自计算，
+    # 同时运行时 LLM 请求总量可能超过限速，确认限额足够后再开启；
+    # 也可通过 /api/jobs/supervisor/start、/stop 在运行时开启或停止（同步修改该值）
+    "enabled": False,
+    "max_workers": 2,  # 同时运行的生成进程上限（仍受 LLM 限速约束）
+    "poll_interval": 2,  # 调度循环间隔（秒）
+    "max_attempts": 3,  # 默认最大尝试次数
+    "retry_base_delay": 60,  # 重试退避基数（秒），按 2^(n-1) 递增
+    "retry_max_delay": 3600,  # 重试退避上限（秒）
+    "job_timeout": 3600,  # 单个任务最长运行时间（秒），超时终止并按失败处理
+}
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+
+# ==================== 定时表达式 ====================
+
+
+class CronSchedule:
+    """
+    五段式 cron 表达式：分 时 日 月 周（周日为 0 或 7），按本地时间计算
+    每段支持 *、数字、a-b 范围、逗号列表和 /n 步长，例如 "0 8 * * *" 表示每天 8:00
+    日和周同时限定时，满足任一即可（与标准 cron 一致）
+    """
+
+    _FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 表达式应为 5 段：{expr}")
+
+        self.expr = expr
+        fields = [self._parse_field(p, lo, hi) for p, (lo, hi) in zip(parts, self._FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, lo: int, hi: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in field.split(","):
+            rng, _, step_text = item.partition("/")
+            step = int(step_text) if step_text else 1
+            if rng == "*":
+                start, end = lo, hi
+            elif "-" in rng:
+                start, end = (int(v) for v in rng.split("-", 1))
+            else:
+                start = int(rng)
+                end = hi if step_text else start
+            if step < 1 or start < lo or end > hi or start > end:
+                raise ValueError(f"cron 字段超出范围：{field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        # isoweekday: 周一=1 … 周日=7
+        in_weekdays = day.isoweekday() % 7 in self.weekdays
+        if self._any_day:
+            return in_weekdays
+        if self._any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, ts: float) -> float:
+        """ts 之后（不含）下一个触发时间的时间戳"""
+        start = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        # 最多向后查找 5 年（覆盖 2 月 29 日这类表达式）
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate.timestamp()
+            day += timedelta(days=1)
+        raise ValueError(f"cron 表达式没有可触发的时间：{self.expr}")
+
+
+# ==================== 任务队列 ====================
+
+
+class JobQueue:
+    """
+    持久化的生成任务队列（SQLite）
+
+    - 任务状态：queued / running / done / failed，按优先级（大者优先）和可执行时间出队
+    - 失败任务在未达到最大尝试次数前重新入队，延迟按指数退避递增
+    - schedules 表保存定时规则，到期时按规则生成任务
+    - 服务重启后，上次遗留的 running 任务会重新入队
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or PathManager.get_cache_dir() / "jobs.db")
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL DEFAULT '',
+                payload TEXT NOT NULL DEFAULT '{}',
+                priority INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                run_after REAL NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT,
+                result TEXT,
+                schedule_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(state, priority, run_after);
+            CREATE TABLE IF NOT EXISTS schedules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                cron TEXT NOT NULL,
+                payload TEXT NOT NULL DEFAULT '{}',
+                count INTEGER NOT NULL DEFAULT 1,
+                priority INTEGER NOT NULL DEFAULT 0,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                next_run REAL NOT NULL,
+                last_run REAL
+            );
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def _job_to_dict(row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    # ---------- 任务 ----------
+
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        run_after=None,
+        max_attempts=None,
+        schedule_id=None,
+    ) -> int:
+        """
+        加入一个生成任务。payload 与 run() 的输入一致：topic / platform / urls / reference_ratio，
+        topic 为空时执行前按热搜模式选题
+        """
+        return self.enqueue_many(payload, 1, priority, run_after, max_attempts, schedule_id)[0]
+
+    def enqueue_many(
+        self,
+        payload: Dict[str, Any],
+        count: int,
+        priority: int = 0,
+        run_after=None,
+        max_attempts=None,
+        schedule_id=None,
+    ) -> List[int]:
+        """以相同内容加入 count 个任务（一次事务），返回任务 ID 列表"""
+        now = time.time()
+        row = (
+            payload.get("topic", ""),
+            json.dumps(payload, ensure_ascii=False),
+            priority,
+            max_attempts or JOB_QUEUE_CONFIGS["max_attempts"],
+            run_after or now,
+            now,
+            schedule_id,
+        )
+        job_ids = []
+        with self._db_lock:
+            for _ in range(max(count, 1)):
+                cursor = self._conn.execute(
+                    "INSERT INTO jobs (topic, payload, priority, max_attempts, run_after, "
+                    "created_at, schedule_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                job_ids.append(cursor.lastrowid)
+            self._conn.commit()
+        return job_ids
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """取出一个可执行的任务并标记为 running"""
+        now = time.time()
+        with self._db_lock:
+            row = self._conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, started_at = ?, "
+                "finished_at = NULL WHERE id = (SELECT id FROM jobs WHERE state = 'queued' "
+                "AND run_after <= ? ORDER BY priority DESC, run_after, id LIMIT 1) RETURNING *",
+                (now, now),
+            ).fetchone()
+            self._conn.commit()
+        return self._job_to_dict(row) if row else None
+
+    def set_topic(self, job_id: int, topic: str, payload: Dict[str, Any]):
+        """热搜模式任务在执行前确定话题"""
+        with self._db_lock:
+            self._conn.execute(
+                "UPDATE jobs SET topic = ?, payload = ? WHERE id = ?",
+                (topic, json.dumps(payload, ensure_ascii=False), job_id),
+            )
+            self._conn.commit()
+
+    def complete(self, job_id: int, result: Optional[Dict[str, Any]] = None):
+        with self._db_lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'done', finished_at = ?, error = NULL, result = ? "
+                "WHERE id = ?",
+                (time.time(), json.dumps(result, ensure_ascii=False) if result else None, job_id),
+            )
+            self._conn.commit()
+
+    def fail(self, job_id: int, error: str, retry: bool = True) -> str:
+        """
+        标记任务失败：未达到最大尝试次数时按指数退避重新入队，返回任务的新状态
+        """
+        now = time.time()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return "failed"
+
+            attempts, max_attempts = row
+            if retry and attempts < max_attempts:
+                delay = min(
+                    JOB_QUEUE_CONFIGS["retry_max_delay"],
+                    JOB_QUEUE_CONFIGS["retry_base_delay"] * 2 ** (attempts - 1),
+                )
+                # 加少量抖动，避免同时失败的任务同时重试
+                delay *= random.uniform(0.9, 1.1)
+                state = "queued"
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, run_after = ?, finished_at = ?, error = ? "
+                    "WHERE id = ?",
+                    (state, now + delay, now, error, job_id),
+                )
+            else:
+                state = "failed"
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, finished_at = ?, error = ? WHERE id = ?",
+                    (state, now, error, job_id),
+                )
+            self._conn.commit()
+        return state
+
+    def cancel(self, job_id: int) -> bool:
+        """取消尚未执行的任务（运行中的任务由调度器终止）"""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'failed', finished_at = ?, error = '已取消' "
+                "WHERE id = ? AND state = 'queued'",
+                (time.time(), job_id),
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def recover_running(self) -> int:
+        """把上次进程退出时遗留的 running 任务重新入队"""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'queued', run_after = ? WHERE state = 'running'",
+                (time.time(),),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job_to_dict(row) if row else None
+
+    def list_jobs(self, state=None, limit=50) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if state:
+            sql += " WHERE state = ?"
+            params.append(state)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._db_lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._job_to_dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._db_lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    # ---------- 定时规则 ----------
+
+    def add_schedule(
+        self, name: str, cron: str, payload=None, count: int = 1, priority: int = 0
+    ) -> int:
+        """添加定时规则：每次触发生成 count 个任务（payload 中 topic 为空即热搜选题）"""
+        next_run = CronSchedule(cron).next_after(time.time())
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "INSERT INTO schedules (name, cron, payload, count, priority, next_run) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    cron,
+                    json.dumps(payload or {}, ensure_ascii=False),
+                    max(1, count),
+                    priority,
+                    next_run,
+                ),
+            )
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def set_schedule_enabled(self, schedule_id: int, enabled: bool) -> bool:
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "UPDATE schedules SET enabled = ? WHERE id = ?", (int(enabled), schedule_id)
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def remove_schedule(self, schedule_id: int) -> bool:
+        with self._db_lock:
+            cursor = self._conn.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def list_schedules(self) -> List[Dict[str, Any]]:
+        with self._db_lock:
+            rows = self._conn.execute("SELECT * FROM schedules ORDER BY id").fetchall()
+        schedules = []
+        for row in rows:
+            schedule = dict(row)
+            schedule["payload"] = json.loads(schedule["payload"] or "{}")
+            schedule["enabled"] = bool(schedule["enabled"])
+            schedules.append(schedule)
+        return schedules
+
+    def enqueue_due_schedules(self, now=None) -> int:
+        """为到期的定时规则生成任务并计算下次触发时间，返回生成的任务数"""
+        now = now or time.time()
+        with self._db_lock:
+            due = self._conn.execute(
+                "SELECT * FROM schedules WHERE enabled = 1 AND next_run <= ?", (now,)
+            ).fetchall()
+
+        created = 0
+        for schedule in due:
+            payload = json.loads(schedule["payload"] or "{}")
+            for _ in range(schedule["count"]):
+                self.enqueue(payload, schedule["priority"], schedule_id=schedule["id"])
+                created += 1
+
+            try:
+                next_run = CronSchedule(schedule["cron"]).next_after(now)
+                enabled = 1
+            except ValueError as e:
+                log.print_log(f"定时任务 {schedule['name']} 已停用：{e}", "warning")
+                next_run, enabled = now, 0
+            with self._db_lock:
+                self._conn.execute(
+                    "UPDATE schedules SET next_run = ?, last_run = ?, enabled = ? WHERE id = ?",
+                    (next_run, now, enabled, schedule["id"]),
+                )
+                self._conn.commit()
+        return created
+
+
+# ==================== 任务调度 ====================
+
+
+class _RunningJob:
+    def __init__(self, job, process, log_queue):
+        self.job = job
+        self.process = process
+        self.log_queue = log_queue
+        self.outcome: Optional[Dict[str, Any]] = None  # 进程发出的完成/失败消息
+
+
+class JobSupervisor:
+    """
+    后台调度线程：生成到期的定时任务，从队列取任务并在独立进程中运行 run_crew_in_process，
+    保持最多 max_workers 个进程同时工作；根据进程发出的完成/失败消息更新任务状态
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, job_queue: Optional[JobQueue] = None):
+        self.job_queue = job_queue or JobQueue.get_instance()
+        self._running: Dict[int, _RunningJob] = {}
+        self._running_lock = threading.RLock()
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def start(self):
+        if self.is_running():
+            return
+        recovered = self.job_queue.recover_running()
+        if recovered:
+            log.print_log(f"已恢复 {recovered} 个未完成的排队任务", "info")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="job-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """停止调度；正在运行的任务进程被终止，任务重新入队，下次启动时继续"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._running_lock:
+            for running in list(self._running.values()):
+                self._terminate(running)
+            self._running.clear()
+        self.job_queue.recover_running()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def running_jobs(self) -> List[int]:
+        return list(self._running)
+
+    def cancel(self, job_id: int) -> bool:
+        """取消任务：排队中的直接标记失败，运行中的终止进程"""
+        if self.job_queue.cancel(job_id):
+            return True
+        with self._running_lock:
+            running = self._running.pop(job_id, None)
+            if running is None:
+                return False
+            self._terminate(running)
+        self.job_queue.fail(job_id, "已取消", retry=False)
+        return True
+
+    def _max_workers(self) -> int:
+        from src.ai_write_x.core.batch_generation import resolve_concurrency
+
+        return resolve_concurrency(Config.get_instance(), JOB_QUEUE_CONFIGS["max_workers"])
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                log.print_log(f"任务调度出错：{str(e)}", "error")
+            self._stop_event.wait(JOB_QUEUE_CONFIGS["poll_interval"])
+
+    def run_once(self):
+        self.job_queue.enqueue_due_schedules()
+        with self._running_lock:
+            self._reap()
+            while len(self._running) < self._max_workers():
+                job = self.job_queue.claim()
+                if job is None:
+                    break
+                self._launch(job)
+
+    def _launch(self, job: Dict[str, Any]):
+        from src.ai_write_x.crew_main import run_crew_in_process
+
+        config = Config.get_instance()
+        payload = dict(job["payload"])
+        try:
+            if not payload.get("topic"):
+                # 热搜模式：执行时选题，避开正在运行的任务的话题
+                payload["platform"] = payload.get("platform") or utils.get_random_platform(
+                    config.platforms
+                )
+                payload["topic"] = hotnews.select_platform_topic(
+                    payload["platform"],
+                    5,
+                    exclude={r.job.get("topic") for r in self._running.values()},
+                )
+                self.job_queue.set_topic(job["id"], payload["topic"], payload)
+                job["topic"] = payload["topic"]
+
+            inputs = {
+                "platform": payload.get("platform", ""),
+                "topic": payload["topic"],
+                "urls": payload.get("urls", []),
+                "reference_ratio": payload.get("reference_ratio", 0.0),
+            }
+            config_data = {
+                "custom_topic": inputs["topic"],
+                "urls": inputs["urls"],
+                "reference_ratio": inputs["reference_ratio"],
+                "custom_template_category": payload.get("custom_template_category", ""),
+                "custom_template": payload.get("custom_template", ""),
+            }
+
+            # spawn 出的子进程继承当前进程的环境变量
+            os.environ[config.api_key_name] = config.api_key
+            os.environ["MODEL"] = config.api_model
+            os.environ["OPENAI_API_BASE"] = config.api_apibase
+
+            log_queue = self._context.Queue()
+            process = self._context.Process(
+                target=run_crew_in_process,
+                args=(inputs, log_queue, config.get_config(), config.aiforge_config, config_data),
+                daemon=False,
+            )
+            process.start()
+        except Exception as e:
+            state = self.job_queue.fail(job["id"], f"任务启动失败：{str(e)}")
+            log.print_log(f"[排队任务 {job['id']}] 启动失败（{state}）：{str(e)}", "error")
+            return
+
+        self._running[job["id"]] = _RunningJob(job, process, log_queue)
+        log.print_log(
+            f"[排队任务 {job['id']}] 开始（第 {job['attempts']} 次）：{job['topic']}", "status"
+        )
+
+    def _drain(self, running: _RunningJob):
+        while True:
+            try:
+                frame = running.log_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            for msg in log.unpack_messages(frame):
+                if msg.get("type") == "internal" and msg.get("message") in (
+                    "任务执行完成",
+                    "任务执行失败",
+                ):
+                    running.outcome = msg
+                elif msg.get("type") not in ("internal", "token"):
+                    log.print_log(
+                        f"[排队任务 {running.job['id']}] {msg.get('message', '')}",
+                        msg.get("type", "info"),
+                        show_in_ui=False,
+                    )
+
+    def _reap(self):
+        now = time.time()
+        for job_id, running in list(self._running.items()):
+            self._drain(running)
+
+            if running.process.is_alive():
+                started_at = running.job.get("started_at") or now
+                if now - started_at > JOB_QUEUE_CONFIGS["job_timeout"]:
+                    self._terminate(running)
+                    del self._running[job_id]
+                    state = self.job_queue.fail(job_id, "任务运行超时")
+                    log.print_log(f"[排队任务 {job_id}] 运行超时（{state}）", "warning")
+                continue
+
+            # 进程已退出，取出管道中剩余的消息再判断结果
+            self._drain(running)
+            del self._running[job_id]
+            outcome = running.outcome or {}
+            save_result = ((outcome.get("result") or {}).get("save_result")) or {}
+            if outcome.get("message") == "任务执行完成" and save_result.get("success"):
+                self.job_queue.complete(
+                    job_id, {"title": save_result.get("title"), "path": save_result.get("path")}
+                )
+                log.print_log(f"[排队任务 {job_id}] 完成：{save_result.get('title')}", "success")
+            else:
+                error = outcome.get("error") or (
+                    "文章保存失败"
+                    if outcome
+                    else f"进程异常退出(exitcode={running.process.exitcode})"
+                )
+                state = self.job_queue.fail(job_id, error)
+                log.print_log(f"[排队任务 {job_id}] 失败（{state}）：{error}", "error")
+
+    @staticmethod
+    def _terminate(running: _RunningJob):
+        if running.process.is_alive():
+            running.process.terminate()
+            running.process.join(timeout=2.0)
+            if running.process.is_alive():
+                running.process.kill()
+                running.process.join(timeout=1.0)
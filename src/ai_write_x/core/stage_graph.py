@@ -0,0 +1,94 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.ai_write_x.utils import log
+
+
+@dataclass
+class _Stage:
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    optional: bool = False
+
+
+@dataclass
+class StageTiming:
+    start: float
+    end: float
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class StageGraph:
+    """
+    工作流阶段的依赖图执行器
+
+    每个阶段声明所依赖的阶段，依赖全部完成后提交到线程池，互不依赖的阶段并发执行。
+    阶段函数的参数是已完成阶段的结果字典，在提交时的 contextvars 上下文中运行。
+    必需阶段失败时不再提交新阶段并抛出该异常；可选阶段（optional=True）失败时结果为 None，
+    依赖它的阶段照常执行
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.stages: Dict[str, _Stage] = {}
+        self.timings: Dict[str, StageTiming] = {}
+
+    def add(self, name: str, func, deps: Optional[List[str]] = None, optional: bool = False):
+        """添加阶段；依赖必须是已添加的阶段（保证无环）"""
+        if name in self.stages:
+            raise ValueError(f"阶段重复: {name}")
+        deps = tuple(deps or ())
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"阶段 {name} 依赖未定义的阶段 {dep}")
+        self.stages[name] = _Stage(name, func, deps, optional)
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        pending = dict(self.stages)
+        running: Dict[Future, str] = {}
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, self.max_workers), thread_name_prefix="workflow-stage"
+        )
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.deps):
+                        del pending[name]
+                        context = contextvars.copy_context()
+                        future = executor.submit(context.run, self._run_stage, stage, dict(results))
+                        running[future] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if not self.stages[name].optional:
+                            raise
+                        log.print_log(f"阶段 {name} 执行失败，已跳过: {str(e)}", "warning")
+                        results[name] = None
+            return results
+        finally:
+            # 必需阶段失败时不等待其余阶段（已在执行的大模型调用无法中断，结果丢弃）
+            executor.shutdown(wait=not running, cancel_futures=True)
+
+    def _run_stage(self, stage: _Stage, results: Dict[str, Any]):
+        start = time.time()
+        try:
+            result = stage.func(results)
+        except Exception as e:
+            self.timings[stage.name] = StageTiming(start, time.time(), str(e))
+            raise
+        self.timings[stage.name] = StageTiming(start, time.time())
+        return result
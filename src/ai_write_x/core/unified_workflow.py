@@ -1,6 +1,8 @@
 import os
+import re
 import time
-from typing import Dict, Any
+from html import unescape
+from typing import Dict, Any, List, Optional
 
 from src.ai_write_x.core.base_framework import (
     WorkflowConfig,
@@ -22,7 +24,15 @@ from src.ai_write_x.adapters.platform_adapters import (
 from src.ai_write_x.core.monitoring import WorkflowMonitor
 from src.ai_write_x.config.config import Config
 from src.ai_write_x.core.content_generation import ContentGenerationEngine
+from src.ai_write_x.core.stage_graph import StageGraph
+from src.ai_write_x.tools import hotnews
+from src.ai_write_x.tools.custom_tool import (
+    pinned_template,
+    read_template_file,
+    select_template_files,
+)
 from src.ai_write_x.utils.path_manager import PathManager
+from src.ai_write_x.utils import template_budget, template_slots
 from src.ai_write_x.utils import utils
 from src.ai_write_x.adapters.platform_adapters import PlatformType
 from src.ai_write_x.utils import log
@@ -31,6 +41,57 @@ from src.ai_write_x.utils import log
 from src.ai_write_x.creative.dimensional_engine import DimensionalCreativeEngine
 
 
+# 生成阶段并行执行配置
+PARALLEL_STAGE_CONFIGS = {
+    "enabled": True,  # 关闭后按 内容生成 -> 创意变换 -> 格式化 顺序执行
+    "max_workers": 4,
+    "template_candidates": 1,  # 随机模板时并行填充的候选模板数，按评分选用最优者
+    "design_candidate": False,  # 模板路径下是否同时生成一份 AI 设计稿参与评选
+    "speculative_cover": True,  # 需要发布到微信且没有封面时，与格式化并行预先生成封面
+    "summary_length": 120,  # 摘要最大字数（微信摘要上限）
+}
+
+# 多平台分发配置：基础内容只生成一次，其余平台的转换和格式化并发执行
+PLATFORM_FANOUT_CONFIGS = {
+    "enabled": False,
+    "platforms": [],  # 需要生成版本的平台，为空时使用全部已注册的平台适配器
+    "max_workers": 4,
+}
+
+
+def score_formatted_content(html: str, source: str, min_len: int = 0, max_len: int = 0) -> float:
+    """
+    格式化结果的廉价评分（0~1），用于在多个候选中择优，不调用大模型：
+    - 内容覆盖（0.6）：原文字符二元组在结果文本中的保留比例
+    - 字数（0.2）：纯文本字数在范围内得满分，超出范围按比例扣分
+    - 结构（0.2）：包含 <section>、没有 <style>/<script>、section 标签成对
+    """
+
+    def bigrams(text):
+        return {a + b for a, b in zip(text, text[1:])}
+
+    lower = html.lower()
+    text = re.sub(r"\s+", "", unescape(re.sub(r"<[^>]+>", "", html)))
+    source_grams = bigrams(re.sub(r"\s+", "", utils.markdown_to_plaintext(source or "")))
+    coverage = len(source_grams & bigrams(text)) / len(source_grams) if source_grams else 0.0
+
+    length = len(text)
+    if min_len and length < min_len:
+        length_score = length / min_len
+    elif max_len and length > max_len:
+        length_score = max_len / length
+    else:
+        length_score = 1.0
+
+    structure = (
+        ("<section" in lower)
+        + ("<style" not in lower and "<script" not in lower)
+        + (lower.count("<section") == lower.count("</section>"))
+    ) / 3
+
+    return round(0.6 * coverage + 0.2 * length_score + 0.2 * structure, 4)
+
+
 class UnifiedContentWorkflow:
     """统一的内容工作流编排器"""
 
@@ -145,20 +206,38 @@ class UnifiedContentWorkflow:
             title = topic
 
         try:
-            # 1. 生成基础内容（统一Markdown格式）
-            base_content = self._generate_base_content(
-                topic, publish_platform=publish_platform, **kwargs
-            )
-            log.print_log("[PROGRESS:WRITING:END]", "internal")
+            should_publish = self._should_publish()
+            variant_platforms = self._fanout_platforms(publish_platform)
+            if PARALLEL_STAGE_CONFIGS["enabled"]:
+                # 1~3 按依赖图并发执行（模板读取、摘要、封面等与大模型阶段重叠）
+                (
+                    base_content,
+                    final_content,
+                    transform_content,
+                    cover_path,
+                    variants,
+                ) = self._execute_stages(
+                    topic, title, publish_platform, should_publish, variant_platforms, **kwargs
+                )
+                if cover_path:
+                    kwargs["cover_path"] = cover_path
+            else:
+                # 1. 生成基础内容（统一Markdown格式）
+                base_content = self._generate_base_content(
+                    topic, publish_platform=publish_platform, **kwargs
+                )
+                log.print_log("[PROGRESS:WRITING:END]", "internal")
 
-            # 2. 维度化创意变换
-            log.print_log("[PROGRESS:CREATIVE:START]", "internal")
-            final_content = self._apply_dimensional_creative_transformation(base_content, **kwargs)
-            log.print_log("[PROGRESS:CREATIVE:END]", "internal")
+                # 2. 维度化创意变换
+                final_content = self._creative_stage(base_content, **kwargs)
 
-            # 3. 转换处理（template或design）
+                # 3. 转换处理（template或design）
+                transform_content = self._transform_content(
+                    final_content, publish_platform, **kwargs
+                )
 
-            transform_content = self._transform_content(final_content, publish_platform, **kwargs)
+                # 其余平台的版本
+                variants = self._generate_variants(final_content, variant_platforms, **kwargs)
 
             # 4. 保存（非AI参与）
             log.print_log("[PROGRESS:SAVE:START]", "internal")
@@ -167,11 +246,14 @@ class UnifiedContentWorkflow:
                 article_path = save_result.get("path")
                 kwargs["article_path"] = article_path
                 log.print_log(f"文章《{title}》保存成功！")
+                self._record_generated_topic(topic, transform_content.title)
+                if variants:
+                    save_result["variants"] = self._save_variants(variants, article_path)
             log.print_log("[PROGRESS:SAVE:END]", "internal")
 
             # 5. 可选发布（非AI参与，开关控制）
             publish_result = None
-            if self._should_publish():
+            if should_publish:
                 log.print_log("[PROGRESS:PUBLISH:START]", "internal")
                 publish_result = self._publish_content(
                     transform_content, publish_platform, **kwargs
@@ -184,6 +266,7 @@ class UnifiedContentWorkflow:
                 "base_content": base_content,
                 "final_content": final_content,
                 "formatted_content": transform_content.content,
+                "variants": {platform: variant.content for platform, variant in variants.items()},
                 "save_result": save_result,
                 "publish_result": publish_result,
                 "success": True,
@@ -199,6 +282,240 @@ class UnifiedContentWorkflow:
             duration = time.time() - start_time
             self.monitor.track_execution("unified_workflow", duration, success, {"topic": topic})
 
+    def _creative_stage(self, base_content: ContentResult, **kwargs) -> ContentResult:
+        log.print_log("[PROGRESS:CREATIVE:START]", "internal")
+        final_content = self._apply_dimensional_creative_transformation(base_content, **kwargs)
+        log.print_log("[PROGRESS:CREATIVE:END]", "internal")
+        return final_content
+
+    def _transform_mode(self, publish_platform: str) -> Optional[str]:
+        """格式化路径：template、design，或 None（不需要 AI 转换）"""
+        config = Config.get_instance()
+        adapter = self.platform_adapters.get(publish_platform)
+
+        if not adapter:
+            raise ValueError(f"不支持的平台: {publish_platform}")
+
+        if adapter.supports_html() and config.article_format.upper() == "HTML":
+            if config.use_template and adapter.supports_template():
+                return "template"
+            return "design"
+        return None
+
+    def _execute_stages(
+        self,
+        topic: str,
+        title: str,
+        publish_platform: str,
+        should_publish: bool,
+        variant_platforms: Optional[List[str]] = None,
+        **kwargs,
+    ):
+        """
+        按依赖图执行内容生成到格式化的各阶段，互不依赖的阶段并发执行：
+        基础内容 -> 创意变换 -> 摘要 -> 封面；模板读取与内容生成并行；
+        多个候选（模板填充、设计稿）并行生成后按评分选用；其余平台的版本与格式化并行生成
+        """
+        config = Config.get_instance()
+        settings = PARALLEL_STAGE_CONFIGS
+        mode = self._transform_mode(publish_platform)
+        graph = StageGraph(settings["max_workers"])
+
+        def base_stage(results):
+            content = self._generate_base_content(
+                topic, publish_platform=publish_platform, **kwargs
+            )
+            log.print_log("[PROGRESS:WRITING:END]", "internal")
+            return content
+
+        graph.add("base", base_stage)
+        graph.add("creative", lambda r: self._creative_stage(r["base"], **kwargs), ["base"])
+        graph.add("summary", lambda r: self._extract_summary(r["creative"]), ["creative"], True)
+
+        candidates: List[str] = []
+        if mode == "template":
+            # 模板只选择路径（很快），读取和压缩作为独立阶段与内容生成并行；
+            # 没有可用模板时不预先读取，由工具按原有逻辑处理
+            template_files: List[Optional[str]] = list(
+                select_template_files(settings["template_candidates"], topic)
+            ) or [None]
+            for i, template_file in enumerate(template_files):
+                graph.add(
+                    f"template_{i}",
+                    lambda r, f=template_file: read_template_file(f) if f else None,
+                )
+                graph.add(
+                    f"fill_{i}",
+                    lambda r, i=i: self._fill_template_candidate(
+                        r["creative"], r[f"template_{i}"], **kwargs
+                    ),
+                    ["creative", f"template_{i}"],
+                )
+                candidates.append(f"fill_{i}")
+        if mode == "design" or (mode == "template" and settings["design_candidate"]):
+            graph.add(
+                "design",
+                lambda r: self._apply_design_formatting(r["creative"], publish_platform, **kwargs),
+                ["creative"],
+            )
+            candidates.append("design")
+
+        # 多个候选时单个候选失败不影响整体
+        for name in candidates:
+            graph.stages[name].optional = len(candidates) > 1
+
+        if (
+            should_publish
+            and settings["speculative_cover"]
+            and publish_platform == PlatformType.WECHAT.value
+            and config.img_api_type in ("ali", "picsum")
+        ):
+            graph.add(
+                "cover", lambda r: self._generate_cover(title, r["summary"]), ["summary"], True
+            )
+
+        for platform in variant_platforms or []:
+            graph.add(
+                f"variant_{platform}",
+                lambda r, p=platform: self._variant_stage(r["creative"], p, **kwargs),
+                ["creative"],
+                True,
+            )
+
+        results = graph.run()
+        final_content = results["creative"]
+
+        if candidates:
+            transform_content = self._select_candidate(results, candidates, final_content)
+        else:
+            transform_content = final_content
+
+        if not transform_content.summary and results.get("summary"):
+            transform_content.summary = results["summary"]
+
+        variants = {
+            platform: results[f"variant_{platform}"]
+            for platform in variant_platforms or []
+            if results.get(f"variant_{platform}") is not None
+        }
+        return results["base"], final_content, transform_content, results.get("cover"), variants
+
+    def _fanout_platforms(self, publish_platform: str) -> List[str]:
+        """需要额外生成版本的平台（不含发布平台，其版本即保存的文章本身）"""
+        if not PLATFORM_FANOUT_CONFIGS["enabled"]:
+            return []
+        platforms = PLATFORM_FANOUT_CONFIGS["platforms"] or list(self.platform_adapters)
+        return [p for p in platforms if p != publish_platform and p in self.platform_adapters]
+
+    def _variant_stage(
+        self, content: ContentResult, target_platform: str, **kwargs
+    ) -> ContentResult:
+        """单个平台的版本：需要时先做 AI 转换，再用平台适配器格式化"""
+        transformed = self._transform_content(content, target_platform, **kwargs)
+        adapter = self.platform_adapters[target_platform]
+        formatted = adapter.format_content(transformed, **kwargs)
+        is_html = transformed.content_format == "html" or formatted.lstrip().startswith("<")
+        return ContentResult(
+            title=transformed.title,
+            content=formatted,
+            summary=transformed.summary,
+            content_format="html" if is_html else "text",
+            content_type=transformed.content_type,
+            metadata={"platform": target_platform},
+        )
+
+    def _generate_variants(
+        self, content: ContentResult, platforms: List[str], **kwargs
+    ) -> Dict[str, ContentResult]:
+        """并发生成各平台版本，单个平台失败时跳过"""
+        if not platforms:
+            return {}
+
+        graph = StageGraph(PLATFORM_FANOUT_CONFIGS["max_workers"])
+        for platform in platforms:
+            graph.add(
+                platform,
+                lambda r, p=platform: self._variant_stage(content, p, **kwargs),
+                optional=True,
+            )
+        results = graph.run()
+        return {platform: results[platform] for platform in platforms if results[platform]}
+
+    def _save_variants(
+        self, variants: Dict[str, ContentResult], article_path: str
+    ) -> Dict[str, str]:
+        """各平台版本保存在文章的 .variants 目录下，文件名为平台名"""
+        variants_dir = utils.get_variants_dir(article_path)
+        variants_dir.mkdir(parents=True, exist_ok=True)
+
+        paths = {}
+        for platform, variant in variants.items():
+            extension = "html" if variant.content_format == "html" else "txt"
+            path = variants_dir / f"{platform}.{extension}"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(variant.content)
+            paths[platform] = str(path)
+        log.print_log(f"已保存 {len(paths)} 个平台版本：{', '.join(paths)}")
+        return paths
+
+    def _fill_template_candidate(
+        self, content: ContentResult, template_content: Optional[str], **kwargs
+    ) -> ContentResult:
+        """用预先读取的模板执行模板填充（本线程内 read_template_tool 直接返回该模板）"""
+        token = pinned_template.set(template_content)
+        try:
+            return self._apply_template_formatting(content, **kwargs)
+        finally:
+            pinned_template.reset(token)
+
+    def _select_candidate(
+        self, results: Dict[str, Any], candidates: List[str], source: ContentResult
+    ) -> ContentResult:
+        """按 score_formatted_content 选出最优候选，分数相同时取先声明的"""
+        available = [name for name in candidates if results.get(name) is not None]
+        if not available:
+            raise RuntimeError("所有格式化候选均生成失败")
+        if len(available) == 1:
+            return results[available[0]]
+
+        config = Config.get_instance()
+        scores = {
+            name: score_formatted_content(
+                results[name].content,
+                source.content,
+                config.min_article_len,
+                config.max_article_len,
+            )
+            for name in available
+        }
+        best = max(available, key=lambda name: scores[name])
+        log.print_log(
+            "格式化候选评分："
+            + "，".join(f"{name}={score:.3f}" for name, score in scores.items())
+            + f"，选用 {best}"
+        )
+        return results[best]
+
+    def _extract_summary(self, content: ContentResult) -> str:
+        """摘要：优先使用解析得到的摘要，否则取正文纯文本的开头"""
+        if content.summary:
+            return content.summary
+        text = utils.markdown_to_plaintext(content.content or "")
+        if content.content_format == "html":
+            text = unescape(re.sub(r"<[^>]+>", "", content.content or ""))
+        text = re.sub(r"\s+", " ", text).strip()
+        limit = PARALLEL_STAGE_CONFIGS["summary_length"]
+        return text[:limit]
+
+    def _generate_cover(self, title: str, summary: Optional[str]) -> Optional[str]:
+        """预先生成微信封面（与发布时自动生成封面的提示词相同），发布时直接使用"""
+        from src.ai_write_x.tools.wx_publisher import WeixinPublisher
+
+        publisher = WeixinPublisher("", "", "")
+        return publisher.generate_img(
+            "主题:" + title.split("|")[-1] + ",内容:" + (summary or ""), "900*384"
+        )
+
     def _transform_content(
         self, content: ContentResult, publish_platform: str, **kwargs
     ) -> ContentResult:
@@ -219,22 +536,51 @@ class UnifiedContentWorkflow:
             return content
 
     def _apply_template_formatting(self, content: ContentResult, **kwargs) -> ContentResult:
-        """Template路径：使用AI填充本地模板"""
-        # 创建专门的模板处理工作流
+        """Template路径：优先按槽位在本地填充模板，模板不适合时使用AI填充"""
         log.print_log("[PROGRESS:TEMPLATE:START]", "internal")
 
-        template_config = self._get_template_workflow_config(**kwargs)
-        engine = ContentGenerationEngine(template_config)
+        template_content = pinned_template.get()
+        if template_content is None and template_slots.TEMPLATE_SLOT_CONFIGS["enabled"]:
+            template_files = select_template_files(text=f"{content.title}\n{content.content}")
+            if template_files:
+                template_content = read_template_file(template_files[0])
 
-        input_data = {
-            "content": content.content,
-            "title": content.title,
-            "parse_result": False,
-            "content_format": "html",
-            **kwargs,
-        }
+        filled = (
+            template_slots.fill_template(template_content, content.content, content.title)
+            if template_content
+            else None
+        )
+        if filled is not None:
+            log.print_log("模板已按槽位在本地填充")
+            ret = ContentResult(
+                title=content.title,
+                content=filled,
+                summary=content.summary,
+                content_format="html",
+                content_type=content.content_type,
+                metadata={**content.metadata, "template_fill": "slots"},
+            )
+        else:
+            # 创建专门的模板处理工作流；已选定的模板固定给 read_template_tool，避免重新选择
+            template_config = self._get_template_workflow_config(**kwargs)
+            engine = ContentGenerationEngine(template_config)
+
+            input_data = {
+                "content": content.content,
+                "title": content.title,
+                "parse_result": False,
+                "content_format": "html",
+                **kwargs,
+            }
 
-        ret = engine.execute_workflow(input_data)
+            token = pinned_template.set(template_content)
+            try:
+                ret = engine.execute_workflow(input_data)
+            finally:
+                pinned_template.reset(token)
+
+        # 还原模板预处理时折叠的重复样式
+        ret.content = template_budget.expand_styles(ret.content)
         log.print_log("[PROGRESS:TEMPLATE:END]", "internal")
 
         return ret
@@ -488,6 +834,21 @@ class UnifiedContentWorkflow:
 
         return {"success": True, "path": save_path, "title": title, "format": config.article_format}
 
+    def _record_generated_topic(self, topic: str, title: str):
+        """记录已生成的话题和标题，热搜模式选题时跳过近似重复的话题"""
+        if not hotnews.HOTNEWS_CONFIGS["dedup_enabled"]:
+            return
+        try:
+            # 与选题时使用同一个入口：应用相似度阈值、保留天数配置，并在首次使用时回填已保存的文章
+            index = hotnews.get_topic_index()
+            if index is None:
+                return
+            index.add(topic)
+            if title and title != topic:
+                index.add(title)
+        except Exception as e:
+            log.print_log(f"记录已生成话题失败: {str(e)}", "warning")
+
     def _get_save_path(self, title: str, file_extension: str) -> str:
         """获取保存路径"""
 
@@ -511,8 +872,10 @@ class UnifiedContentWorkflow:
         if not adapter:
             return {"success": False, "message": f"不支持的平台: {publish_platform}"}
 
-        # 将 cover_path 传递给适配器
-        kwargs["cover_path"] = utils.get_cover_path(kwargs.get("article_path"))
+        # 将 cover_path 传递给适配器：已设计的封面优先，其次是预先生成的封面
+        kwargs["cover_path"] = utils.get_cover_path(kwargs.get("article_path")) or kwargs.get(
+            "cover_path"
+        )
 
         # 使用平台适配器发布
         # 适配器内部会自动保存发布记录
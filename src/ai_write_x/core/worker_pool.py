@@ -0,0 +1,409 @@
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from src.ai_write_x.utils import log
+
+
+# 常驻工作进程池配置
+WORKER_POOL_CONFIGS = {
+    "enabled": True,  # 关闭后回退为每个任务启动一个新进程
+    "size": 1,  # 常驻工作进程数
+    "max_tasks_per_worker": 20,  # 执行多少个任务后回收重建
+    "max_rss_mb": 2048,  # 常驻内存超过该值（MB）后回收重建，0 表示不检查
+}
+
+
+def _rss_mb() -> float:
+    """当前进程常驻内存（MB）；没有 psutil 时用 getrusage 的峰值近似，都不可用返回 0"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return 0.0
+
+
+# ==================== 工作进程 ====================
+
+
+def _pool_event(log_queue, event, **data):
+    """进程池控制消息与日志走同一个队列，保证任务日志先于 done 事件到达"""
+    log_queue.put({"type": "pool", "event": event, "timestamp": time.time(), **data})
+
+
+def _pool_worker_main(
+    task_queue, log_queue, base_config, aiforge_config, max_tasks, max_rss_mb, token_listeners=None
+):
+    """
+    常驻工作进程：启动时导入 crewai 等重量级依赖并初始化一次工作流，
+    之后循环接收任务；达到任务数或内存上限时主动退出，由进程池重建
+    """
+    from src.ai_write_x.config.config import Config
+
+    # 之后的日志和进程池事件都经批量传输发送，保证顺序
+    log_queue = log.setup_process_logging(log_queue)
+    log.set_process_queue(log_queue)
+    log.set_token_listeners(token_listeners)
+
+    config = Config.get_instance()
+    config.config = base_config
+    config.aiforge_config = aiforge_config
+
+    try:
+        from src.ai_write_x.crew_main import run
+        from src.ai_write_x.core.system_init import setup_aiwritex
+
+        # 预热：工具注册、平台适配器和创意引擎的初始化在首个任务前完成
+        setup_aiwritex()
+    except Exception as e:
+        _pool_event(log_queue, "error", error=str(e))
+        return
+
+    _pool_event(log_queue, "ready", pid=os.getpid())
+
+    tasks_done = 0
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        inputs, environ, base_config, aiforge_config, config_data = task
+        try:
+            os.environ.update(environ)
+            config.config = base_config
+            config.aiforge_config = aiforge_config
+            for key, value in (config_data or {}).items():
+                if key != "env_file_path":
+                    setattr(config, key, value)
+
+            log.print_log(f"任务参数：API类型={config.api_type}，模型={config.api_model} ", "status")
+            result = run(inputs)
+            log_queue.put(
+                {
+                    "type": "internal",
+                    "message": "任务执行完成",
+                    "result": result,
+                    "timestamp": time.time(),
+                }
+            )
+        except Exception as e:
+            log_queue.put({"type": "error", "message": str(e), "timestamp": time.time()})
+            log_queue.put(
+                {
+                    "type": "internal",
+                    "message": "任务执行失败",
+                    "error": str(e),
+                    "timestamp": time.time(),
+                }
+            )
+        finally:
+            try:
+                sys.stdout.flush()
+            except Exception:
+                pass
+
+        tasks_done += 1
+        rss = _rss_mb()
+        recycle = tasks_done >= max_tasks or bool(max_rss_mb and rss > max_rss_mb)
+        _pool_event(log_queue, "done", recycle=recycle, rss_mb=round(rss, 1))
+        if recycle:
+            break
+
+
+# ==================== 进程池 ====================
+
+
+class PooledTask:
+    """
+    提交到进程池的任务，提供与 multiprocessing.Process 相同的接口
+    （start / is_alive / exitcode / join / terminate / kill），
+    可以直接替换 ai_write_x_run 返回的进程对象。
+    log_queue 在创建时即可读取，工作进程的日志由进程池转发到这里
+    """
+
+    def __init__(self, pool: "WorkerPool", task):
+        self._pool = pool
+        self._task = task
+        self._worker: Optional["_PoolWorker"] = None
+        self._done = threading.Event()
+        self._started = False
+        self.exitcode: Optional[int] = None
+        self.log_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    @property
+    def pid(self):
+        return self._worker.process.pid if self._worker else None
+
+    def start(self):
+        if self._started:
+            raise RuntimeError("任务已经启动")
+        self._started = True
+        self._pool._enqueue(self)
+
+    def is_alive(self) -> bool:
+        return self._started and not self._done.is_set()
+
+    def join(self, timeout: Optional[float] = None):
+        self._done.wait(timeout)
+
+    def terminate(self):
+        """硬取消：终止正在执行该任务的工作进程，进程池随后补充新的工作进程"""
+        self._pool._cancel(self, force=False)
+
+    def kill(self):
+        self._pool._cancel(self, force=True)
+
+    def _finish(self, exitcode: int):
+        if not self._done.is_set():
+            self.exitcode = exitcode
+            self._done.set()
+
+
+class _PoolWorker:
+    def __init__(self, process, task_queue, log_queue):
+        self.process = process
+        self.task_queue = task_queue
+        self.log_queue = log_queue
+        self.ready = False
+        self.retired = False
+        self.task: Optional[PooledTask] = None
+        self.started_at = time.time()
+        self.tasks_done = 0
+
+
+class WorkerPool:
+    """
+    常驻、预热的生成工作进程池
+
+    - 工作进程启动时完成重量级导入和工作流初始化，之后通过任务队列接收任务
+    - 每个工作进程一个转发线程：把日志转发到当前任务的 log_queue，并处理 ready/done 事件
+    - 工作进程执行 max_tasks_per_worker 个任务或内存超过 max_rss_mb 后退出并重建
+    - terminate()/kill() 直接结束执行任务的工作进程，之后补充新的工作进程
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or WORKER_POOL_CONFIGS["size"]
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[_PoolWorker] = []
+        self._pending: Deque[PooledTask] = deque()
+        self._pool_lock = threading.RLock()
+        self._running = False
+        self._base_config: Dict[Any, Any] = {}
+        self._aiforge_config: Dict[Any, Any] = {}
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def start(self):
+        """启动并预热工作进程（已启动时只补足数量）"""
+        from src.ai_write_x.config.config import Config
+
+        config = Config.get_instance()
+        with self._pool_lock:
+            self._base_config = config.get_config()
+            self._aiforge_config = config.aiforge_config
+            self._running = True
+            while len(self._workers) < self.size:
+                self._spawn_worker()
+
+    def shutdown(self, timeout=5.0):
+        with self._pool_lock:
+            self._running = False
+            workers, self._workers = self._workers, []
+            pending, self._pending = list(self._pending), deque()
+        for task in pending:
+            task._finish(-15)
+        for worker in workers:
+            worker.retired = True
+            try:
+                worker.task_queue.put(None)
+            except Exception:
+                pass
+        deadline = time.time() + timeout
+        for worker in workers:
+            worker.process.join(max(0.0, deadline - time.time()))
+            if worker.process.is_alive():
+                worker.process.kill()
+            if worker.task is not None:
+                worker.task._finish(-15)
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._pool_lock:
+            return [
+                {
+                    "pid": w.process.pid,
+                    "ready": w.ready,
+                    "busy": w.task is not None,
+                    "tasks_done": w.tasks_done,
+                    "uptime": round(time.time() - w.started_at, 1),
+                }
+                for w in self._workers
+            ]
+
+    def submit(self, inputs, base_config, aiforge_config, config_data=None) -> PooledTask:
+        """创建任务，调用 start() 后由第一个空闲的工作进程执行"""
+        if not self._running or not self._workers:
+            self.start()
+        environ = dict(os.environ)
+        return PooledTask(self, (inputs, environ, base_config, aiforge_config, config_data))
+
+    # ---------- 内部实现 ----------
+
+    def _spawn_worker(self):
+        task_queue = self._context.Queue()
+        log_queue = self._context.Queue()
+        process = self._context.Process(
+            target=_pool_worker_main,
+            args=(
+                task_queue,
+                log_queue,
+                self._base_config,
+                self._aiforge_config,
+                WORKER_POOL_CONFIGS["max_tasks_per_worker"],
+                WORKER_POOL_CONFIGS["max_rss_mb"],
+                log.get_token_listeners(),
+            ),
+            daemon=True,
+        )
+        process.start()
+        worker = _PoolWorker(process, task_queue, log_queue)
+        self._workers.append(worker)
+        threading.Thread(
+            target=self._forward, args=(worker,), name="worker-pool-forward", daemon=True
+        ).start()
+
+    def _enqueue(self, task: PooledTask):
+        with self._pool_lock:
+            self._pending.append(task)
+            self._assign()
+
+    def _assign(self):
+        """把等待中的任务分配给已就绪的空闲工作进程（需持有 _pool_lock）"""
+        for worker in self._workers:
+            if not self._pending:
+                return
+            if worker.ready and worker.task is None and not worker.retired:
+                task = self._pending.popleft()
+                worker.task = task
+                task._worker = worker
+                worker.task_queue.put(task._task)
+
+    def _cancel(self, task: PooledTask, force: bool):
+        with self._pool_lock:
+            if task in self._pending:
+                self._pending.remove(task)
+                task._finish(-15)
+                return
+            worker = task._worker
+            if worker is None or worker.task is not task:
+                return
+            if force:
+                worker.process.kill()
+            else:
+                worker.process.terminate()
+            worker.process.join(timeout=2.0)
+            self._retire(worker, worker.process.exitcode or -15)
+
+    def _retire(self, worker: _PoolWorker, exitcode: int, respawn: bool = True):
+        """移除工作进程，结束其正在执行的任务，并在进程池运行时补充新进程（需持有 _pool_lock）"""
+        if worker.retired:
+            return
+        worker.retired = True
+        if worker in self._workers:
+            self._workers.remove(worker)
+        if worker.task is not None:
+            worker.task._finish(exitcode)
+            worker.task = None
+        if respawn and self._running:
+            self._spawn_worker()
+
+    def _fail_pending(self, error: str):
+        """没有可用的工作进程时，让等待中的任务以失败结束"""
+        while self._pending:
+            task = self._pending.popleft()
+            task.log_queue.put({"type": "error", "message": error, "timestamp": time.time()})
+            task.log_queue.put(
+                {
+                    "type": "internal",
+                    "message": "任务执行失败",
+                    "error": error,
+                    "timestamp": time.time(),
+                }
+            )
+            task._finish(1)
+
+    def _forward(self, worker: _PoolWorker):
+        """转发线程：日志交给当前任务，进程池事件更新工作进程状态；工作进程退出后结束"""
+        while True:
+            try:
+                frame = worker.log_queue.get(timeout=0.5)
+            except queue.Empty:
+                if worker.process.is_alive():
+                    continue
+                # 进程已退出且队列为空：意外退出（崩溃、被系统结束）时补充新进程
+                with self._pool_lock:
+                    if not worker.retired:
+                        exitcode = worker.process.exitcode
+                        log.print_log(f"工作进程已退出(exitcode={exitcode})，正在重建", "warning")
+                        self._retire(worker, exitcode or -1)
+                        self._assign()
+                return
+            except (OSError, ValueError, EOFError):
+                return
+
+            for msg in log.unpack_messages(frame):
+                self._handle_message(worker, msg)
+
+    def _handle_message(self, worker: _PoolWorker, msg: Dict[str, Any]):
+        """日志交给当前任务，进程池事件更新工作进程状态"""
+        if msg.get("type") != "pool":
+            task = worker.task
+            if task is not None:
+                task.log_queue.put(msg)
+            return
+
+        with self._pool_lock:
+            event = msg.get("event")
+            if event == "ready":
+                worker.ready = True
+            elif event == "done":
+                worker.tasks_done += 1
+                if worker.task is not None:
+                    worker.task._finish(0)
+                    worker.task = None
+                if msg.get("recycle"):
+                    # 工作进程会自行退出，先移出进程池并补充新进程
+                    self._retire(worker, 0)
+            elif event == "error":
+                log.print_log(f"工作进程初始化失败：{msg.get('error')}", "error")
+                self._retire(worker, 1, respawn=False)
+                if not self._workers:
+                    self._fail_pending(f"工作进程初始化失败：{msg.get('error')}")
+            self._assign()
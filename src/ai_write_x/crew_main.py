@@ -1,5 +1,7 @@
 #!/usr/bin/env python
+import argparse
 import os
+import queue
 import warnings
 import multiprocessing
 import signal
@@ -12,6 +14,7 @@ from src.ai_write_x.utils import utils
 from src.ai_write_x.utils import log
 from src.ai_write_x.config.config import Config
 from src.ai_write_x.core.system_init import setup_aiwritex
+from src.ai_write_x.core.worker_pool import WorkerPool, WORKER_POOL_CONFIGS
 
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
@@ -22,10 +25,13 @@ os.environ["OTEL_SDK_DISABLED"] = "true"
 os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
 
 
-def run_crew_in_process(inputs, log_queue, base_config, aiforge_config, config_data=None):
-    """在独立进程中运行 CrewAI 工作流"""
+def run_crew_in_process(
+    inputs, log_queue, base_config, aiforge_config, config_data=None, token_listeners=None
+):
+    """在独立进程中运行 CrewAI 工作流，token_listeners 为流式输出接收标志（交互生成时传入）"""
 
     env_file_path = ""
+    transport = log_queue
     try:
         # 设置信号处理器
         def signal_handler(signum, frame):
@@ -37,10 +43,12 @@ def run_crew_in_process(inputs, log_queue, base_config, aiforge_config, config_d
         signal.signal(signal.SIGTERM, signal_handler)
         signal.signal(signal.SIGINT, signal_handler)
 
-        # 设置进程专用日志系统
-        log.setup_process_logging(log_queue)
+        # 设置进程专用日志系统（之后的日志和控制消息都经批量传输发送，保证顺序；
+        # 信号处理器中不经过批量传输，直接写入队列）
+        transport = log.setup_process_logging(log_queue)
         # 设置进程间日志队列
-        log.set_process_queue(log_queue)
+        log.set_process_queue(transport)
+        log.set_token_listeners(token_listeners)
 
         # 恢复环境变量
         env_file_path = None
@@ -77,7 +85,7 @@ def run_crew_in_process(inputs, log_queue, base_config, aiforge_config, config_d
         result = run(inputs)
 
         # 发送成功消息
-        log_queue.put(
+        transport.put(
             {
                 "type": "internal",
                 "message": "任务执行完成",
@@ -88,10 +96,10 @@ def run_crew_in_process(inputs, log_queue, base_config, aiforge_config, config_d
 
     except Exception as e:
         # 发送失败消息到队列
-        log_queue.put({"type": "error", "message": str(e), "timestamp": time.time()})
+        transport.put({"type": "error", "message": str(e), "timestamp": time.time()})
 
         # 发送internal类型的失败标记
-        log_queue.put(
+        transport.put(
             {
                 "type": "internal",
                 "message": "任务执行失败",
@@ -169,12 +177,29 @@ def ai_write_x_run(config_data=None):
         "reference_ratio": reference_ratio,
     }
 
-    if config_data:
+    if config_data and WORKER_POOL_CONFIGS["enabled"]:
+        # 交给常驻工作进程执行，省去每个任务重新启动进程和导入依赖的时间
+        try:
+            task = WorkerPool.get_instance().submit(
+                inputs, config.get_config(), config.aiforge_config, config_data
+            )
+            return task, task.log_queue
+        except Exception as e:
+            log.print_log(str(e), "error")
+            return None, None
+    elif config_data:
         try:
             log_queue = multiprocessing.Queue()
             process = multiprocessing.Process(
                 target=run_crew_in_process,
-                args=(inputs, log_queue, config.get_config(), config.aiforge_config, config_data),
+                args=(
+                    inputs,
+                    log_queue,
+                    config.get_config(),
+                    config.aiforge_config,
+                    config_data,
+                    log.get_token_listeners(),
+                ),
                 daemon=False,
             )
             return process, log_queue
@@ -212,8 +237,8 @@ def ai_write_x_main(config_data=None):
     task_model = "自定义" if not config.platform else "热搜随机"
     log.print_log(f"开始执行任务，话题模式：{task_model}")
 
-    # 保存环境变量到临时文件
-    if config_data:
+    # 保存环境变量到临时文件（常驻工作进程直接随任务接收环境变量，不需要）
+    if config_data and not WORKER_POOL_CONFIGS["enabled"]:
         env_file = PathManager.get_temp_dir() / f"env_{os.getpid()}.json"
         try:
             with open(env_file, "w", encoding="utf-8") as f:
@@ -236,6 +261,80 @@ def ai_write_x_main(config_data=None):
     return ai_write_x_run(config_data=config_data)
 
 
+def ai_write_x_batch(topics=None, hot_count=0, max_workers=None):
+    """批量生成入口（非 UI）：topics 为自定义话题列表，hot_count 为额外从热榜选取的话题数"""
+    from src.ai_write_x.core.batch_generation import BatchRunner, build_batch_tasks
+
+    config = Config.get_instance()
+    if not config.load_config():
+        log.print_log("加载配置失败，请检查是否有配置！", "error")
+        return None
+
+    if not config.validate_config():
+        log.print_log(f"配置填写有错误：{config.error_message}", "error")
+        return None
+
+    os.environ[config.api_key_name] = config.api_key
+    os.environ["MODEL"] = config.api_model
+    os.environ["OPENAI_API_BASE"] = config.api_apibase
+
+    tasks = build_batch_tasks(config, topics, hot_count)
+    if not tasks:
+        log.print_log("没有可执行的话题", "error")
+        return None
+
+    runner = BatchRunner(tasks, max_workers)
+    runner.start()
+    subscriber = runner.subscribe()
+    try:
+        while True:
+            try:
+                msg = subscriber.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if msg is None:
+                break
+            if msg.get("type") != "internal":
+                print(f"[{msg.get('task_id', '')}] {msg.get('message', '')}")
+    except KeyboardInterrupt:
+        log.print_log("正在取消批量任务...", "warning")
+        runner.cancel()
+        runner.wait(10)
+        runner.wait_drained(5)
+
+    summary = runner.summary()
+    log.print_log(
+        f"批量生成结束：{summary['counts']}，耗时 {summary['elapsed']:.1f}s", "status"
+    )
+    for item in summary["results"]:
+        log.print_log(
+            f"  [{item['task_id']}] {item['status']:<9} {item['duration']:>7.1f}s  "
+            f"{item['title'] or item['topic']}  {item['path'] or item['error']}"
+        )
+    return summary
+
+
 if __name__ == "__main__":
     if not utils.get_is_release_ver():
-        ai_write_x_main()
+        parser = argparse.ArgumentParser(description="AIWriteX 内容生成")
+        parser.add_argument("--batch-topics", default="", help="批量生成的话题，用 | 分隔")
+        parser.add_argument("--hot", type=int, default=0, help="批量生成时额外从热榜选取的话题数")
+        parser.add_argument("--workers", type=int, default=None, help="批量生成的最大并发进程数")
+        parser.add_argument(
+            "--llm-cache",
+            choices=["off", "read-write", "read-only"],
+            default=None,
+            help="LLM 响应缓存模式（read-only 为只回放缓存，不调用大模型）",
+        )
+        args = parser.parse_args()
+        if args.llm_cache:
+            # 通过环境变量传给生成子进程
+            os.environ["AIWRITEX_LLM_CACHE"] = args.llm_cache
+
+        if args.batch_topics or args.hot:
+            multiprocessing.set_start_method("spawn", force=True)
+            ai_write_x_batch(
+                [t for t in args.batch_topics.split("|") if t.strip()], args.hot, args.workers
+            )
+        else:
+            ai_write_x_main()
@@ -1,21 +1,71 @@
 import os
-import glob
-import random
 import sys
-from typing import List, Type
+from contextvars import ContextVar
+from typing import List, Optional, Type
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from src.ai_write_x.utils import utils
 from src.ai_write_x.config.config import Config
 from src.ai_write_x.utils import log
 from src.ai_write_x.tools import search_template
+from src.ai_write_x.utils import template_classifier
+from src.ai_write_x.utils.template_registry import TemplateRegistry
 from src.ai_write_x.utils.path_manager import PathManager
 
 from aiforge import AIForgeEngine
 
 
+# 调用方预先选定并读取好的模板内容（并行填充多个候选模板时，每个线程各自设置）
+pinned_template: ContextVar[Optional[str]] = ContextVar("pinned_template", default=None)
+
+
+def select_template_files(count: int = 1, text: str = "") -> List[str]:
+    """
+    按配置选择模板文件：指定的模板存在时只返回该模板；
+    否则传入话题/文章内容时按相似度选择（未选分类时先判断分类），
+    不传时从所选分类（未选分类时为全部分类）中随机选择，最多 count 个不重复的模板
+    """
+    config = Config.get_instance()
+    registry = TemplateRegistry.get_instance()
+
+    # 根据custom_topic是否为空选择配置源
+    if config.custom_topic:
+        # 使用自定义话题的模板配置
+        template_category = config.custom_template_category
+        template = config.custom_template
+    else:
+        # 使用应用配置
+        template_category = config.template_category
+        template = config.template
+
+    # 如果指定了具体模板且存在，则不随机（随机模板的条件是""）
+    # 实际上选择了模板，也一定选择了分类
+    if template and template_category:
+        entry = registry.find(template_category, template)
+        if entry is not None:
+            return [entry.path]
+
+    if text and template_classifier.TEMPLATE_CLASSIFIER_CONFIGS["enabled"]:
+        try:
+            classifier = template_classifier.TemplateClassifier.get_instance()
+            ranked = classifier.rank_templates(text, template_category or None)
+            if ranked:
+                log.print_log(f"按话题选择模板：{ranked[0][0].category}/{ranked[0][0].name}")
+                return [entry.path for entry, _ in ranked[: max(count, 1)]]
+        except Exception as e:
+            log.print_log(f"按话题选择模板失败，改为随机选择: {str(e)}", "warning")
+
+    # 指定了分类时在分类中随机，否则（随机分类或未指定分类）从所有分类的模板中随机
+    entries = registry.choose(template_category or None, count)
+    return [entry.path for entry in entries]
+
+
+def read_template_file(template_file: str) -> str:
+    """读取预处理（按配置压缩、折叠重复样式）后的模板，同一模板只预处理一次"""
+    return TemplateRegistry.get_instance().read(template_file, Config.get_instance().use_compress)
+
+
 class ReadTemplateToolInput(BaseModel):
     pass
 
@@ -29,68 +79,15 @@ class ReadTemplateTool(BaseTool):
     args_schema: Type[BaseModel] = ReadTemplateToolInput
 
     def _run(self) -> str:
-        config = Config.get_instance()
-
-        # 获取模板文件的绝对路径
-        template_dir_abs = PathManager.get_template_dir()
-
-        # 根据custom_topic是否为空选择配置源
-        if config.custom_topic:
-            # 使用自定义话题的模板配置
-            template_category = config.custom_template_category
-            template = config.custom_template
-        else:
-            # 使用应用配置
-            template_category = config.template_category
-            template = config.template
-
-        random_template = True
-        selected_template_file: str = ""
-
-        # 如果指定了具体模板且存在，则不随机
-        if template and template != "":  # 随机模板的条件是""
-            template_filename = template if template.endswith(".html") else f"{template}.html"
-
-            # 如果指定了分类，在分类目录下查找
-            if template_category and template_category != "":  # 实际上选则了模板，也一定选择了分类
-                category_dir = os.path.join(template_dir_abs, template_category)
-                selected_template_file = os.path.join(category_dir, template_filename)
-
-            if os.path.exists(path=selected_template_file):
-                random_template = False
-
-        # 需要随机选择模板
-        if random_template:
-            # 排除的目录
-            excluded_dirs = {"components", "__pycache__", ".git"}
-
-            # 如果指定了分类且不是随机分类
-            if template_category and template_category != "":
-                category_dir = os.path.join(template_dir_abs, template_category)
-                template_files_abs = glob.glob(os.path.join(category_dir, "*.html"))
-            else:
-                # 随机分类或未指定分类，从所有分类的模板中选择
-                template_files_abs = []
-                for category_dir in os.listdir(template_dir_abs):
-                    category_path = os.path.join(template_dir_abs, category_dir)
-                    if os.path.isdir(category_path) and category_dir not in excluded_dirs:
-                        template_files_abs.extend(glob.glob(os.path.join(category_path, "*.html")))
-
-            if not template_files_abs:
+        template_content = pinned_template.get()
+        if template_content is None:
+            template_files = select_template_files()
+            if not template_files:
                 log.print_log(
-                    f"在目录 '{template_dir_abs}' 中未找到任何模板文件。如果没有模板请将config.yaml中的use_template设置为false"
+                    f"在目录 '{PathManager.get_template_dir()}' 中未找到任何模板文件。如果没有模板请将config.yaml中的use_template设置为false"  # noqa 501
                 )
                 sys.exit(1)
-
-            selected_template_file = random.choice(template_files_abs)
-
-        with open(selected_template_file, "r", encoding="utf-8") as file:
-            selected_template_content = file.read()
-
-        template_content = utils.compress_html(
-            selected_template_content,
-            config.use_compress,
-        )
+            template_content = read_template_file(template_files[0])
 
         log.print_log("模板填充适配处理比较耗时，请耐心等待...")
         return f"""
@@ -109,6 +106,7 @@ class ReadTemplateTool(BaseTool):
         - 当新内容比原模板内容长或短时，合理调整，不破坏布局
         - 保持原有的强调部分（粗体、斜体、高亮等）应用于新内容的相应部分
         - 保持图片位置不变
+        - style 属性中形如 @s1a2b3c 的标记是重复样式的简写，必须原样保留在对应元素上
         4. 严格禁止：
         - 不添加新的style标签或外部CSS
         - 不改变原有的色彩方案（限制在三种色系内）
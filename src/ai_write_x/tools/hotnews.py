@@ -12,10 +12,15 @@
 
 import requests
 import random
-from typing import Any, Optional, List, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Optional, List, Dict, Tuple
 from bs4 import BeautifulSoup
 
 from src.ai_write_x.utils import log
+from src.ai_write_x.utils.hotnews_store import HotNewsStore
+from src.ai_write_x.utils.topic_index import TopicIndex
 
 # 平台名称映射
 PLATFORMS = [
@@ -38,6 +43,20 @@ ZHIWEI_PLATFORMS = [p["zhiwei_id"] for p in PLATFORMS if p["zhiwei_id"]]
 # tophub 支持的平台
 TOPHUB_PLATFORMS = [p["tophub_id"] for p in PLATFORMS if p["tophub_id"]]
 
+# 热搜聚合配置
+HOTNEWS_CONFIGS = {
+    "cache_ttl": 300,  # 热榜缓存有效期（秒）
+    "failure_ttl": 30,  # 获取失败时的缓存有效期（秒），避免接口不可用时每次都等待超时
+    "request_timeout": 10,  # 单个接口请求超时（秒）
+    "max_workers": 8,  # 并发请求各数据源的线程数
+    "prefetch_enabled": True,  # Web 服务运行时是否在后台定时预取热榜
+    "prefetch_interval": 300,  # 后台预取间隔（秒）
+    "snapshot_max_age": 900,  # 选题时可直接使用的快照最大时长（秒），更旧则实时请求
+    "dedup_enabled": True,  # 选题时是否跳过与已生成文章近似重复的话题
+    "dedup_threshold": 0.5,  # 近似重复的相似度阈值（字符二元组 Jaccard）
+    "dedup_retention_days": 30,  # 只与最近多少天内生成过的话题比较
+}
+
 
 def get_zhiwei_hotnews(platform: str) -> Optional[List[Dict]]:
     """
@@ -51,7 +70,9 @@ def get_zhiwei_hotnews(platform: str) -> Optional[List[Dict]]:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",  # noqa 501
             "Referer": "https://trends.zhiweidata.com/",
         }
-        response = requests.get(api_url, headers=headers, timeout=10)
+        response = requests.get(
+            api_url, headers=headers, timeout=HOTNEWS_CONFIGS["request_timeout"]
+        )
         response.raise_for_status()
 
         data = response.json()
@@ -70,49 +91,70 @@ def get_zhiwei_hotnews(platform: str) -> Optional[List[Dict]]:
         return None
 
 
-def get_tophub_hotnews(platform: str, cnt: int = 10) -> Optional[List[Dict]]:
+def get_tophub_index() -> Optional[Dict[str, List[Dict]]]:
     """
-    获取 tophub.today 的热点数据
-    参数 platform: 平台名称（中文，如“微博”）
-    参数 tophub_id: tophub.today 的平台标识（如 s.weibo.com, zhihu.com）
-    参数 cnt: 返回的新闻数量
-    返回格式: 列表数据，每个元素为热点条目字典，包含 name, rank, lastCount
+    获取 tophub.today 首页并一次解析出所有平台的热榜
+    返回格式: {平台名称: [热点条目字典, ...]}，条目包含 name, rank, lastCount, url
     """
     api_url = "https://tophub.today/"
     try:
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",  # noqa 501
         }
-        response = requests.get(api_url, headers=headers, timeout=10)
+        response = requests.get(
+            api_url, headers=headers, timeout=HOTNEWS_CONFIGS["request_timeout"]
+        )
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        platform_divs = soup.find_all("div", class_="cc-cd")
-
-        for div in platform_divs:
-            platform_span = div.find("div", class_="cc-cd-lb").find("span")  # type: ignore
-            if platform_span and platform_span.text.strip() == platform:  # type: ignore
-                news_items = div.find_all("div", class_="cc-cd-cb-ll")[:cnt]  # type: ignore
-                hotnews = []
-                for item in news_items:
-                    rank = item.find("span", class_="s").text.strip()  # type: ignore
-                    title = item.find("span", class_="t").text.strip()  # type: ignore
-                    engagement = item.find("span", class_="e")  # type: ignore
-                    last_count = engagement.text.strip() if engagement else "0"
-                    hotnews.append(
-                        {
-                            "name": title,
-                            "rank": int(rank),
-                            "lastCount": last_count,
-                            "url": item.find("a")["href"] if item.find("a") else "",  # type: ignore
-                        }
-                    )
-                return hotnews
-        return None
+        return parse_tophub_index(response.text)
     except Exception as e:  # noqa 841
         return None
 
 
+def parse_tophub_index(page_html: str) -> Dict[str, List[Dict]]:
+    """解析 tophub 首页，同名平台只保留第一个榜单"""
+    soup = BeautifulSoup(page_html, "html.parser")
+    index: Dict[str, List[Dict]] = {}
+    for div in soup.find_all("div", class_="cc-cd"):
+        try:
+            platform_span = div.find("div", class_="cc-cd-lb").find("span")  # type: ignore
+            if not platform_span:
+                continue
+            platform = platform_span.text.strip()  # type: ignore
+            if platform in index:
+                continue
+
+            hotnews = []
+            for item in div.find_all("div", class_="cc-cd-cb-ll"):  # type: ignore
+                rank = item.find("span", class_="s").text.strip()  # type: ignore
+                title = item.find("span", class_="t").text.strip()  # type: ignore
+                engagement = item.find("span", class_="e")  # type: ignore
+                last_count = engagement.text.strip() if engagement else "0"
+                hotnews.append(
+                    {
+                        "name": title,
+                        "rank": int(rank),
+                        "lastCount": last_count,
+                        "url": item.find("a")["href"] if item.find("a") else "",  # type: ignore
+                    }
+                )
+            index[platform] = hotnews
+        except Exception:
+            continue
+    return index
+
+
+def get_tophub_hotnews(platform: str, cnt: int = 10) -> Optional[List[Dict]]:
+    """
+    获取 tophub.today 的热点数据（首页解析结果在缓存有效期内共享）
+    参数 platform: 平台名称（中文，如“微博”）
+    参数 cnt: 返回的新闻数量
+    返回格式: 列表数据，每个元素为热点条目字典，包含 name, rank, lastCount
+    """
+    hotnews = (HotNewsAggregator.get_instance().get_tophub_index() or {}).get(platform)
+    return hotnews[:cnt] if hotnews else None
+
+
 def get_vvhan_hotnews() -> Optional[List[Dict]]:
     """
     获取 vvhan 的热点数据（作为备用）
@@ -120,7 +162,7 @@ def get_vvhan_hotnews() -> Optional[List[Dict]]:
     """
     api_url = "https://api.vvhan.com/api/hotlist/all"
     try:
-        response = requests.get(api_url, timeout=10)
+        response = requests.get(api_url, timeout=HOTNEWS_CONFIGS["request_timeout"])
         response.raise_for_status()
 
         data = response.json()
@@ -131,49 +173,317 @@ def get_vvhan_hotnews() -> Optional[List[Dict]]:
         return None
 
 
-def get_platform_news(platform: str, cnt: int = 10) -> List[str]:
+def get_vvhan_index() -> Optional[Dict[str, List[Dict]]]:
     """
-    获取指定平台的新闻标题，优先从知微数据获取，失败则从 tophub.today 获取，最后从 vvhan 获取
-    参数 platform: 平台名称（中文，如“微博”）
-    参数 cnt: 返回的新闻数量
-    返回: 新闻标题列表（仅使用 name 字段）
+    获取 vvhan 的热点数据并按平台建立索引
+    返回格式: {平台名称: [热点条目字典, ...]}，条目字段与知微数据一致
     """
-    # 查找平台对应的知微数据标识和 tophub 标识
-    platform_info = next((p for p in PLATFORMS if p["name"] == platform), None)
-    if not platform_info:
-        return []
+    hotnews = get_vvhan_hotnews()
+    if not hotnews:
+        return None
 
-    # 1. 优先尝试知微数据
+    index: Dict[str, List[Dict]] = {}
+    for pf in hotnews:
+        if not isinstance(pf, dict) or pf.get("name") in index:
+            continue
+        index[pf.get("name")] = [
+            {
+                "name": item.get("title", ""),
+                "rank": i + 1,
+                "lastCount": item.get("hot", 0),
+                "url": item.get("url", ""),
+            }
+            for i, item in enumerate(pf.get("data") or [])
+            if isinstance(item, dict)
+        ]
+    return index
 
-    if platform_info["zhiwei_id"] in ZHIWEI_PLATFORMS:
-        hotnews = get_zhiwei_hotnews(platform_info["zhiwei_id"])
-        if hotnews:
-            return [item.get("name", "") for item in hotnews[:cnt] if item.get("name")]
 
-    # 2. 回退到 tophub.today
-    if platform_info["tophub_id"] in TOPHUB_PLATFORMS:
-        hotnews = get_tophub_hotnews(platform, cnt)
-        if hotnews:
-            return [item.get("name", "") for item in hotnews[:cnt] if item.get("name")]
+class HotNewsAggregator:
+    """
+    热搜聚合器（进程内单例）
 
-    # 3. 回退到 vvhan API
-    hotnews = get_vvhan_hotnews()
-    if not hotnews:
+    - 一个平台的热榜同时向所有支持它的数据源（知微、tophub、vvhan）请求，取最先返回的有效结果
+    - tophub 首页和 vvhan 全量接口一次请求覆盖所有平台，解析成按平台的索引后共享
+    - 数据源结果和平台结果都按 cache_ttl 缓存，失败结果按 failure_ttl 缓存；
+      同一个缓存键同时只有一个线程在请求，其余线程等待其结果
+    - 每次实际获取到的平台热榜都写入快照库（HotNewsStore），供其他进程和趋势查询使用
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, ttl=None, failure_ttl=None):
+        self.ttl = ttl if ttl is not None else HOTNEWS_CONFIGS["cache_ttl"]
+        self.failure_ttl = (
+            failure_ttl if failure_ttl is not None else HOTNEWS_CONFIGS["failure_ttl"]
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=HOTNEWS_CONFIGS["max_workers"], thread_name_prefix="hotnews"
+        )
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _get_fresh(self, key) -> Tuple[bool, Any]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def _cached(self, key, loader: Callable[[], Any]):
+        """读取缓存，未命中时调用 loader 加载；同一个 key 同时只加载一次"""
+        hit, value = self._get_fresh(key)
+        if hit:
+            return value
+
+        with self._cache_lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            hit, value = self._get_fresh(key)
+            if hit:
+                return value
+            try:
+                value = loader()
+            except Exception:
+                value = None
+            ttl = self.ttl if value else self.failure_ttl
+            with self._cache_lock:
+                self._cache[key] = (time.monotonic() + ttl, value)
+            return value
+
+    def get_zhiwei_hotnews(self, zhiwei_id: str) -> Optional[List[Dict]]:
+        return self._cached(("zhiwei", zhiwei_id), lambda: get_zhiwei_hotnews(zhiwei_id))
+
+    def get_tophub_index(self) -> Optional[Dict[str, List[Dict]]]:
+        return self._cached(("tophub",), get_tophub_index)
+
+    def get_vvhan_index(self) -> Optional[Dict[str, List[Dict]]]:
+        return self._cached(("vvhan",), get_vvhan_index)
+
+    def _source_loaders(self, platform_info: Dict) -> List[Callable[[], Optional[List[Dict]]]]:
+        """平台可用的数据源，按原有优先级排列"""
+        name = platform_info["name"]
+        loaders = []
+        if platform_info["zhiwei_id"] in ZHIWEI_PLATFORMS:
+            zhiwei_id = platform_info["zhiwei_id"]
+            loaders.append(lambda: self.get_zhiwei_hotnews(zhiwei_id))
+        if platform_info["tophub_id"] in TOPHUB_PLATFORMS:
+            loaders.append(lambda: (self.get_tophub_index() or {}).get(name))
+        loaders.append(lambda: (self.get_vvhan_index() or {}).get(name))
+        return loaders
+
+    def _fan_out(self, platform_info: Dict) -> List[Dict]:
+        """并发请求所有数据源，返回最先到达的有效结果"""
+        futures = [self._executor.submit(loader) for loader in self._source_loaders(platform_info)]
+        try:
+            for future in as_completed(futures, timeout=HOTNEWS_CONFIGS["request_timeout"] + 5):
+                hotnews = future.result()
+                if hotnews:
+                    return hotnews
+        except Exception:
+            pass
         return []
 
-    platform_data = next((pf["data"] for pf in hotnews if pf["name"] == platform), [])
-    return [item["title"] for item in platform_data[:cnt]]
+    def get_hotnews(self, platform: str) -> List[Dict]:
+        """
+        获取指定平台的热榜条目
+        参数 platform: 平台名称（中文，如“微博”）
+        返回: 热点条目字典列表，获取失败返回空列表
+        """
+        platform_info = next((p for p in PLATFORMS if p["name"] == platform), None)
+        if not platform_info:
+            return []
+        return self._cached(("platform", platform), lambda: self._fetch(platform_info)) or []
+
+    def _fetch(self, platform_info: Dict) -> List[Dict]:
+        hotnews = self._fan_out(platform_info)
+        store = get_hotnews_store()
+        if hotnews and store:
+            try:
+                store.append_snapshot(platform_info["name"], hotnews)
+            except Exception as e:
+                log.print_log(f"保存热榜快照失败: {str(e)}", "warning")
+        return hotnews
+
+    def prefetch(
+        self, platforms: Optional[List[str]] = None, refresh: bool = False
+    ) -> Dict[str, List[Dict]]:
+        """
+        预热多个平台（默认全部）的热榜：先并发请求所有数据源，再从缓存中组装各平台结果
+        refresh 为 True 时忽略已有缓存，重新请求
+        """
+        names = platforms or [p["name"] for p in PLATFORMS]
+        infos = [p for p in PLATFORMS if p["name"] in names]
+        if refresh:
+            self._invalidate(
+                lambda key: key[0] in ("tophub", "vvhan", "zhiwei")
+                or (key[0] == "platform" and key[1] in names)
+            )
+        loaders = [self.get_tophub_index, self.get_vvhan_index]
+        for zhiwei_id in {info["zhiwei_id"] for info in infos} & set(ZHIWEI_PLATFORMS):
+            loaders.append(lambda zhiwei_id=zhiwei_id: self.get_zhiwei_hotnews(zhiwei_id))
+        wait(
+            [self._executor.submit(loader) for loader in loaders],
+            timeout=HOTNEWS_CONFIGS["request_timeout"] + 5,
+        )
+        return {info["name"]: self.get_hotnews(info["name"]) for info in infos}
+
+    def _invalidate(self, predicate: Callable[[Tuple], bool]):
+        with self._cache_lock:
+            for key in [key for key in self._cache if predicate(key)]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+
+def get_hotnews_store() -> Optional[HotNewsStore]:
+    """获取热榜快照库，不可用（如磁盘不可写）时返回 None"""
+    try:
+        return HotNewsStore.get_instance()
+    except Exception:
+        return None
+
+
+class HotNewsPrefetcher:
+    """
+    后台热榜预取：守护线程每隔 prefetch_interval 秒刷新全部平台的热榜，
+    结果由聚合器写入快照库，选题时直接读取最新快照而不必等待网络请求
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, interval=None):
+        self.interval = interval or HOTNEWS_CONFIGS["prefetch_interval"]
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="hotnews_prefetch", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def run_once(self) -> int:
+        """刷新一次全部平台，返回获取成功的平台数"""
+        results = HotNewsAggregator.get_instance().prefetch(refresh=True)
+        return sum(1 for hotnews in results.values() if hotnews)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                count = self.run_once()
+                log.print_log(f"热榜预取完成：{count}/{len(PLATFORMS)} 个平台", "info", False)
+            except Exception as e:
+                log.print_log(f"热榜预取失败: {str(e)}", "warning", False)
+            self._stop_event.wait(self.interval)
+
+
+_topic_index_backfilled = False
+
+
+def get_topic_index() -> Optional[TopicIndex]:
+    """获取已生成话题的去重索引（首次使用时用已保存的文章初始化），不可用时返回 None"""
+    global _topic_index_backfilled
+    try:
+        index = TopicIndex.get_instance()
+        index.threshold = HOTNEWS_CONFIGS["dedup_threshold"]
+        index.retention = HOTNEWS_CONFIGS["dedup_retention_days"] * 24 * 3600
+        if not _topic_index_backfilled:
+            _topic_index_backfilled = True
+            index.backfill_from_articles()
+        return index
+    except Exception:
+        return None
+
+
+def filter_generated_topics(topics: List[str]) -> List[str]:
+    """去掉与已生成文章近似重复的话题，每个候选只需一次索引查询"""
+    index = get_topic_index() if HOTNEWS_CONFIGS["dedup_enabled"] else None
+    if not index:
+        return topics
+
+    fresh_topics = []
+    for topic in topics:
+        similar = index.find_similar(topic)
+        if similar:
+            log.print_log(
+                f"跳过已生成过的相似话题: {topic}（相似于《{similar[0]}》，{similar[1]:.2f}）",
+                "info",
+                False,
+            )
+        else:
+            fresh_topics.append(topic)
+    return fresh_topics
+
+
+def get_platform_news(platform: str, cnt: int = 10) -> List[str]:
+    """
+    获取指定平台的新闻标题：优先读取快照库中足够新的快照（通常由后台预取写入），
+    否则同时向知微数据、tophub.today、vvhan 请求，取最先返回的有效结果
+    参数 platform: 平台名称（中文，如“微博”）
+    参数 cnt: 返回的新闻数量
+    返回: 新闻标题列表（仅使用 name 字段）
+    """
+    hotnews = None
+    store = get_hotnews_store()
+    if store:
+        try:
+            hotnews = store.latest(platform, HOTNEWS_CONFIGS["snapshot_max_age"])
+        except Exception:
+            hotnews = None
+    if not hotnews:
+        hotnews = HotNewsAggregator.get_instance().get_hotnews(platform)
+    return [item.get("name", "") for item in hotnews[:cnt] if item.get("name")]
 
 
-def select_platform_topic(platform: Any, cnt: int = 10) -> str:
+def select_platform_topic(platform: Any, cnt: int = 10, exclude: Optional[set] = None) -> str:
     """
     获取指定平台的新闻话题，并按排名加权随机选择一个话题。
     若无话题，返回默认话题。
     参数 platform: 平台名称（中文，如“微博”）
     参数 cnt: 最大返回的新闻数量
+    参数 exclude: 需要跳过的话题（如同一批次中已选中的话题）
     返回: 选中的话题字符串
     """
-    topics = get_platform_news(platform, cnt)
+    # 多取一些候选，跳过已生成过的话题后仍保留 cnt 个
+    all_topics = get_platform_news(platform, cnt * 3)
+    if exclude:
+        all_topics = [t for t in all_topics if t.replace("|", "——") not in exclude]
+    topics = filter_generated_topics(all_topics)[:cnt]
+    if all_topics and not topics:
+        topics = all_topics[:cnt]
+        log.print_log(f"平台 {platform} 的热门话题均已生成过，将从中重新选择。")
     if not topics:
         topics = ["历史上的今天"]
         log.print_log(f"平台 {platform} 无法获取到热榜，接口暂时不可用，将使用默认话题。")
@@ -12,16 +12,189 @@
 
 import time
 import re
+import threading
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from bs4 import BeautifulSoup, NavigableString, Tag
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
 import unicodedata
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import html
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+from src.ai_write_x.utils.page_cache import PageCache, CachedPage
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+except ImportError:  # 未安装 lxml / cssselect 时只使用 BeautifulSoup 解析
+    lxml = None
 # from crewai_tools import SeleniumScrapingTool
 
 
+class DateMatch(NamedTuple):
+    """日期识别结果：标准化后的日期、在原文中的位置、命中的日期形式"""
+
+    date: datetime
+    span: Tuple[int, int]
+    kind: str
+
+
+def _build_date_pattern(month_day_separators):
+    """构建合并了所有日期形式的单一正则，按命名分组分派"""
+    return re.compile(
+        # 先用首字符预判，跳过不可能是日期开头的位置，长文本扫描可快一个数量级
+        r"(?=[\d刚今昨前上去yjlt])(?:"
+        # Unix 时间戳（10位秒 / 13位毫秒，必须独占整个文本）
+        r"(?P<unix>^\d{10}(?:\d{3})?$)"
+        # 完整日期（含 ISO 8601 及中文年月日，可带时分秒）
+        r"|(?P<ymd>(?P<year>\d{4})\s*[-/年.]\s*(?P<month>\d{1,2})\s*[-/月.]\s*(?P<day>\d{1,2})\s*日?"
+        r"(?:(?:\s*|T)(?P<hour>\d{1,2}):(?P<minute>\d{1,2})(?::(?P<second>\d{1,2}))?)?)"
+        # 英式完整日期 月/日/年
+        r"|(?P<mdy>(?P<mdy_month>\d{1,2})[-/](?P<mdy_day>\d{1,2})[-/](?P<mdy_year>\d{4}))"
+        # 中文相对时间
+        r"|(?P<rel_zh>(?P<zh_num>\d+)\s*(?P<zh_unit>秒|分钟|分|个小时|小时|天|日|周|星期|个月|月|年)前)"
+        r"|(?P<word_zh>刚刚|今天|昨天|前天|上星期|上周|上个月|上月|去年)"
+        # 英文相对时间
+        r"|(?P<rel_en>(?P<en_num>\d+)\s*"
+        r"(?P<en_unit>second|minute|hour|day|week|month|year)s?\s*ago)"
+        r"|(?P<word_en>yesterday|today|just\s*now|last\s*(?:week|month|year))"
+        # 不完整日期 月-日
+        rf"|(?P<md>(?P<md_month>\d{{1,2}})\s*[{month_day_separators}]"
+        r"\s*(?P<md_day>\d{1,2})\s*日?))",
+        re.IGNORECASE,
+    )
+
+
+_RELATIVE_UNITS = {
+    "秒": lambda n: timedelta(seconds=n),
+    "分钟": lambda n: timedelta(minutes=n),
+    "分": lambda n: timedelta(minutes=n),
+    "个小时": lambda n: timedelta(hours=n),
+    "小时": lambda n: timedelta(hours=n),
+    "天": lambda n: timedelta(days=n),
+    "日": lambda n: timedelta(days=n),
+    "周": lambda n: timedelta(weeks=n),
+    "星期": lambda n: timedelta(weeks=n),
+    "个月": lambda n: relativedelta(months=n),
+    "月": lambda n: relativedelta(months=n),
+    "年": lambda n: relativedelta(years=n),
+    "second": lambda n: timedelta(seconds=n),
+    "minute": lambda n: timedelta(minutes=n),
+    "hour": lambda n: timedelta(hours=n),
+    "day": lambda n: timedelta(days=n),
+    "week": lambda n: timedelta(weeks=n),
+    "month": lambda n: relativedelta(months=n),
+    "year": lambda n: relativedelta(years=n),
+}
+
+_RELATIVE_WORDS = {
+    "刚刚": timedelta(0),
+    "昨天": timedelta(days=1),
+    "前天": timedelta(days=2),
+    "上周": timedelta(weeks=1),
+    "上星期": timedelta(weeks=1),
+    "上个月": relativedelta(months=1),
+    "上月": relativedelta(months=1),
+    "去年": relativedelta(years=1),
+    "yesterday": timedelta(days=1),
+    "justnow": timedelta(0),
+    "lastweek": timedelta(weeks=1),
+    "lastmonth": relativedelta(months=1),
+    "lastyear": relativedelta(years=1),
+}
+
+
+class DateRecognizer:
+    """预编译的日期识别引擎，一次扫描返回首个有效日期（标准化 datetime + 匹配位置）"""
+
+    def __init__(self, month_day_separators=r"\-/.月"):
+        self._pattern = _build_date_pattern(month_day_separators)
+
+    def search(self, text, timestamp=None) -> Optional[DateMatch]:
+        """在文本中查找第一个可转换为有效日期的片段"""
+        if not text:
+            return None
+
+        reference_date = datetime.fromtimestamp(timestamp or time.time())
+        for match in self._pattern.finditer(text):
+            try:
+                date = self._to_datetime(match, reference_date)
+            except (ValueError, OverflowError, OSError):
+                date = None
+            if date:
+                return DateMatch(date, match.span(), match.lastgroup or "")
+
+        return None
+
+    @staticmethod
+    def _to_datetime(match, reference_date):
+        kind = match.lastgroup
+
+        if kind == "unix":
+            value = int(match.group("unix"))
+            return datetime.fromtimestamp(value / 1000 if value > 9999999999 else value)
+
+        if kind == "ymd":
+            return datetime(
+                int(match.group("year")),
+                int(match.group("month")),
+                int(match.group("day")),
+                int(match.group("hour") or 0),
+                int(match.group("minute") or 0),
+                int(match.group("second") or 0),
+            )
+
+        if kind == "mdy":
+            return datetime(
+                int(match.group("mdy_year")),
+                int(match.group("mdy_month")),
+                int(match.group("mdy_day")),
+            )
+
+        if kind == "rel_zh":
+            return reference_date - _RELATIVE_UNITS[match.group("zh_unit")](
+                int(match.group("zh_num"))
+            )
+
+        if kind == "rel_en":
+            return reference_date - _RELATIVE_UNITS[match.group("en_unit").lower()](
+                int(match.group("en_num"))
+            )
+
+        if kind in ("word_zh", "word_en"):
+            word = re.sub(r"\s+", "", match.group(kind).lower())
+            if word in ("今天", "today"):
+                return reference_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            return reference_date - _RELATIVE_WORDS[word]
+
+        if kind == "md":
+            month, day = int(match.group("md_month")), int(match.group("md_day"))
+            # 未给出年份时取不晚于参考日期的最近一次
+            try_date = reference_date.replace(month=month, day=day)
+            if try_date > reference_date:
+                try_date = try_date.replace(year=reference_date.year - 1)
+            return try_date
+
+        return None
+
+
+# 字段级识别（pub_time、time 标签等短文本），月日允许 - / . 月 分隔
+_FIELD_DATE_RECOGNIZER = DateRecognizer()
+# 正文级识别（摘要、页面全文），月日仅接受“月”，避免把小数、区间误判为日期
+_TEXT_DATE_RECOGNIZER = DateRecognizer(month_day_separators="月")
+
+_NORMALIZED_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATE_PREFIX_RE = re.compile(
+    r"^(发表于|更新时间|发布时间|创建时间|Posted on|Published on|Date):\s*", re.IGNORECASE
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
 def validate_search_result(result, min_results=1, search_type="local"):
     """验证搜索结果质量，确保至少min_results条结果满足指定搜索类型的完整性条件，并返回转换后的日期格式"""
     if not isinstance(result, dict) or not result.get("success", False):
@@ -31,7 +204,7 @@ def validate_search_result(result, min_results=1, search_type="local"):
     if not results or len(results) < min_results:
         return False
 
-    timestamp = result.get("timestamp", time.time())
+    timestamp = result.get("timestamp") or time.time()
 
     for item in results:
         pub_time = item.get("pub_time", "")
@@ -39,51 +212,14 @@ def validate_search_result(result, min_results=1, search_type="local"):
 
         # 尝试从 pub_time 转换
         if pub_time:
-            if re.match(r"^\d{4}-\d{2}-\d{2}$", pub_time):
-                try:
-                    datetime.strptime(pub_time, "%Y-%m-%d")
-                    continue
-                except ValueError:
-                    pass
-            # 处理带时分秒的格式
-            if re.match(r"^\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}(?::\d{2})?$", pub_time):
-                try:
-                    actual_date = datetime.strptime(pub_time, "%Y-%m-%d %H:%M:%S")
-                    item["pub_time"] = actual_date.strftime("%Y-%m-%d")
-                    continue
-                except ValueError:
-                    try:
-                        actual_date = datetime.strptime(pub_time, "%Y-%m-%d %H:%M")
-                        item["pub_time"] = actual_date.strftime("%Y-%m-%d")
-                        continue
-                    except ValueError:
-                        pass
-            if timestamp:
-                try:
-                    actual_date = calculate_actual_date(pub_time, timestamp)
-                    if actual_date:
-                        item["pub_time"] = actual_date.strftime("%Y-%m-%d")
-                    else:
-                        item["pub_time"] = ""
-                except Exception:
-                    item["pub_time"] = ""
+            date_match = _FIELD_DATE_RECOGNIZER.search(clean_date_text(str(pub_time)), timestamp)
+            item["pub_time"] = date_match.date.strftime("%Y-%m-%d") if date_match else ""
 
         # 兜底：从 abstract 提取日期
-        if not item["pub_time"] and abstract:
-            for pattern in [
-                r"\d{4}\s*[-/年\.]?\s*\d{1,2}\s*[-/月\.]?\s*\d{1,2}\s*(?:日)?(?:\s+\d{1,2}:\d{1,2}(?::\d{1,2})?)?",  # noqa 501
-                r"\d{1,2}\s*[月]\s*\d{1,2}\s*[日]?",
-                r"(?:\d+\s*(?:秒|一分钟|分钟|分|小时|个小时|天|日|周|星期|个月|月|年)前|刚刚|今天|昨天|前天|上周|上星期|上个月|上月|去年)",
-                r"\d{4}年\d{1,2}月\d{1,2}日",
-            ]:
-                match = re.search(pattern, abstract, re.IGNORECASE)
-                if match:
-                    pub_time = match.group(0)
-                    if is_valid_date(pub_time):
-                        pub_time_date = calculate_actual_date(pub_time, timestamp)
-                        if pub_time_date:
-                            item["pub_time"] = pub_time_date.strftime("%Y-%m-%d")
-                            break
+        if not item.get("pub_time") and abstract:
+            date_match = _TEXT_DATE_RECOGNIZER.search(abstract, timestamp)
+            if date_match:
+                item["pub_time"] = date_match.date.strftime("%Y-%m-%d")
 
     validation_rules = {
         "local": ["title", "url", "abstract", "pub_time"],
@@ -129,13 +265,9 @@ def validate_search_result(result, min_results=1, search_type="local"):
             if len(abstract.strip()) < quality_req.get("abstract_min_length", 0):
                 continue
 
+        # 上面已统一转换为 %Y-%m-%d，这里只需检查格式
         if quality_req["require_valid_date"] and search_type != "ai_guided":
-            pub_time = item.get("pub_time", "")
-            if not pub_time or not re.match(r"^\d{4}-\d{2}-\d{2}$", pub_time):
-                continue
-            try:
-                datetime.strptime(pub_time, "%Y-%m-%d")
-            except ValueError:
+            if not _NORMALIZED_DATE_RE.match(item.get("pub_time", "")):
                 continue
 
         return True
@@ -148,37 +280,7 @@ def is_valid_date(date_str, timestamp=None):
     if not date_str or date_str in [None, "", "None", "未知"]:
         return False
 
-    date_str = clean_date_text(str(date_str))
-
-    if timestamp is None:
-        timestamp = time.time()
-
-    date_patterns = [
-        # 完整日期时间（支持带空格的中文格式）
-        r"\d{4}\s*[-/年\.]?\s*\d{1,2}\s*[-/月\.]?\s*\d{1,2}\s*(?:日)?(?:\s+\d{1,2}:\d{1,2}(?::\d{1,2})?)?",  # noqa 501
-        r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:Z|[+-]\d{2}:\d{2})?",
-        r"\d{1,2}[-/]\d{1,2}[-/]\d{4}\s+\d{1,2}:\d{1,2}(?::\d{1,2})?",
-        # 完整日期
-        r"\d{4}\s*[-/年\.]?\s*\d{1,2}\s*[-/月\.]?\s*\d{1,2}\s*(?:日)?",
-        r"\d{1,2}[-/]\d{1,2}[-/]\d{4}",
-        # 相对时间
-        r"(\d+)\s*(秒|分钟|分|小时|个小时|天|日|周|星期|个月|月|年)前",
-        r"(刚刚|今天|昨天|前天|上周|上星期|上个月|上月|去年)",
-        # 不完整日期
-        r"\d{1,2}\s*[-/\.月]?\s*\d{1,2}\s*(?:日)?",
-        # Unix 时间戳
-        r"^\d{10}$",
-        r"^\d{13}$",
-        # 英文格式
-        r"\d+\s*(second|seconds|minute|minutes|hour|hours|day|days|week|weeks|month|months|year|years)\s*ago",  # noqa 501
-        r"(yesterday|today|just\s*now|last\s*(week|month|year)|this\s*(week|month|year))",
-    ]
-
-    for pattern in date_patterns:
-        if re.search(pattern, date_str, re.IGNORECASE):
-            return True
-
-    return False
+    return _FIELD_DATE_RECOGNIZER.search(clean_date_text(str(date_str)), timestamp) is not None
 
 
 def calculate_actual_date(pub_time, timestamp):
@@ -186,115 +288,8 @@ def calculate_actual_date(pub_time, timestamp):
     if not pub_time or not timestamp:
         return None
 
-    try:
-        pub_time_cleaned = clean_date_text(str(pub_time))
-        reference_date = datetime.fromtimestamp(timestamp)
-
-        # 优先处理 Unix 时间戳 (修正后的位置)
-        if re.match(r"^\d{10}$", pub_time_cleaned):
-            return datetime.fromtimestamp(int(pub_time_cleaned))
-        if re.match(r"^\d{13}$", pub_time_cleaned):
-            return datetime.fromtimestamp(int(pub_time_cleaned) / 1000)
-
-        # 1. 相对时间
-        relative_patterns = [
-            (r"(\d+)\s*秒前", lambda n: reference_date - timedelta(seconds=n)),
-            (r"(\d+)\s*(分钟|分)前", lambda n: reference_date - timedelta(minutes=n)),
-            (r"(\d+)\s*(小时|个小时)前", lambda n: reference_date - timedelta(hours=n)),
-            (r"(\d+)\s*(天|日)前", lambda n: reference_date - timedelta(days=n)),
-            (r"(\d+)\s*(周|星期)前", lambda n: reference_date - timedelta(weeks=n)),
-            (r"(\d+)\s*(个月|月)前", lambda n: reference_date - relativedelta(months=n)),
-            (r"(\d+)\s*年前", lambda n: reference_date - relativedelta(years=n)),
-        ]
-
-        for pattern, calc_func in relative_patterns:
-            match = re.search(pattern, pub_time_cleaned, re.IGNORECASE)
-            if match:
-                num = int(match.group(1))
-                return calc_func(num)
-
-        # 2. 特殊相对时间
-        special_relative = {
-            "刚刚": reference_date,
-            "今天": reference_date.replace(hour=0, minute=0, second=0, microsecond=0),
-            "昨天": reference_date - timedelta(days=1),
-            "前天": reference_date - timedelta(days=2),
-            "上周": reference_date - timedelta(weeks=1),
-            "上星期": reference_date - timedelta(weeks=1),
-            "上个月": reference_date - relativedelta(months=1),
-            "上月": reference_date - relativedelta(months=1),
-            "去年": reference_date - relativedelta(years=1),
-        }
-
-        for key, calc_date in special_relative.items():
-            if key in pub_time_cleaned:
-                return calc_date
-
-        # 3. 英文相对时间
-        english_relative = [
-            (r"(\d+)\s*seconds?\s*ago", lambda n: reference_date - timedelta(seconds=n)),
-            (r"(\d+)\s*minutes?\s*ago", lambda n: reference_date - timedelta(minutes=n)),
-            (r"(\d+)\s*hours?\s*ago", lambda n: reference_date - timedelta(hours=n)),
-            (r"(\d+)\s*days?\s*ago", lambda n: reference_date - timedelta(days=n)),
-            (r"(\d+)\s*weeks?\s*ago", lambda n: reference_date - timedelta(weeks=n)),
-            (r"(\d+)\s*months?\s*ago", lambda n: reference_date - relativedelta(months=n)),
-            (r"(\d+)\s*years?\s*ago", lambda n: reference_date - relativedelta(years=n)),
-            (r"yesterday", lambda: reference_date - timedelta(days=1)),
-            (r"just\s*now", lambda: reference_date),
-            (r"last\s*week", lambda: reference_date - timedelta(weeks=1)),
-            (r"last\s*month", lambda: reference_date - relativedelta(months=1)),
-            (r"last\s*year", lambda: reference_date - relativedelta(years=1)),
-        ]
-
-        for pattern, calc_func in english_relative:
-            match = re.search(pattern, pub_time_cleaned, re.IGNORECASE)
-            if match:
-                if match.groups():
-                    num = int(match.group(1))
-                    return calc_func(num)
-                return calc_func()
-
-        # 4. 不完整日期
-        incomplete_patterns = [
-            r"(\d{1,2})\s*[-/\.月]?\s*(\d{1,2})\s*(?:日)?",
-        ]
-
-        for pattern in incomplete_patterns:
-            match = re.search(pattern, pub_time_cleaned)
-            if match:
-                month, day = map(int, match.groups())
-                if 1 <= month <= 12 and 1 <= day <= 31:
-                    current_year = reference_date.year
-                    try_date = reference_date.replace(year=current_year, month=month, day=day)
-                    if try_date > reference_date:
-                        try_date = try_date.replace(year=current_year - 1)
-                    # 验证日期合理性
-                    if abs((try_date - reference_date).days) > 365:
-                        try_date_alt = try_date.replace(
-                            year=current_year - 1 if try_date > reference_date else current_year + 1
-                        )
-                        if abs((try_date_alt - reference_date).days) < abs(
-                            (try_date - reference_date).days
-                        ):
-                            try_date = try_date_alt
-                    return try_date
-
-        # 5. 完整日期
-        complete_patterns = [
-            (r"(\d{4})\s*[-/年\.]?\s*\d{1,2}\s*[-/月\.]?\s*\d{1,2}\s*(?:日)?", "%Y-%m-%d"),
-            (r"(\d{1,2})[-/](\d{1,2})[-/](\d{4})", "%m/%d/%Y"),
-        ]
-
-        for pattern, date_format in complete_patterns:
-            match = re.search(pattern, pub_time_cleaned)
-            if match:
-                date_str = match.group(0)
-                return datetime.strptime(date_str, date_format)
-
-    except Exception:
-        return None
-
-    return None
+    date_match = _FIELD_DATE_RECOGNIZER.search(clean_date_text(str(pub_time)), timestamp)
+    return date_match.date if date_match else None
 
 
 def clean_date_text(text):
@@ -311,15 +306,11 @@ def clean_date_text(text):
         if isinstance(text, bytes):
             text = text.decode("utf-8", errors="ignore")
         text = html.unescape(text)
-        text = re.sub(
-            r"^(发表于|更新时间|发布时间|创建时间|Posted on|Published on|Date):\s*",
-            "",
-            text,
-            flags=re.IGNORECASE,
-        ).strip()
-        text = "".join(char for char in text if unicodedata.category(char)[0] != "C")
+        text = _DATE_PREFIX_RE.sub("", text).strip()
+        if not text.isprintable():
+            text = "".join(char for char in text if unicodedata.category(char)[0] != "C")
         # 保留单个空格，避免破坏中文日期格式
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _WHITESPACE_RE.sub(" ", text).strip()
         return text
     except Exception:
         return ""
@@ -379,8 +370,135 @@ def get_common_headers():
     }
 
 
-def _extract_publish_time(page_soup):
+class BeautifulSoupBackend:
+    """
+    页面解析后端：html.parser 构建的 BeautifulSoup 树
+
+    所有提取规则（标题、发布时间、正文）只通过下面几个方法访问文档，
+    换用其他解析器时实现同样的接口即可。该后端无额外依赖，作为兜底。
+
+    iter_content 按文档顺序返回子节点：元素原样返回，文字以 str 返回，
+    注释、脚本等不可见文字不返回。
+    """
+
+    name = "bs4"
+
+    def parse(self, html_text):
+        return BeautifulSoup(html_text, "html.parser")
+
+    def select_one(self, node, selector):
+        return node.select_one(selector)
+
+    def select(self, node, selector):
+        return node.select(selector)
+
+    def get_text(self, node):
+        return node.get_text()
+
+    def get_attr(self, node, name, default=None):
+        value = node.get(name, default)
+        # class 等多值属性在 BeautifulSoup 中是列表，统一为空格分隔的字符串
+        return " ".join(value) if isinstance(value, list) else value
+
+    def tag_name(self, node):
+        return node.name
+
+    def iter_content(self, node):
+        for child in node.children:
+            if isinstance(child, Tag):
+                yield child
+            elif type(child) is NavigableString:
+                yield child
+
+
+class LxmlBackend:
+    """
+    页面解析后端：libxml2 解析 + 预编译的 CSS 选择器（XPath）
+
+    与 BeautifulSoupBackend 执行相同的提取规则，文本取值同样跳过
+    script/style/template 内的文字，解析和选择器匹配都在 C 层完成。
+    """
+
+    name = "lxml"
+
+    # 与 BeautifulSoup.get_text() 一致：不包含脚本、样式和模板中的文字
+    _TEXT_XPATH = (
+        ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+    )
+
+    def __init__(self):
+        self._parser = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True)
+        self._text_xpath = etree.XPath(self._TEXT_XPATH)
+        self._selectors: Dict[str, Any] = {}
+        self._selectors_lock = threading.Lock()
+
+    def parse(self, html_text):
+        # 统一以 UTF-8 字节交给 libxml2，避免页面内的编码声明与已解码文本冲突
+        return lxml.html.document_fromstring(html_text.encode("utf-8"), parser=self._parser)
+
+    def _compile(self, selector):
+        compiled = self._selectors.get(selector)
+        if compiled is None:
+            with self._selectors_lock:
+                compiled = self._selectors.get(selector)
+                if compiled is None:
+                    compiled = CSSSelector(selector, translator="html")
+                    self._selectors[selector] = compiled
+        return compiled
+
+    def select_one(self, node, selector):
+        matches = self._compile(selector)(node)
+        return matches[0] if matches else None
+
+    def select(self, node, selector):
+        return self._compile(selector)(node)
+
+    def get_text(self, node):
+        return "".join(self._text_xpath(node))
+
+    def get_attr(self, node, name, default=None):
+        return node.get(name, default)
+
+    def tag_name(self, node):
+        return node.tag
+
+    def iter_content(self, node):
+        if node.text:
+            yield node.text
+        for child in node:
+            # 注释和处理指令的 tag 不是字符串，跳过节点本身但保留其后的尾部文本
+            if isinstance(child.tag, str):
+                yield child
+            if child.tail:
+                yield child.tail
+
+
+_BS4_BACKEND = BeautifulSoupBackend()
+_extract_backends = {}
+_extract_backends_lock = threading.Lock()
+
+
+def get_extract_backend(name=None):
+    """
+    获取页面解析后端
+
+    name 为 "lxml" / "bs4" / "auto"（默认取 URL_FETCH_CONFIGS["extract_backend"]），
+    auto 在安装了 lxml 和 cssselect 时使用 lxml，否则使用 BeautifulSoup。
+    """
+    name = name or URL_FETCH_CONFIGS["extract_backend"]
+    if name == "bs4" or lxml is None:
+        return _BS4_BACKEND
+
+    with _extract_backends_lock:
+        if "lxml" not in _extract_backends:
+            _extract_backends["lxml"] = LxmlBackend()
+        return _extract_backends["lxml"]
+
+
+def _extract_publish_time(page_doc, backend=None):
     """统一的发布时间提取函数"""
+    backend = backend or _BS4_BACKEND
+
     # Meta 标签提取 - 优先处理标准的发布时间标签
     meta_selectors = [
         "meta[property='article:published_time']",
@@ -394,9 +512,9 @@ def _extract_publish_time(page_soup):
     ]
 
     for selector in meta_selectors:
-        meta_tag = page_soup.select_one(selector)
-        if meta_tag:
-            datetime_str = meta_tag.get("content")
+        meta_tag = backend.select_one(page_doc, selector)
+        if meta_tag is not None:
+            datetime_str = backend.get_attr(meta_tag, "content")
             if datetime_str:
                 try:
                     # 处理 UTC 时间 (以Z结尾)
@@ -416,9 +534,9 @@ def _extract_publish_time(page_soup):
                     pass
 
     # Time 标签提取
-    time_tags = page_soup.select("time")
+    time_tags = backend.select(page_doc, "time")
     for time_tag in time_tags:
-        datetime_attr = time_tag.get("datetime")
+        datetime_attr = backend.get_attr(time_tag, "datetime")
         if datetime_attr:
             try:
                 # 处理 UTC 时间 (以Z结尾)
@@ -438,11 +556,9 @@ def _extract_publish_time(page_soup):
                 pass
 
         # 如果 datetime 属性解析失败，尝试文本内容
-        text_content = clean_date_text(time_tag.get_text())
-        if text_content and is_valid_date(text_content):
-            time_date = calculate_actual_date(text_content, time.time())
-            if time_date:
-                return time_date.strftime("%Y-%m-%d")
+        time_date = calculate_actual_date(backend.get_text(time_tag), time.time())
+        if time_date:
+            return time_date.strftime("%Y-%m-%d")
 
     # HTML 元素提取
     date_selectors = [
@@ -464,53 +580,166 @@ def _extract_publish_time(page_soup):
     ]
 
     for selector in date_selectors:
-        elements = page_soup.select(selector)
+        elements = backend.select(page_doc, selector)
         for elem in elements:
-            text = clean_date_text(elem.get_text())
-            if text and is_valid_date(text):
-                elem_date = calculate_actual_date(text, time.time())
-                if elem_date:
-                    return elem_date.strftime("%Y-%m-%d")
+            elem_date = calculate_actual_date(backend.get_text(elem), time.time())
+            if elem_date:
+                return elem_date.strftime("%Y-%m-%d")
 
     # 兜底：全文搜索
-    text = clean_date_text(page_soup.get_text())
-    for pattern in [
-        r"\d{4}\s*[-/年\.]?\s*\d{1,2}\s*[-/月\.]?\s*\d{1,2}\s*(?:日)?(?:\s+\d{1,2}:\d{1,2}(?::\d{1,2})?)?",  # noqa 501
-        r"\d{1,2}[-/]\d{1,2}[-/]\d{4}",
-        r"\d{1,2}\s*[月]\s*\d{1,2}\s*[日]?",
-        r"(?:\d+\s*(?:秒|分钟|分|小时|个小时|天|日|周|星期|个月|月|年)前|刚刚|今天|昨天|前天|上周|上星期|上个月|上月|去年)",
-        r"\d{4}年\d{1,2}月\d{1,2}日",
-    ]:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            pub_time = match.group(0)
-            if is_valid_date(pub_time):
-                pub_time_date = calculate_actual_date(pub_time, time.time())
-                if pub_time_date:
-                    return pub_time_date.strftime("%Y-%m-%d")
+    page_text = clean_date_text(backend.get_text(page_doc))
+    date_match = _TEXT_DATE_RECOGNIZER.search(page_text, time.time())
+    if date_match:
+        return date_match.date.strftime("%Y-%m-%d")
 
     return ""
 
 
-def extract_page_content(url, headers=None):
-    """从 URL 提取页面内容和发布日期"""
+# 参考链接提取配置
+URL_FETCH_CONFIGS = {
+    "max_workers": 8,  # 并发提取的最大线程数
+    "connect_timeout": 5,  # 建立连接超时（秒）
+    "url_deadline": 20,  # 单个链接从排队到下载完成的耗时上限（秒）
+    "overall_deadline": 45,  # 整批链接的耗时上限（秒）
+    "host_interval": 1.0,  # 同一站点两次请求的最小间隔（秒）
+    "max_bytes": 5 * 1024 * 1024,  # 单个页面最多读取的字节数
+    "use_cache": True,  # 是否使用页面磁盘缓存（重复提取同一链接时跳过下载和解析）
+    "extract_backend": "auto",  # 页面解析后端：auto / lxml / bs4
+}
+
+
+class HostRateLimiter:
+    """按站点限速：同一 host 的请求之间至少间隔 interval 秒，不同站点互不影响"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url, deadline=None):
+        """等待到该站点的下一个可用时间片，超过 deadline 则抛出 TimeoutError"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            if deadline is not None and slot > deadline:
+                raise TimeoutError(f"等待站点 {host} 限速超时")
+            self._next_slot[host] = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_host_rate_limiter = HostRateLimiter(URL_FETCH_CONFIGS["host_interval"])
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """获取进程内共享的 requests.Session，复用连接池"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            pool_size = URL_FETCH_CONFIGS["max_workers"] * 2
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _shared_session = session
+        return _shared_session
+
+
+class FetchedPage(NamedTuple):
+    """一次页面下载的结果，304 时 raw 为空"""
+
+    raw: bytes
+    encoding: str
+    status: int
+    etag: str
+    last_modified: str
+
+
+def _fetch_page(url, headers=None, deadline=None) -> FetchedPage:
+    """下载页面原始字节并检测编码，受站点限速和单链接截止时间约束"""
+    if deadline is None:
+        deadline = time.monotonic() + URL_FETCH_CONFIGS["url_deadline"]
+
+    _host_rate_limiter.acquire(url, deadline)
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(f"提取超时: {url}")
+
+    response = get_shared_session().get(
+        url,
+        headers=headers or {},
+        timeout=(min(URL_FETCH_CONFIGS["connect_timeout"], remaining), remaining),
+        stream=True,
+    )
+    try:
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"提取超时: {url}")
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= URL_FETCH_CONFIGS["max_bytes"]:
+                break
+    finally:
+        response.close()
+
+    raw = b"".join(chunks)
+    # 与 response.apparent_encoding 一致：按内容检测编码
+    encoding = (chardet.detect(raw)["encoding"] if raw else None) or "utf-8"
+    return FetchedPage(
+        raw=raw,
+        encoding=encoding,
+        status=response.status_code,
+        etag=response.headers.get("ETag", ""),
+        last_modified=response.headers.get("Last-Modified", ""),
+    )
+
+
+def _parse_page(raw, encoding, backend=None):
+    """解析页面并提取发布日期，返回 (文档, 发布日期, 实际使用的解析后端)"""
+    backend = backend or get_extract_backend()
+    html_text = raw.decode(encoding, errors="replace")
     try:
-        time.sleep(1)
-        response = requests.get(url, headers=headers or {}, timeout=30)
-        response.encoding = response.apparent_encoding or "utf-8"
-        content = response.text
+        page_doc = backend.parse(html_text)
+    except Exception:
+        # 快速后端无法解析（如空文档）时回退到 BeautifulSoup
+        if backend is _BS4_BACKEND:
+            raise
+        backend = _BS4_BACKEND
+        page_doc = backend.parse(html_text)
 
-        page_soup = BeautifulSoup(content, "html.parser")
+    # 直接调用统一的时间提取函数
+    pub_time = _extract_publish_time(page_doc, backend)
 
-        # 直接调用统一的时间提取函数
-        pub_time = _extract_publish_time(page_soup)
+    return page_doc, pub_time, backend
 
-        return page_soup, pub_time
 
+def extract_page_content(url, headers=None, deadline=None):
+    """从 URL 提取页面内容（BeautifulSoup 对象）和发布日期"""
+    try:
+        page = _fetch_page(url, headers, deadline)
+        page_soup, pub_time, _ = _parse_page(page.raw, page.encoding, _BS4_BACKEND)
+        return page_soup, pub_time
     except Exception:
         return None, None
 
 
+def _get_page_cache() -> Optional[PageCache]:
+    """获取页面缓存，未启用或不可用（如磁盘不可写）时返回 None"""
+    if not URL_FETCH_CONFIGS["use_cache"]:
+        return None
+    try:
+        return PageCache.get_instance()
+    except Exception:
+        return None
+
+
 # 搜索引擎配置
 ENGINE_CONFIGS = {
     "MIN_ABSTRACT_LENGTH": 300,
@@ -833,63 +1062,43 @@ ENGINE_CONFIGS = {
 
 # ---------- 以下为通过链接提取文章信息----------------
 def extract_urls_content(urls: List[str], topic="") -> Dict[str, Any]:
-    """提取URL内容，自动检测并处理动态网站，并返回标准格式"""
-    extracted_results = []
+    """提取URL内容，自动检测并处理动态网站，并返回标准格式
+
+    所有链接并发提取（同一站点按 host_interval 限速），每个链接受 url_deadline 约束，
+    整批受 overall_deadline 约束，结果顺序与输入一致。
+    """
+    extracted_results: List[Dict[str, Any]] = []
     overall_success = True
     overall_error_message = None
 
-    for url in urls:
+    if urls:
+        overall_deadline = time.monotonic() + URL_FETCH_CONFIGS["overall_deadline"]
+        url_deadline = min(
+            overall_deadline, time.monotonic() + URL_FETCH_CONFIGS["url_deadline"]
+        )
+        executor = ThreadPoolExecutor(
+            max_workers=min(len(urls), URL_FETCH_CONFIGS["max_workers"]),
+            thread_name_prefix="url_extract",
+        )
         try:
-            # 首先尝试普通方法
-            page_soup, pub_time = extract_page_content(url, get_common_headers())
-
-            # 如果普通方法无法获取有效内容，使用Selenium
-            '''
-            if not page_soup or not _has_meaningful_content(page_soup):
-                selenium_tool = SeleniumScrapingTool(
-                    website_url=url, wait_time=15, return_html=True
-                )
-                page_content = selenium_tool._run(website_url=url, css_element="body")
-                if page_content:
-                    page_soup = BeautifulSoup(page_content, "html.parser")
-                    pub_time = _extract_publish_time(page_soup)
-            '''
-            if page_soup:
-                title = _extract_title_from_page(page_soup)
-                full_content = _extract_full_article_content(page_soup)
-                extracted_results.append(
-                    {
-                        "title": title or "",
-                        "pub_time": pub_time or "",
-                        "abstract": "",
-                        "content": full_content,
-                        "url": url,
-                    }
-                )
-            else:
-                # 页面加载失败，记录为提取失败，但不影响整体success
-                extracted_results.append(
-                    {
-                        "title": "",
-                        "pub_time": "",
-                        "abstract": "",
-                        "content": "无法提取内容: 页面加载失败",
-                        "url": url,
-                    }
-                )
-        except Exception as e:
-            # 捕获到异常，记录错误信息，但不影响整体success
-            overall_success = False
-            overall_error_message = f"提取过程中发生部分错误: {str(e)}"
-            extracted_results.append(
-                {
-                    "title": "",
-                    "pub_time": "",
-                    "abstract": "",
-                    "content": f"无法提取内容: {str(e)}",
-                    "url": url,
-                }
-            )
+            futures = [executor.submit(_extract_url_content, url, url_deadline) for url in urls]
+            wait(futures, timeout=max(0, overall_deadline - time.monotonic()))
+        finally:
+            # 未完成的链接不再等待，工作线程会在各自的截止时间内自行结束
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for url, future in zip(urls, futures):
+            if not future.done() or future.cancelled():
+                extracted_results.append(_failed_url_result(url, "提取超时"))
+                continue
+
+            try:
+                extracted_results.append(future.result())
+            except Exception as e:
+                # 捕获到异常，记录错误信息，但不影响整体success
+                overall_success = False
+                overall_error_message = f"提取过程中发生部分错误: {str(e)}"
+                extracted_results.append(_failed_url_result(url, str(e)))
 
     # 构建标准返回格式
     # success只关注函数执行过程中是否发生未捕获的异常，这里已经通过try-except处理了单个URL的异常
@@ -903,11 +1112,91 @@ def extract_urls_content(urls: List[str], topic="") -> Dict[str, Any]:
     }
 
 
-def _has_meaningful_content(page_soup):
+def _extract_url_content(url, deadline=None) -> Dict[str, Any]:
+    """提取单个链接的标题、发布时间和正文，优先使用页面缓存"""
+    cache = _get_page_cache()
+    cached = cache.get(url) if cache else None
+    if cache and cached and cached.is_fresh(cache.ttl):
+        return _url_result(url, cached.title, cached.pub_time, cached.content)
+
+    # 缓存过期但有校验信息时发起条件请求，未修改则直接复用提取结果
+    headers = get_common_headers()
+    if cached and cached.has_validator():
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    # 首先尝试普通方法
+    page, page_doc, pub_time, backend = None, None, None, None
+    try:
+        page = _fetch_page(url, headers, deadline)
+        if cache and cached and page.status == 304:
+            cache.touch(url)
+            return _url_result(url, cached.title, cached.pub_time, cached.content)
+        page_doc, pub_time, backend = _parse_page(page.raw, page.encoding)
+    except Exception:
+        pass
+
+    # 如果普通方法无法获取有效内容，使用Selenium
+    '''
+    if page_doc is None or not _has_meaningful_content(page_doc, backend):
+        selenium_tool = SeleniumScrapingTool(
+            website_url=url, wait_time=15, return_html=True
+        )
+        page_content = selenium_tool._run(website_url=url, css_element="body")
+        if page_content:
+            backend = _BS4_BACKEND
+            page_doc = backend.parse(page_content)
+            pub_time = _extract_publish_time(page_doc, backend)
+    '''
+    if page_doc is None:
+        # 页面加载失败，记录为提取失败，但不影响整体success
+        return _failed_url_result(url, "页面加载失败")
+
+    title = _extract_title_from_page(page_doc, backend) or ""
+    full_content = _extract_full_article_content(page_doc, backend)
+
+    if cache and page and page.status == 200 and full_content:
+        cache.put(
+            CachedPage(
+                url=url,
+                raw=page.raw,
+                encoding=page.encoding,
+                etag=page.etag,
+                last_modified=page.last_modified,
+                title=title,
+                pub_time=pub_time or "",
+                content=full_content,
+                fetched_at=time.time(),
+            )
+        )
+
+    return _url_result(url, title, pub_time, full_content)
+
+
+def _url_result(url, title, pub_time, content) -> Dict[str, Any]:
+    return {
+        "title": title or "",
+        "pub_time": pub_time or "",
+        "abstract": "",
+        "content": content,
+        "url": url,
+    }
+
+
+def _failed_url_result(url, reason) -> Dict[str, Any]:
+    return _url_result(url, "", "", f"无法提取内容: {reason}")
+
+
+def _has_meaningful_content(page_doc, backend=None):
     """检查页面是否包含有意义的内容，避免误判动态页面"""
-    if not page_soup:
+    if page_doc is None:
         return False
-    if page_soup.select_one("#js_content") or page_soup.select_one("meta[property='og:title']"):
+    backend = backend or _BS4_BACKEND
+    if backend.select_one(page_doc, "#js_content") is not None or (
+        backend.select_one(page_doc, "meta[property='og:title']") is not None
+    ):
         return True
     content_selectors = [
         "article",
@@ -920,16 +1209,17 @@ def _has_meaningful_content(page_soup):
         "[class*='content']",
     ]
     for selector in content_selectors:
-        if page_soup.select_one(selector):
+        if backend.select_one(page_doc, selector) is not None:
             return True
-    text = page_soup.get_text().strip()
+    text = backend.get_text(page_doc).strip()
     if len(text) > ENGINE_CONFIGS["MIN_ABSTRACT_LENGTH"]:
         return True
     return False
 
 
-def _extract_title_from_page(page_soup):
+def _extract_title_from_page(page_doc, backend=None):
     """从页面提取标题"""
+    backend = backend or _BS4_BACKEND
     title_selectors = [
         "title",
         "h1",
@@ -945,304 +1235,309 @@ def _extract_title_from_page(page_soup):
     ]
     for selector in title_selectors:
         if selector.startswith("meta"):
-            elem = page_soup.select_one(selector)
-            if elem:
-                title = elem.get("content", "").strip()
+            elem = backend.select_one(page_doc, selector)
+            if elem is not None:
+                title = (backend.get_attr(elem, "content") or "").strip()
                 if title:
                     return clean_text(title)
         else:
-            elem = page_soup.select_one(selector)
-            if elem:
-                title = elem.get_text().strip()
+            elem = backend.select_one(page_doc, selector)
+            if elem is not None:
+                title = backend.get_text(elem).strip()
                 if title and len(title) > 5:
                     return clean_text(title)
     return ""
 
 
-def _extract_full_article_content(page_soup):
-    """提取完整文章内容，过滤无关信息"""
-    # 定义噪声关键词，针对微信公众号和常见无关内容
-    noise_keywords = [
-        "微信扫一扫",
-        "扫描二维码",
-        "分享留言收藏",
-        "轻点两下取消",
-        "继续滑动看下一个",
-        "使用小程序",
-        "知道了",
-        "赞，轻点两下取消赞",
-        "在看，轻点两下取消在看",
-        "意见反馈",
-        "关于我们",
-        "联系我们",
-        "版权所有",
-        "All Rights Reserved",
-        "APP专享",
-        "VIP课程",
-        "海量资讯",
-        "热门推荐",
-        "24小时滚动播报",
-        "粉丝福利",
-        "sinafinance",
-        "预览时标签不可点",
-        "向上滑动看下一个",
-        "阅读原文",
-        "视频小程序",
-        "关注",
-        "粉丝",
-        "分享",
-        "搜索",
-        "关键词",
-        "Copyright",
-        "上一页",
-        "下一页",
-        "回复",
-        "评论",
-        "相关推荐",
-        "相关搜索",
-        "评论区",
-        "发表评论",
-        "查看更多评论",
-        "举报",
-        "热搜",
-    ]
+# 噪声关键词，针对微信公众号和常见无关内容；包含任一关键词的段落不输出
+_NOISE_KEYWORDS = [
+    "微信扫一扫",
+    "扫描二维码",
+    "分享留言收藏",
+    "轻点两下取消",
+    "继续滑动看下一个",
+    "使用小程序",
+    "知道了",
+    "赞，轻点两下取消赞",
+    "在看，轻点两下取消在看",
+    "意见反馈",
+    "关于我们",
+    "联系我们",
+    "版权所有",
+    "All Rights Reserved",
+    "APP专享",
+    "VIP课程",
+    "海量资讯",
+    "热门推荐",
+    "24小时滚动播报",
+    "粉丝福利",
+    "sinafinance",
+    "预览时标签不可点",
+    "向上滑动看下一个",
+    "阅读原文",
+    "视频小程序",
+    "关注",
+    "粉丝",
+    "分享",
+    "搜索",
+    "关键词",
+    "Copyright",
+    "上一页",
+    "下一页",
+    "回复",
+    "评论",
+    "相关推荐",
+    "相关搜索",
+    "评论区",
+    "发表评论",
+    "查看更多评论",
+    "举报",
+    "热搜",
+]
+
+# 所有关键词编译为一个正则，一次扫描完成匹配（长词优先）
+_NOISE_KEYWORDS_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(_NOISE_KEYWORDS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+# 整棵子树不参与正文提取的标签
+_SKIP_TAGS = frozenset(
+    "script style noscript template iframe svg head nav header footer aside".split()
+)
+
+# 与标签同样整棵跳过的 class / id：导航、广告、分享、评论、版权等区域
+_UNLIKELY_CLASS_RE = re.compile(
+    r"(?:^|\s)(?:ad|advertisement|sidebar|menu|promo|recommend|social-share|footer-links|"
+    r"live-room|stock-info|finance-nav|related-links|seo_data_list|right-side-ad|sinaads|"
+    r"cj-r-block|navigation|comment)(?=\s|$)"
+    r"|banner|promo|newsletter|signup|feedback|copyright|advert|social|share"
+)
+_UNLIKELY_ID_RE = re.compile(r"^commentModule$|footer|bottom|7x24")
+
+# class / id 中提示正文或无关区域的词，分别加减分
+_POSITIVE_HINT_RE = re.compile(
+    r"article|content|entry|main|post|story|body|text|detail|rich_?media|richtext|markdown|"
+    r"answer|blog|page",
+    re.IGNORECASE,
+)
+_NEGATIVE_HINT_RE = re.compile(
+    r"(?:^|[\s_-])(?:meta|related|rank|widget|tags?|author|byline|breadcrumb|pager|"
+    r"pagination|qr|hot|list|item|user|actions?)(?=[\s_-]|$)",
+    re.IGNORECASE,
+)
+_HINT_WEIGHT = 25
+
+# 块级标签：进入和离开时切分段落
+_PARAGRAPH_TAGS = frozenset(
+    "p div section article main blockquote pre li ul ol dl dt dd table tr td th "
+    "h1 h2 h3 h4 h5 h6 figure figcaption center textarea form body".split()
+)
+
+# 候选容器的基础分，与 Readability 一致
+_TAG_BASE_SCORES = {
+    "div": 5,
+    "article": 5,
+    "section": 3,
+    "pre": 3,
+    "td": 3,
+    "blockquote": 3,
+    "form": -3,
+    "ol": -3,
+    "ul": -3,
+    "dl": -3,
+    "li": -3,
+    "th": -5,
+    "h1": -5,
+    "h2": -5,
+    "h3": -5,
+    "h4": -5,
+    "h5": -5,
+    "h6": -5,
+}
 
-    # 第一步：移除无关元素
-    for elem in page_soup.select(
-        "script, style, nav, header, footer, aside, .ad, .advertisement, .sidebar, .menu, "
-        ".promo, .recommend, .social-share, .footer-links, [class*='banner'], [class*='promo'], "
-        "[class*='newsletter'], [class*='signup'], [class*='feedback'], [class*='copyright'], "
-        "[id*='footer'], [id*='bottom'], .live-room, .stock-info, .finance-nav, .related-links, "
-        ".seo_data_list, .right-side-ad, ins.sinaads, .cj-r-block, [id*='7x24'], .navigation,"
-        "[class*='advert'], [class*='social'], .comment, [class*='share'], #commentModule"
-    ):
-        elem.decompose()
+_COMMA_RE = re.compile(r"[，,、。；;]")
+_PARAGRAPH_MIN_LEN = 25  # 参与打分的段落最少字数
+_OUTPUT_MIN_LEN = 10  # 输出段落需超过的字数
+_MIN_TEXT_DENSITY = 8  # 每个标签平均文字数低于该值时按比例降分
+_SCORE_DIVIDERS = (1, 2, 6)  # 段落分数传给父、祖父、曾祖父节点时的除数
+
+
+class _BlockStats:
+    """遍历时每个元素的统计信息，离开元素时并入父元素"""
+
+    __slots__ = (
+        "parent",
+        "block",
+        "in_link",
+        "weight",
+        "text_len",
+        "link_len",
+        "tag_count",
+        "para_count",
+        "score",
+        "para_start",
+        "para_end",
+    )
+
+    def __init__(self, parent, is_block, in_link, weight):
+        self.parent = parent
+        self.block = self if is_block or parent is None else parent.block
+        self.in_link = in_link
+        self.weight = weight
+        self.text_len = 0
+        self.link_len = 0
+        self.tag_count = 1
+        self.para_count = 0
+        self.score = 0.0
+        self.para_start = 0
+        self.para_end = 0
+
+    def final_score(self):
+        """段落得分 + 标签/类名权重，再按链接密度和文字密度折算"""
+        link_density = self.link_len / self.text_len if self.text_len else 1.0
+        text_density = self.text_len / self.tag_count
+        score = (self.score + self.weight) * (1 - link_density)
+        return score * min(1.0, text_density / _MIN_TEXT_DENSITY)
+
+
+class ArticleScan(NamedTuple):
+    """一次遍历的结果：全部段落、得分最高的容器的段落区间、全部可见文字"""
+
+    paragraphs: List[str]
+    best_range: Optional[Tuple[int, int]]
+    text: str
+
+
+def scan_article(page_doc, backend=None) -> ArticleScan:
+    """
+    对 body 做一次深度优先遍历，完成正文定位所需的全部统计（Readability 思路）
+
+    - 跳过导航、广告、评论等区域（_SKIP_TAGS / _UNLIKELY_*），不修改文档
+    - 在块级标签边界切分段落，每个元素记录其子树内的段落区间
+    - 每个足够长的非噪声段落按逗号数和长度打分，分数传给上面三层祖先
+    - 每个元素统计文字数、链接文字数、标签数和段落数，离开元素时算出最终得分
+      （链接密度越高、文字密度越低得分越低），取得分最高的元素作为正文容器
+    """
+    backend = backend or _BS4_BACKEND
+    root = backend.select_one(page_doc, "body")
+    if root is None:
+        root = page_doc
+
+    paragraphs: List[str] = []
+    pending: List[str] = []  # 当前段落中尚未切分的文字片段
+    texts: List[str] = []
+    best_range, best_score = None, 0.0
+
+    def flush(owner):
+        if not pending:
+            return
+        text = clean_text("".join(pending))
+        pending.clear()
+        if not text:
+            return
+        paragraphs.append(text)
+        owner.para_count += 1
+        if len(text) < _PARAGRAPH_MIN_LEN or _NOISE_KEYWORDS_RE.search(text):
+            return
+
+        score = 1 + len(_COMMA_RE.findall(text)) + min(len(text) // 100, 3)
+        ancestor = owner.parent
+        for divider in _SCORE_DIVIDERS:
+            if ancestor is None:
+                break
+            ancestor.score += score / divider
+            ancestor = ancestor.parent
+
+    root_stats = _BlockStats(None, True, False, 0)
+    stack = [(root_stats, backend.iter_content(root))]
+    while stack:
+        stats, children = stack[-1]
+        for child in children:
+            if isinstance(child, str):
+                pending.append(child)
+                texts.append(child)
+                length = len(child.strip())
+                stats.text_len += length
+                if stats.in_link:
+                    stats.link_len += length
+                continue
 
-    # 第二步：定义正文选择器
-    content_selectors = [
-        # === 微信公众号 ===
-        "#js_content",  # 微信公众号主要正文容器
-        ".rich_media_content",  # 微信公众号富文本内容
-        ".rich_media_area_primary",  # 微信公众号主要内容区域
-        ".rich_media_wrp",  # 微信公众号包装器
-        # === 主流新闻网站 ===
-        ".post_body",  # 网易新闻、搜狐新闻
-        ".content_area",  # 新浪新闻
-        ".article-content",  # 腾讯新闻、凤凰网
-        ".art_context",  # 环球网
-        ".content",  # 人民网
-        ".article_content",  # 中新网
-        ".cont",  # 光明网
-        ".article-body",  # CNN、NYTimes、BBC等
-        ".story-body",  # BBC新闻
-        ".story-content",  # The Guardian
-        ".entry-content",  # The Washington Post
-        ".content__article-body",  # Guardian、Telegraph
-        ".js-entry-text",  # Wall Street Journal
-        ".story__body",  # Vox、The Verge
-        ".ArticleBody",  # Bloomberg
-        ".caas-body",  # Yahoo News
-        ".RichTextStoryBody",  # Reuters
-        ".InlineVideo-container",  # Associated Press
-        # === 中文新闻门户 ===
-        ".content_box",  # 今日头条
-        ".article-detail",  # 百度新闻
-        ".news_txt",  # 网易新闻详情
-        ".article_txt",  # 搜狐新闻
-        ".content_detail",  # 新浪新闻详情
-        ".detail-content",  # 澎湃新闻
-        ".m-article-content",  # 界面新闻
-        ".article-info",  # 财经网
-        ".news-content",  # 东方财富
-        ".art_con",  # 金融界
-        # === 博客平台 ===
-        ".post-content",  # WordPress默认
-        ".entry-content",  # WordPress主题
-        ".post-body",  # Blogger
-        ".entry-body",  # Movable Type
-        ".post__content",  # Ghost
-        ".article__content",  # Medium（部分主题）
-        ".post-full-content",  # Ghost主题
-        ".kg-card-markdown",  # Ghost Markdown卡片
-        ".content-body",  # Drupal
-        ".field-name-body",  # Drupal字段
-        ".node-content",  # Drupal节点
-        # === 技术博客和文档 ===
-        ".markdown-body",  # GitHub、GitBook
-        ".content",  # GitBook、Read the Docs
-        ".document",  # Sphinx文档
-        ".main-content",  # Jekyll、Hugo主题
-        ".post-content",  # Jekyll默认
-        ".content-wrap",  # Hexo主题
-        ".article-entry",  # Hexo默认
-        ".md-content",  # VuePress
-        ".theme-default-content",  # VuePress默认主题
-        ".docstring",  # 技术文档
-        ".rst-content",  # reStructuredText
-        # === 社交媒体和论坛 ===
-        ".usertext-body",  # Reddit
-        ".md",  # Reddit Markdown
-        ".timeline-item",  # GitHub
-        ".commit-message",  # GitHub提交信息
-        ".blob-wrapper",  # GitHub文件内容
-        ".answer",  # Stack Overflow
-        ".post-text",  # Stack Overflow问题/答案
-        ".question-summary",  # Stack Overflow
-        ".js-post-body",  # Stack Overflow
-        ".feed-item-content",  # LinkedIn
-        ".tweet-text",  # Twitter（旧版）
-        ".tweet-content",  # Twitter
-        # === 知识问答平台 ===
-        ".RichText",  # 知乎
-        ".content",  # 知乎回答内容
-        ".QuestionRichText",  # 知乎问题描述
-        ".AnswerItem",  # 知乎答案
-        ".Post-RichText",  # 知乎专栏
-        ".ArticleItem-content",  # 知乎文章
-        ".answer-content",  # 百度知道
-        ".best-text",  # 百度知道最佳答案
-        ".wgt-answers",  # 百度知道答案
-        # === 电商平台 ===
-        ".detail-content",  # 淘宝商品详情
-        ".rich-text",  # 京东商品描述
-        ".product-detail",  # 亚马逊商品详情
-        ".product-description",  # 通用商品描述
-        ".item-description",  # eBay商品描述
-        # === CMS系统 ===
-        ".node-content",  # Drupal
-        ".entry-content",  # WordPress
-        ".content-area",  # WordPress主题
-        ".single-content",  # WordPress单页
-        ".page-content",  # WordPress页面
-        ".post-entry",  # WordPress主题
-        ".article-content",  # Joomla
-        ".item-page",  # Joomla文章页
-        ".content-inner",  # Joomla内容
-        ".story-content",  # ExpressionEngine
-        ".channel-entry",  # ExpressionEngine
-        # === 企业网站 ===
-        ".main-content",  # 通用主内容
-        ".content-wrapper",  # 内容包装器
-        ".page-content",  # 页面内容
-        ".text-content",  # 文本内容
-        ".body-content",  # 主体内容
-        ".primary-content",  # 主要内容
-        ".content-main",  # 主内容区
-        ".content-primary",  # 主要内容
-        ".main-article",  # 主文章
-        ".article-main",  # 文章主体
-        # === 学术和教育网站 ===
-        ".abstract",  # 学术论文摘要
-        ".full-text",  # 全文内容
-        ".article-fulltext",  # 学术文章全文
-        ".article-body",  # 学术文章主体
-        ".paper-content",  # 论文内容
-        ".journal-content",  # 期刊内容
-        ".course-content",  # 课程内容
-        ".lesson-content",  # 课程内容
-        ".lecture-notes",  # 讲义笔记
-        # === 政府和机构网站 ===
-        ".gov-content",  # 政府网站内容
-        ".official-content",  # 官方内容
-        ".policy-content",  # 政策内容
-        ".announcement",  # 公告内容
-        ".notice-content",  # 通知内容
-        ".regulation-text",  # 法规文本
-        # === 多媒体和娱乐 ===
-        ".video-description",  # 视频描述
-        ".episode-description",  # 剧集描述
-        ".movie-synopsis",  # 电影简介
-        ".album-description",  # 专辑描述
-        ".track-description",  # 音轨描述
-        ".game-description",  # 游戏描述
-        # === HTML5语义化标签 ===
-        "article",  # HTML5文章标签
-        "main",  # HTML5主内容标签
-        "section",  # HTML5节段标签
-        # === 通用类名（模糊匹配） ===
-        "[class*='article']",  # 包含"article"的类名
-        "[class*='content']",  # 包含"content"的类名
-        "[class*='post']",  # 包含"post"的类名
-        "[class*='story']",  # 包含"story"的类名
-        "[class*='body']",  # 包含"body"的类名
-        "[class*='text']",  # 包含"text"的类名
-        "[class*='main']",  # 包含"main"的类名
-        "[class*='primary']",  # 包含"primary"的类名
-        "[class*='detail']",  # 包含"detail"的类名
-        # === ID选择器 ===
-        "#content",  # 通用内容ID
-        "#main-content",  # 主内容ID
-        "#article-content",  # 文章内容ID
-        "#post-content",  # 文章内容ID
-        "#story-content",  # 故事内容ID
-        "#main",  # 主要区域ID
-        "#primary",  # 主要内容ID
-        "#article-body",  # 文章主体ID
-        "#content-area",  # 内容区域ID
-        "#page-content",  # 页面内容ID
-        # === 特殊网站 ===
-        ".ztext",  # 知乎（旧版）
-        ".RichText-inner",  # 知乎富文本
-        ".highlight",  # 代码高亮（GitHub等）
-        ".gist-file",  # GitHub Gist
-        ".readme",  # GitHub README
-        ".wiki-content",  # Wiki页面
-        ".mw-parser-output",  # MediaWiki（维基百科）
-        ".printfriendly",  # 打印友好版本
-        ".reader-content",  # 阅读模式内容
-        # === 回退选择器 ===
-        ".main",  # 通用主内容类
-        "body",  # 最后的回退选择器
-    ]
+            tag = backend.tag_name(child)
+            if tag in _SKIP_TAGS:
+                continue
+            class_name = backend.get_attr(child, "class") or ""
+            element_id = backend.get_attr(child, "id") or ""
+            if _UNLIKELY_CLASS_RE.search(class_name) or _UNLIKELY_ID_RE.search(element_id):
+                continue
 
-    # 第三步：尝试找到正文容器
-    for selector in content_selectors:
-        content_elem = page_soup.select_one(selector)
-        if content_elem:
-            # 提取原始标签，添加去重和噪声过滤
-            text_parts = []
-            seen_texts = set()  # 用于去重
-            for elem in content_elem.find_all(
-                ["p", "h1", "h2", "h3", "h4", "h5", "h6", "div", "span"]
-            ):
-                text = clean_text(elem.get_text().strip())
-                if text and len(text) > 10 and text not in seen_texts:  # 过滤过短文本并去重
-                    # 过滤噪声关键词
-                    if not any(keyword in text.lower() for keyword in noise_keywords):
-                        text_parts.append(text)
-                        seen_texts.add(text)
-
-            if text_parts:
-                # 保留段落结构，清理多余换行符
-                full_text = "\n\n".join(text_parts)
-                full_text = re.sub(r"\n{3,}", "\n\n", full_text).strip()
-                if len(full_text) > ENGINE_CONFIGS["MIN_ABSTRACT_LENGTH"]:
-                    return full_text
-
-    # 第四步：回退到 body
-    body = page_soup.select_one("body")
-    if body:
-        for elem in body.select("nav, header, footer, aside, .ad, .advertisement, .sidebar, .menu"):
-            elem.decompose()
-
-        text_parts = []
-        seen_texts = set()
-        for elem in body.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6", "div", "span"]):
-            text = clean_text(elem.get_text().strip())
-            if text and len(text) > 10 and text not in seen_texts:
-                if not any(keyword in text.lower() for keyword in noise_keywords):
-                    text_parts.append(text)
-                    seen_texts.add(text)
-
-        if text_parts:
-            full_text = "\n\n".join(text_parts)
-            full_text = re.sub(r"\n{3,}", "\n\n", full_text).strip()
-            if len(full_text) > ENGINE_CONFIGS["MIN_ABSTRACT_LENGTH"]:
-                return full_text
-
-        # 第五步：极宽松回退，模仿原始版本
-        text = clean_text(body.get_text())
-        if text and len(text) > ENGINE_CONFIGS["MIN_ABSTRACT_LENGTH"]:
-            return text
+            hints = f"{class_name} {element_id}"
+            weight = _TAG_BASE_SCORES.get(tag, 0)
+            if _POSITIVE_HINT_RE.search(hints):
+                weight += _HINT_WEIGHT
+            if _NEGATIVE_HINT_RE.search(hints):
+                weight -= _HINT_WEIGHT
+
+            is_block = tag in _PARAGRAPH_TAGS
+            if is_block:
+                # 块级元素之前的文字属于外层段落
+                flush(stats.block)
+            child_stats = _BlockStats(stats, is_block, stats.in_link or tag == "a", weight)
+            child_stats.para_start = len(paragraphs)
+            stack.append((child_stats, backend.iter_content(child)))
+            break
+        else:
+            stack.pop()
+            if stats.block is stats:
+                flush(stats)
+            stats.para_end = len(paragraphs)
+
+            if stats.score > 0:
+                score = stats.final_score()
+                if score > best_score:
+                    best_range, best_score = (stats.para_start, stats.para_end), score
+
+            parent = stats.parent
+            if parent is not None:
+                parent.text_len += stats.text_len
+                parent.link_len += stats.link_len
+                parent.tag_count += stats.tag_count
+                parent.para_count += stats.para_count
+
+    return ArticleScan(paragraphs, best_range, "".join(texts))
+
+
+def _join_paragraphs(paragraphs):
+    """过滤过短、重复和含噪声关键词的段落，以空行连接"""
+    text_parts = []
+    seen_texts = set()
+    for text in paragraphs:
+        if len(text) > _OUTPUT_MIN_LEN and text not in seen_texts:
+            if not _NOISE_KEYWORDS_RE.search(text):
+                text_parts.append(text)
+                seen_texts.add(text)
+    return "\n\n".join(text_parts)
+
+
+def _extract_full_article_content(page_doc, backend=None):
+    """提取完整文章内容，过滤无关信息"""
+    scan = scan_article(page_doc, backend)
+
+    # 第一步：得分最高的正文容器
+    if scan.best_range:
+        start, end = scan.best_range
+        full_text = _join_paragraphs(scan.paragraphs[start:end])
+        if len(full_text) > ENGINE_CONFIGS["MIN_ABSTRACT_LENGTH"]:
+            return full_text
+
+    # 第二步：回退到 body 内全部段落
+    full_text = _join_paragraphs(scan.paragraphs)
+    if len(full_text) > ENGINE_CONFIGS["MIN_ABSTRACT_LENGTH"]:
+        return full_text
+
+    # 第三步：极宽松回退，模仿原始版本
+    text = clean_text(scan.text)
+    if text and len(text) > ENGINE_CONFIGS["MIN_ABSTRACT_LENGTH"]:
+        return text
 
     return ""
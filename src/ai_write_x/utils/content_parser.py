@@ -53,6 +53,66 @@ class ContentParser:
         else:
             return self._parse_plain_text(cleaned_content)
 
+    def parse_markdown_blocks(self, content: str) -> List[Dict[str, Any]]:
+        """
+        把 Markdown 正文（不含文章标题）按最高一级的标题切分为章节，每个章节包含完整的内容块：
+        heading（更低一级的小标题）、paragraph、list、quote。第一个标题之前的内容为 title 为空的章节
+        """
+        lines = content.split("\n")
+        headers = [re.match(r"^(#{1,6})\s+", line.strip()) for line in lines]
+        section_level = min((len(m.group(1)) for m in headers if m), default=0)
+
+        sections: List[Dict[str, Any]] = [{"title": "", "level": 0, "blocks": []}]
+        paragraph: List[str] = []
+        list_items: List[str] = []
+        quote: List[str] = []
+
+        def flush():
+            blocks = sections[-1]["blocks"]
+            if paragraph:
+                blocks.append({"type": "paragraph", "text": " ".join(paragraph)})
+                paragraph.clear()
+            if list_items:
+                blocks.append({"type": "list", "items": list(list_items)})
+                list_items.clear()
+            if quote:
+                blocks.append({"type": "quote", "text": " ".join(quote)})
+                quote.clear()
+
+        for line in lines:
+            line = line.strip()
+            header_match = re.match(r"^(#{1,6})\s+(.+)$", line)
+            list_match = re.match(r"^(?:[-*+]|\d+[.)])\s+(.+)$", line)
+            if header_match:
+                flush()
+                level = len(header_match.group(1))
+                title = header_match.group(2).strip()
+                if level == section_level:
+                    sections.append({"title": title, "level": level, "blocks": []})
+                else:
+                    sections[-1]["blocks"].append(
+                        {"type": "heading", "text": title, "level": level}
+                    )
+            elif not line or re.match(r"^([-*_]\s*){3,}$", line):
+                flush()
+            elif list_match:
+                if paragraph or quote:
+                    flush()
+                list_items.append(list_match.group(1).strip())
+            elif line.startswith(">"):
+                if paragraph or list_items:
+                    flush()
+                quote.append(line.lstrip("> ").strip())
+            else:
+                if list_items or quote:
+                    flush()
+                paragraph.append(line)
+        flush()
+
+        if not sections[0]["blocks"]:
+            sections.pop(0)
+        return sections
+
     def _clean_content(self, content: str) -> str:
         """清理内容，移除多余的空白和特殊字符"""
         # 移除多余的空行
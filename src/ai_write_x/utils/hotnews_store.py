@@ -0,0 +1,178 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.ai_write_x.utils.path_manager import PathManager
+
+
+class HotNewsStore:
+    """
+    热榜快照存储（SQLite，只追加）
+
+    - 每次抓取某个平台的热榜写入一个快照：平台、时间，以及每个条目的排名、热度、链接
+    - latest() 读取平台最近一次快照，供选题时代替实时请求（跨进程共享）
+    - rising() / history() 基于历史快照做趋势查询，不需要额外的网络请求
+    - 超过保留期的快照在写入时清理
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    DEFAULT_RETENTION = 7 * 24 * 3600
+
+    def __init__(self, db_path=None, retention=DEFAULT_RETENTION):
+        self.db_path = str(db_path or PathManager.get_cache_dir() / "hotnews.db")
+        self.retention = retention
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                platform TEXT NOT NULL,
+                taken_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshots_platform
+                ON snapshots(platform, taken_at);
+            CREATE TABLE IF NOT EXISTS items (
+                snapshot_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                last_count TEXT,
+                url TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_items_snapshot ON items(snapshot_id);
+            CREATE INDEX IF NOT EXISTS idx_items_name ON items(name);
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def append_snapshot(self, platform: str, items: List[Dict], taken_at=None) -> Optional[int]:
+        """写入一个平台的热榜快照，条目为 name/rank/lastCount/url 字典，返回快照 id"""
+        if not items:
+            return None
+        taken_at = taken_at or time.time()
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "INSERT INTO snapshots (platform, taken_at) VALUES (?, ?)", (platform, taken_at)
+            )
+            snapshot_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO items (snapshot_id, rank, name, last_count, url) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        snapshot_id,
+                        int(item.get("rank") or i + 1),
+                        item.get("name", ""),
+                        str(item.get("lastCount", "")),
+                        item.get("url", ""),
+                    )
+                    for i, item in enumerate(items)
+                    if item.get("name")
+                ],
+            )
+            self._prune(taken_at)
+            self._conn.commit()
+        return snapshot_id
+
+    def latest(self, platform: str, max_age=None) -> Optional[List[Dict]]:
+        """平台最近一次快照的条目（按排名），没有或早于 max_age 秒时返回 None"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT id, taken_at FROM snapshots WHERE platform = ? "
+                "ORDER BY taken_at DESC LIMIT 1",
+                (platform,),
+            ).fetchone()
+            if row is None or (max_age is not None and time.time() - row[1] > max_age):
+                return None
+            rows = self._conn.execute(
+                "SELECT rank, name, last_count, url FROM items WHERE snapshot_id = ? "
+                "ORDER BY rank",
+                (row[0],),
+            ).fetchall()
+        return [{"name": r[1], "rank": r[0], "lastCount": r[2], "url": r[3]} for r in rows]
+
+    def rising(self, platform=None, window=3600, limit=20) -> List[Dict[str, Any]]:
+        """
+        最近 window 秒内上升的话题：对比窗口内每个平台最早和最新的快照，
+        新上榜的话题 prev_rank 为 None，排在最前；其余按排名上升幅度排序
+        """
+        since = time.time() - window
+        sql = (
+            "SELECT platform, MIN(id), MAX(id) FROM snapshots WHERE taken_at >= ?"
+            + (" AND platform = ?" if platform else "")
+            + " GROUP BY platform"
+        )
+        params = (since, platform) if platform else (since,)
+
+        topics = []
+        with self._db_lock:
+            for pf, first_id, last_id in self._conn.execute(sql, params).fetchall():
+                first_ranks = dict(
+                    self._conn.execute(
+                        "SELECT name, MIN(rank) FROM items WHERE snapshot_id = ? GROUP BY name",
+                        (first_id,),
+                    ).fetchall()
+                )
+                for rank, name, last_count in self._conn.execute(
+                    "SELECT rank, name, last_count FROM items WHERE snapshot_id = ? "
+                    "ORDER BY rank",
+                    (last_id,),
+                ).fetchall():
+                    prev_rank = first_ranks.get(name) if first_id != last_id else rank
+                    if prev_rank is not None and prev_rank <= rank:
+                        continue
+                    topics.append(
+                        {
+                            "platform": pf,
+                            "name": name,
+                            "rank": rank,
+                            "prev_rank": prev_rank,
+                            "rank_change": prev_rank - rank if prev_rank is not None else None,
+                            "lastCount": last_count,
+                        }
+                    )
+
+        topics.sort(
+            key=lambda t: (t["prev_rank"] is not None, -(t["rank_change"] or 0), t["rank"])
+        )
+        return topics[:limit]
+
+    def history(self, name: str, platform=None, since=None) -> List[Dict[str, Any]]:
+        """某个话题在各次快照中的排名变化（按时间升序）"""
+        sql = (
+            "SELECT s.platform, s.taken_at, i.rank, i.last_count FROM items i "
+            "JOIN snapshots s ON s.id = i.snapshot_id WHERE i.name = ?"
+        )
+        params: List[Any] = [name]
+        if platform:
+            sql += " AND s.platform = ?"
+            params.append(platform)
+        if since:
+            sql += " AND s.taken_at >= ?"
+            params.append(since)
+        sql += " ORDER BY s.taken_at"
+
+        with self._db_lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"platform": r[0], "taken_at": r[1], "rank": r[2], "lastCount": r[3]} for r in rows
+        ]
+
+    def _prune(self, now):
+        expired = now - self.retention
+        self._conn.execute(
+            "DELETE FROM items WHERE snapshot_id IN (SELECT id FROM snapshots WHERE taken_at < ?)",
+            (expired,),
+        )
+        self._conn.execute("DELETE FROM snapshots WHERE taken_at < ?", (expired,))
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from src.ai_write_x.utils.path_manager import PathManager
+
+
+# LLM 响应缓存配置
+LLM_CACHE_CONFIGS = {
+    # off：不使用；read-write：命中直接返回，未命中调用后写入；
+    # read-only：只回放缓存，未命中时报错而不调用大模型（离线复现、基准测试）
+    # 环境变量 AIWRITEX_LLM_CACHE 优先，便于对子进程生效
+    "mode": "off",
+    "ttl": 7 * 24 * 3600,  # 条目有效期（秒）
+    "max_entries": 5000,
+    "max_bytes": 200 * 1024 * 1024,
+}
+
+LLM_CACHE_MODES = ("off", "read-write", "read-only")
+
+
+def get_cache_mode() -> str:
+    mode = os.environ.get("AIWRITEX_LLM_CACHE") or LLM_CACHE_CONFIGS["mode"]
+    return mode if mode in LLM_CACHE_MODES else "off"
+
+
+class LLMCacheMiss(RuntimeError):
+    """read-only（回放）模式下缓存未命中"""
+
+
+class LLMResponseCache:
+    """
+    大模型响应的磁盘缓存（SQLite）
+
+    - 以模型、消息、temperature、max_tokens、stop 的 sha256 为键
+    - 超过 ttl 的条目视为未命中并在写入时清除
+    - 超过 max_entries 或 max_bytes 时按最近访问时间淘汰（LRU）
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, db_path=None, ttl=None, max_entries=None, max_bytes=None):
+        self.db_path = str(db_path or PathManager.get_cache_dir() / "llm_cache.db")
+        self.ttl = ttl or LLM_CACHE_CONFIGS["ttl"]
+        self.max_entries = max_entries or LLM_CACHE_CONFIGS["max_entries"]
+        self.max_bytes = max_bytes or LLM_CACHE_CONFIGS["max_bytes"]
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def make_key(model: str, messages: Any, temperature=None, max_tokens=None, stop=None) -> str:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stop": stop or [],
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, "
+                "accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._db_lock:
+            count, size, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": size, "hits": hits, "mode": get_cache_mode()}
+
+    def clear(self):
+        with self._db_lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # 淘汰到上限的 90%，避免每次写入都触发淘汰
+        target_count = int(self.max_entries * 0.9)
+        target_bytes = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        expired_keys = []
+        for key, size in rows:
+            if count <= target_count and total <= target_bytes:
+                break
+            expired_keys.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", expired_keys)
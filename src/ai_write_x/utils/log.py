@@ -1,9 +1,14 @@
+import atexit
+import collections
+import json
 import logging
+import os
 import sys
 import re
 import time
 import traceback
 import multiprocessing
+import multiprocessing.util
 import threading
 from datetime import datetime
 
@@ -11,35 +16,148 @@ from src.ai_write_x.utils import comm
 from src.ai_write_x.utils import utils
 
 
+# 日志文件写入配置
+FILE_LOG_CONFIGS = {
+    "flush_interval": 0.5,  # 写入线程批量写入的间隔（秒）
+    "max_bytes": 10 * 1024 * 1024,  # 单个日志文件超过该大小时轮转为 .1、.2 ...
+    "backup_count": 5,  # 每个日志文件最多保留的轮转文件数
+    "jsonl": False,  # 同时写入结构化的 .jsonl 文件（每行一条消息的 JSON）
+}
+
+
 class FileLoggingHandler:
-    """统一的文件日志处理器"""
+    """
+    统一的文件日志处理器
+
+    write_log 只把消息追加到内存缓冲，不做文件操作，可以在事件循环中调用；
+    后台写入线程每隔 flush_interval 秒把缓冲中的消息批量写入长期打开的日志文件。
+    路径中的 {date} 按消息日期替换，日期变化时自动换到新文件；文件超过 max_bytes 时按
+    name.1、name.2 ... 轮转。开启 jsonl 时在同名 .jsonl 文件中写入结构化消息
+    """
 
     def __init__(self, log_file_path):
-        self.log_file_path = log_file_path
-        self._lock = threading.Lock()
+        self.log_file_path = str(log_file_path)
+        self._pending = collections.deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        # 当前打开的文件：路径 -> 文件对象（文本日志和 jsonl 各一个）
+        self._files = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-file-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
 
     def write_log(self, msg_dict):
         """
-        写入日志到文件
+        写入日志到文件（由写入线程批量写入）
 
         Args:
             msg_dict: 包含type, message, timestamp的字典
         """
-        try:
-            with self._lock:
+        with self._cond:
+            if not self._closed:
+                self._pending.append(msg_dict)
+
+    def flush(self):
+        """在调用线程中立即写入缓冲中的日志"""
+        with self._write_lock:
+            with self._cond:
+                messages = list(self._pending)
+                self._pending.clear()
+            if messages:
+                self._write(messages)
+            for f in self._files.values():
+                try:
+                    f.flush()
+                except Exception:
+                    pass
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush()
+        with self._write_lock:
+            for f in self._files.values():
+                try:
+                    f.close()
+                except Exception:
+                    pass
+            self._files.clear()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait(FILE_LOG_CONFIGS["flush_interval"])
+            self.flush()
+
+    def _write(self, messages):
+        settings = FILE_LOG_CONFIGS
+        lines, records = {}, {}
+        for msg_dict in messages:
+            try:
                 timestamp = msg_dict.get("timestamp", time.time())
                 msg_type = msg_dict.get("type", "info")
                 message = msg_dict.get("message", "")
+                moment = datetime.fromtimestamp(timestamp)
+                path = self.log_file_path.replace("{date}", moment.strftime("%Y-%m-%d"))
 
                 # 统一格式化
-                log_entry = f"[{datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')}] [{msg_type.upper()}]: {message}"  # noqa 501
+                log_entry = f"[{moment.strftime('%H:%M:%S')}] [{msg_type.upper()}]: {message}"
+                lines.setdefault(path, []).append(log_entry + "\n")
+                if settings["jsonl"]:
+                    record = json.dumps(msg_dict, ensure_ascii=False, default=str)
+                    records.setdefault(self._jsonl_path(path), []).append(record + "\n")
+            except Exception:
+                # 静默跳过无法格式化的消息
+                pass
 
-                with open(self.log_file_path, "a", encoding="utf-8") as f:
-                    f.write(log_entry + "\n")
-                    f.flush()
-        except Exception:
-            # 静默处理文件写入错误
-            pass
+        for batches in (lines, records):
+            for path, batch in batches.items():
+                try:
+                    self._file(path).write("".join(batch))
+                except Exception:
+                    # 静默处理文件写入错误
+                    pass
+        self._close_stale(set(lines) | set(records))
+
+    @staticmethod
+    def _jsonl_path(path):
+        root, _ = os.path.splitext(path)
+        return root + ".jsonl"
+
+    def _file(self, path):
+        f = self._files.get(path)
+        if f is not None and f.tell() >= FILE_LOG_CONFIGS["max_bytes"]:
+            f.close()
+            del self._files[path]
+            self._rotate(path)
+            f = None
+        if f is None:
+            f = open(path, "a", encoding="utf-8")
+            self._files[path] = f
+        return f
+
+    @staticmethod
+    def _rotate(path):
+        backup_count = FILE_LOG_CONFIGS["backup_count"]
+        for i in range(backup_count - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        if backup_count > 0:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+
+    def _close_stale(self, active):
+        """日期变化后，关闭不再写入的前一天的文件"""
+        for path in [path for path in self._files if path not in active]:
+            try:
+                self._files.pop(path).close()
+            except Exception:
+                pass
 
 
 class LogManager:
@@ -59,11 +177,15 @@ class LogManager:
         # 日志系统的核心状态
         self._ui_mode = False  # 默认为命令行模式
         self._process_log_queue = None  # 进程间日志队列
+        self._token_listeners = None  # 流式输出接收标志（进程间 Event）
         self._file_handler = None
 
     def set_file_handler(self, log_file_path):
-        """设置文件日志处理器"""
-
+        """设置文件日志处理器，路径不变时沿用已打开的处理器"""
+        if self._file_handler and self._file_handler.log_file_path == str(log_file_path):
+            return
+        if self._file_handler:
+            self._file_handler.close()
         self._file_handler = FileLoggingHandler(log_file_path)
 
     def get_file_handler(self):
@@ -94,6 +216,14 @@ class LogManager:
         """获取进程间日志队列"""
         return self._process_log_queue
 
+    def set_token_listeners(self, event):
+        """设置流式输出接收标志"""
+        self._token_listeners = event
+
+    def get_token_listeners(self):
+        """获取流式输出接收标志"""
+        return self._token_listeners
+
 
 # 全局日志管理器实例
 _log_manager = LogManager.get_instance()
@@ -117,6 +247,19 @@ def set_process_queue(queue):
     _log_manager.set_process_log_queue(queue)
 
 
+def set_token_listeners(event):
+    """
+    设置流式输出接收标志（进程间 Event）：Web 服务中由日志推送桥创建，有 /ws/generate/logs 连接时置位；
+    交互生成的任务子进程随启动参数接收并设置，批量和排队任务不设置
+    """
+    _log_manager.set_token_listeners(event)
+
+
+def get_token_listeners():
+    """获取流式输出接收标志，未设置时为 None"""
+    return _log_manager.get_token_listeners()
+
+
 def strip_ansi_codes(text):
     """去除 ANSI 颜色代码"""
     ansi_pattern = r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])"
@@ -155,19 +298,140 @@ class ProcessLoggingHandler(logging.Handler):
             pass
 
 
+# 子进程日志批量传输配置
+LOG_TRANSPORT_CONFIGS = {
+    "flush_interval": 0.05,  # 发送间隔（秒），也是未换行内容最多等待的时间
+    "max_frame_bytes": 32 * 1024,  # 待发送内容达到该大小时立即发送
+    "max_frame_records": 500,  # 待发送条数达到该数量时立即发送
+}
+
+# 这些消息（任务结束、进程池事件、退出通知）连同之前积累的日志立即发送
+_URGENT_LOG_TYPES = {"internal", "pool", "system"}
+
+
+def unpack_messages(msg):
+    """
+    把从进程间日志队列读到的一项展开为消息列表：批量帧展开为其中的各条消息，
+    帧上附加的字段（如批量任务的 task_id）补充到每条消息中
+    """
+    if not isinstance(msg, dict) or msg.get("type") != "batch":
+        return [msg]
+    extra = {k: v for k, v in msg.items() if k not in ("type", "messages")}
+    if not extra:
+        return msg.get("messages", [])
+    return [{**extra, **item} for item in msg.get("messages", [])]
+
+
+class BatchedLogQueue:
+    """
+    子进程日志的批量传输
+
+    子进程中的 print_log、标准输出和 logging 都写入本对象（接口同队列的 put），
+    写入前先取出标准输出中已缓冲的内容，消息按写入顺序积累在内存中，由一个常驻发送线程每隔 flush_interval 秒
+    （或积累到 max_frame_bytes / max_frame_records 时）打包成一帧
+    {"type": "batch", "messages": [...]} 放入进程间队列，只有一条时直接发送该消息。
+    任务结束等消息（_URGENT_LOG_TYPES）在调用线程中立即连同之前的日志一起发送，保证顺序。
+    读取方用 unpack_messages() 展开
+    """
+
+    def __init__(self, process_queue):
+        self.process_queue = process_queue
+        self._records = collections.deque()
+        self._bytes = 0
+        self._streams = []
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-transport", daemon=True)
+        self._thread.start()
+        # 子进程退出时（multiprocessing 在退出前执行 Finalize）发送剩余日志，优先于队列自身的清理
+        multiprocessing.util.Finalize(self, self.close, exitpriority=100)
+
+    def add_stream(self, stream):
+        """登记标准输出处理器，发送前先取出其中已缓冲的内容"""
+        self._streams.append(stream)
+
+    def put(self, message, *args, **kwargs):
+        # 标准输出中先写入的内容排在前面
+        for stream in self._streams:
+            stream.drain(force=True)
+        self.append(message)
+        if isinstance(message, dict) and message.get("type") in _URGENT_LOG_TYPES:
+            self._send()
+
+    def append(self, message):
+        """追加一条消息，由发送线程发送"""
+        settings = LOG_TRANSPORT_CONFIGS
+        with self._cond:
+            self._records.append(message)
+            if isinstance(message, dict):
+                self._bytes += len(str(message.get("message", ""))) + 64
+            if (
+                self._bytes >= settings["max_frame_bytes"]
+                or len(self._records) >= settings["max_frame_records"]
+            ):
+                self._cond.notify()
+
+    def flush(self):
+        """在调用线程中立即发送所有已积累的日志（包括标准输出中未换行的内容）"""
+        for stream in self._streams:
+            stream.drain(force=True)
+        self._send()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush()
+
+    def _send(self):
+        with self._send_lock:
+            with self._cond:
+                if not self._records:
+                    return
+                records = list(self._records)
+                self._records.clear()
+                self._bytes = 0
+            frame = records[0] if len(records) == 1 else {"type": "batch", "messages": records}
+            try:
+                self.process_queue.put(frame, timeout=1.0)
+            except Exception:
+                pass
+
+    def _run(self):
+        settings = LOG_TRANSPORT_CONFIGS
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if (
+                    self._bytes < settings["max_frame_bytes"]
+                    and len(self._records) < settings["max_frame_records"]
+                ):
+                    self._cond.wait(settings["flush_interval"])
+            for stream in self._streams:
+                stream.drain()
+            self._send()
+
+
 class ProcessStreamHandler:
-    """进程专用标准输出处理器"""
+    """
+    进程专用标准输出处理器
 
-    def __init__(self, process_queue: multiprocessing.Queue):
+    write 只把内容追加到缓冲列表；由 BatchedLogQueue 的发送线程定期取出：完整的行立即取出，
+    未换行的内容超过 flush_interval 后取出，按 [AIForge] 标识切分为多条 print 消息
+    """
+
+    def __init__(self, process_queue):
         self.process_queue = process_queue
         self.original_stdout = sys.__stdout__
-        self._buffer = ""
-        self._last_write_time = 0
-        self._flush_delay = 0.05  # 减少延迟
-        self._timer = None
+        self._chunks = []
+        self._size = 0
+        self._since = 0.0  # 缓冲中最早内容的写入时间
+        self._max_buffer_size = 10000  # 缓冲超过该长度时立即取出，防止超长内容积累
         self._lock = threading.Lock()
-        self._pending_flush = False
-        self._max_buffer_size = 10000  # 添加缓冲区大小限制
+        if isinstance(process_queue, BatchedLogQueue):
+            process_queue.add_stream(self)
 
     def write(self, msg):
         if not msg:
@@ -182,97 +446,65 @@ class ProcessStreamHandler:
                 pass
 
         with self._lock:
-            current_time = time.time()
-            self._buffer += msg
-            self._last_write_time = current_time
-
-            # 检查缓冲区大小，防止超长内容积累
-            if len(self._buffer) > self._max_buffer_size:
-                self._force_flush()
+            if not self._chunks:
+                self._since = time.monotonic()
+            self._chunks.append(msg)
+            self._size += len(msg)
+            overflow = self._size > self._max_buffer_size
+        if overflow or not isinstance(self.process_queue, BatchedLogQueue):
+            self.drain(force=True)
+
+    def drain(self, force=False):
+        """取出缓冲内容发送；force=False 时未换行且未超时的结尾部分留在缓冲中"""
+        with self._lock:
+            if not self._chunks:
                 return
-
-            # 检测AIForge标识，立即处理
-            if "[AIForge]" in self._buffer:
-                # 按AIForge标识切分并处理
-                parts = self._buffer.split("[AIForge]")
-                for i, part in enumerate(parts[:-1]):
-                    if i == 0 and part.strip():
-                        clean_msg = strip_ansi_codes(part.strip())
-                        self._send_to_queue(clean_msg)
-                    elif i > 0:
-                        aiforge_msg = f"[AIForge]{part}"
-                        clean_msg = strip_ansi_codes(aiforge_msg.strip())
-                        if clean_msg:
-                            self._send_to_queue(clean_msg)
-
-                # 保留最后一个不完整的部分
-                last_part = parts[-1]
-                if last_part.startswith("[AIForge]") or not last_part.strip():
-                    self._buffer = last_part
-                else:
-                    self._buffer = f"[AIForge]{last_part}"
-
-            # 检查换行符处理（无论是否处理了AIForge）
-            if "\\n" in self._buffer:
-                # 取消任何待处理的定时器
-                if self._timer and self._timer.is_alive():
-                    self._timer.cancel()
-                    self._timer = None
-                self._pending_flush = False
-
-                lines = self._buffer.split("\\n")
-                for line in lines[:-1]:
-                    if line.strip():
-                        clean_msg = strip_ansi_codes(line.strip())
-                        self._send_to_queue(clean_msg)
-
-                self._buffer = lines[-1]
+            text = "".join(self._chunks)
+            expired = time.monotonic() - self._since >= LOG_TRANSPORT_CONFIGS["flush_interval"]
+            if force or expired:
+                rest = ""
             else:
-                # 设置延迟刷新
-                if not self._pending_flush:
-                    self._pending_flush = True
-                    self._timer = threading.Timer(self._flush_delay, self._delayed_flush)
-                    self._timer.start()
-
-    def _force_flush(self):
-        """强制刷新超长内容"""
-        if self._buffer.strip():
-            clean_msg = strip_ansi_codes(self._buffer.strip())
-            # 统一格式化
-            self._send_to_queue({"type": "print", "message": clean_msg, "timestamp": time.time()})
-            self._buffer = ""
+                cut = text.rfind("\n") + 1
+                text, rest = text[:cut], text[cut:]
+            self._chunks = [rest] if rest else []
+            self._size = len(rest)
+            if rest:
+                self._since = time.monotonic()
+
+            if "[AIForge]" in text:
+                # 按 AIForge 标识切分，每段单独发送
+                first, *parts = text.split("[AIForge]")
+                messages = [first] + [f"[AIForge]{part}" for part in parts]
+            else:
+                messages = [text]
+            for message in messages:
+                clean_msg = strip_ansi_codes(message.strip())
+                if clean_msg:
+                    self._send_to_queue(clean_msg)
 
     def _send_to_queue(self, message):
         """安全地发送消息到队列"""
+        message = {"type": "print", "message": message, "timestamp": time.time()}
         try:
-            # 确保消息格式统一
-            if isinstance(message, str):
-                formatted_message = {"type": "print", "message": message, "timestamp": time.time()}
+            if isinstance(self.process_queue, BatchedLogQueue):
+                self.process_queue.append(message)
             else:
-                formatted_message = message
-
-            self.process_queue.put(formatted_message, timeout=1.0)
+                self.process_queue.put(message, timeout=1.0)
         except Exception:
             pass
 
-    def _delayed_flush(self):
-        """延迟刷新缓冲区"""
-        with self._lock:
-            if self._pending_flush:
-                self.flush()
-                self._pending_flush = False
-            self._timer = None
-
     def flush(self):
-        # 发送缓冲区中剩余的内容
-        if self._buffer.strip():
-            clean_msg = strip_ansi_codes(self._buffer.strip())
-            self._send_to_queue({"type": "print", "message": clean_msg, "timestamp": time.time()})
-            self._buffer = ""
+        # 取出缓冲中剩余的内容，由发送线程发送
+        self.drain(force=True)
+
 
+def setup_process_logging(process_queue: multiprocessing.Queue) -> BatchedLogQueue:
+    """
+    在子进程中设置日志系统，返回包装了 process_queue 的批量传输对象；
+    子进程中之后的所有日志和控制消息都应写入返回的对象，保证顺序
+    """
+    process_queue = BatchedLogQueue(process_queue)
 
-def setup_process_logging(process_queue: multiprocessing.Queue):
-    """在子进程中设置日志系统"""
     # 1. 重定向所有标准输出
     sys.stdout = ProcessStreamHandler(process_queue)
     sys.stderr = ProcessStreamHandler(process_queue)
@@ -298,6 +530,8 @@ def setup_process_logging(process_queue: multiprocessing.Queue):
     crewai_logger.setLevel(logging.WARNING)  # 只显示警告和错误
     crewai_logger.propagate = True
 
+    return process_queue
+
 
 # ==================== 线程间通信日志处理器 ====================
 
@@ -475,6 +709,44 @@ def print_log(msg, msg_type="status", show_in_ui=True):
         print(utils.format_log_message(msg, msg_type))
 
 
+def token_stream_enabled() -> bool:
+    """是否有人接收大模型的流式输出：Web 界面交互生成的子进程中，且当前有日志连接"""
+    listeners = _log_manager.get_token_listeners()
+    return (
+        _log_manager.get_process_log_queue() is not None
+        and listeners is not None
+        and listeners.is_set()
+    )
+
+
+def print_token(text, stream_id, stage="", end=False):
+    """
+    发送大模型的流式输出片段，由 /ws/generate/logs 推送给前端逐段渲染
+
+    Args:
+        text: 输出片段
+        stream_id: 区分每次大模型调用
+        stage: 所属工作流名称
+        end: 该次调用的输出是否结束
+    """
+    process_log_queue = _log_manager.get_process_log_queue()
+    if process_log_queue is None:
+        return
+    try:
+        process_log_queue.put(
+            {
+                "type": "token",
+                "message": text,
+                "stream_id": stream_id,
+                "stage": stage,
+                "end": end,
+                "timestamp": time.time(),
+            }
+        )
+    except Exception:
+        pass
+
+
 def print_traceback(what, e):
     """统一错误追踪接口函数"""
     error_traceback = traceback.format_exc()
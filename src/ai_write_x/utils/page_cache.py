@@ -0,0 +1,187 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.ai_write_x.utils.path_manager import PathManager
+
+
+@dataclass
+class CachedPage:
+    """缓存的页面：原始响应、校验信息以及已提取的结构化结果"""
+
+    url: str
+    raw: bytes
+    encoding: str
+    etag: str
+    last_modified: str
+    title: str
+    pub_time: str
+    content: str
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def has_validator(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+def normalize_url(url: str) -> str:
+    """规范化URL作为缓存键：协议和域名小写、去掉默认端口和锚点、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (
+        scheme == "https" and netloc.endswith(":443")
+    ):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+class PageCache:
+    """
+    页面提取结果的磁盘缓存（SQLite）
+
+    - 以规范化URL的 sha256 为键
+    - 保存原始字节、编码、ETag/Last-Modified 以及提取出的标题/发布时间/正文
+    - ttl 内直接命中；过期但有校验信息的条目用于条件请求（If-None-Match / If-Modified-Since）
+    - 超过 max_bytes 时按最近访问时间淘汰（LRU），超过 max_age 的条目直接清除
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    DEFAULT_TTL = 24 * 3600
+    DEFAULT_MAX_AGE = 7 * 24 * 3600
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, db_path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, max_age=None):
+        self.db_path = str(db_path or PathManager.get_cache_dir() / "page_cache.db")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_age = max_age or max(ttl, self.DEFAULT_MAX_AGE)
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                raw BLOB,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                title TEXT,
+                pub_time TEXT,
+                content TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed_at)")
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def make_key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """读取缓存条目（不判断是否过期），命中时刷新访问时间"""
+        key = self.make_key(url)
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT url, raw, encoding, etag, last_modified, title, pub_time, content, "
+                "fetched_at FROM pages WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        return CachedPage(
+            url=row[0],
+            raw=row[1] or b"",
+            encoding=row[2] or "utf-8",
+            etag=row[3] or "",
+            last_modified=row[4] or "",
+            title=row[5] or "",
+            pub_time=row[6] or "",
+            content=row[7] or "",
+            fetched_at=row[8],
+        )
+
+    def put(self, page: CachedPage):
+        """写入或覆盖缓存条目，并按容量淘汰"""
+        size = len(page.raw) + len(page.content.encode("utf-8"))
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, raw, encoding, etag, last_modified, "
+                "title, pub_time, content, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.make_key(page.url),
+                    page.url,
+                    page.raw,
+                    page.encoding,
+                    page.etag,
+                    page.last_modified,
+                    page.title,
+                    page.pub_time,
+                    page.content,
+                    size,
+                    page.fetched_at,
+                    now,
+                ),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def touch(self, url: str):
+        """条件请求返回 304 时调用，视为重新获取"""
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, self.make_key(url)),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._db_lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (now - self.max_age,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # 淘汰到容量的 90%，避免每次写入都触发淘汰
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM pages ORDER BY accessed_at").fetchall()
+        expired_keys = []
+        for key, size in rows:
+            if total <= target:
+                break
+            expired_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", expired_keys)
@@ -8,6 +8,9 @@ from src.ai_write_x.utils import utils
 class PathManager:
     """跨平台路径管理器，确保所有写入操作使用正确的可写目录"""
 
+    # 发布模式下默认模板是否已检查/复制到用户目录（每个进程只需检查一次）
+    _templates_prepared = False
+
     @staticmethod
     def get_app_data_dir():
         """获取应用数据目录"""
@@ -52,6 +55,8 @@ class PathManager:
         else:
             # 发布模式：使用用户数据目录
             template_dir = PathManager.get_app_data_dir() / "templates"
+            if PathManager._templates_prepared:
+                return template_dir
             template_dir.mkdir(parents=True, exist_ok=True)
 
             # 首次运行时，从资源目录复制默认模板到用户目录
@@ -62,6 +67,7 @@ class PathManager:
 
                 shutil.copytree(res_template_dir, template_dir, dirs_exist_ok=True)
 
+            PathManager._templates_prepared = True
             return template_dir
 
     @staticmethod
@@ -85,6 +91,13 @@ class PathManager:
         temp_dir.mkdir(parents=True, exist_ok=True)
         return temp_dir
 
+    @staticmethod
+    def get_cache_dir():
+        """获取缓存目录（网页、模板等可重建的数据）"""
+        cache_dir = PathManager.get_app_data_dir() / "cache"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return cache_dir
+
     @staticmethod
     def get_config_path(file_name="config.yaml"):
         """获取配置文件的完整路径"""
@@ -108,25 +121,13 @@ class PathManager:
 
     @staticmethod
     def get_all_categories(default_template_categories):
-        """动态获取所有分类文件夹名称"""
-        template_dir = str(PathManager.get_template_dir())
-        categories = []
-        excluded_dirs = {"components", "__pycache__", ".git"}
-
-        # 添加默认分类
-        default_categories = list(default_template_categories.values())
-        categories.extend(default_categories)
-
-        # 扫描实际存在的文件夹
-        if os.path.exists(template_dir):
-            for item in os.listdir(template_dir):
-                item_path = os.path.join(template_dir, item)
-                if (
-                    os.path.isdir(item_path)
-                    and item not in categories
-                    and item not in excluded_dirs
-                ):
-                    categories.append(item)
+        """动态获取所有分类文件夹名称（默认分类 + 模板注册表中实际存在的分类）"""
+        from src.ai_write_x.utils.template_registry import TemplateRegistry
+
+        categories = list(default_template_categories.values())
+        for category in TemplateRegistry.get_instance().categories():
+            if category not in categories:
+                categories.append(category)
 
         return sorted(categories)
 
@@ -136,12 +137,6 @@ class PathManager:
         if not category or category == "随机分类":
             return []
 
-        template_dir = str(PathManager.get_template_dir())
-        category_path = os.path.join(template_dir, category)
-
-        if not os.path.exists(category_path):
-            return []
+        from src.ai_write_x.utils.template_registry import TemplateRegistry
 
-        template_files = glob.glob(os.path.join(category_path, "*.html"))
-        template_names = [os.path.splitext(os.path.basename(f))[0] for f in template_files]
-        return sorted(template_names)
+        return sorted(entry.name for entry in TemplateRegistry.get_instance().templates(category))
@@ -0,0 +1,111 @@
+import hashlib
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.ai_write_x.utils import log
+from src.ai_write_x.utils import utils
+
+
+# 模板填充提示词预处理配置
+TEMPLATE_BUDGET_CONFIGS = {
+    "collapse_styles": True,  # 重复的内联样式替换为短占位符，大模型返回后还原
+    "min_style_repeats": 2,  # 样式出现至少这么多次才替换
+    "min_style_length": 24,  # 样式长度至少这么长才替换（太短的替换后反而不省）
+    "report_tokens": True,  # 输出压缩前后的 token 数
+}
+
+# 占位符：@s + 样式内容 sha1 的前 6 位，同一样式在任何模板中都得到同一个占位符
+_PLACEHOLDER_RE = re.compile(r"@s[0-9a-f]{6}")
+_STYLE_ATTR_RE = re.compile(r'style="([^"]*)"')
+
+# 进程内占位符 -> 样式，模板集合有限，不做淘汰
+_placeholders: Dict[str, str] = {}
+_placeholders_lock = threading.Lock()
+
+
+def _placeholder(style: str) -> str:
+    return "@s" + hashlib.sha1(style.encode("utf-8")).hexdigest()[:6]
+
+
+def collapse_styles(html: str) -> Tuple[str, Dict[str, str]]:
+    """把重复出现的内联样式替换为占位符，返回替换后的 HTML 和本次用到的占位符映射"""
+    settings = TEMPLATE_BUDGET_CONFIGS
+    counts: Dict[str, int] = {}
+    for style in _STYLE_ATTR_RE.findall(html):
+        counts[style] = counts.get(style, 0) + 1
+
+    mapping = {
+        _placeholder(style): style
+        for style, count in counts.items()
+        if count >= settings["min_style_repeats"] and len(style) >= settings["min_style_length"]
+    }
+    if not mapping:
+        return html, {}
+
+    with _placeholders_lock:
+        _placeholders.update(mapping)
+
+    reverse = {style: placeholder for placeholder, style in mapping.items()}
+
+    def replace(match):
+        placeholder = reverse.get(match.group(1))
+        return f'style="{placeholder}"' if placeholder else match.group(0)
+
+    return _STYLE_ATTR_RE.sub(replace, html), mapping
+
+
+def expand_styles(html: str, mapping: Optional[Dict[str, str]] = None) -> str:
+    """
+    还原 style 属性中的占位符；大模型可能在占位符前后追加样式，只替换占位符本身。
+    未指定映射时使用进程内所有已知占位符
+    """
+    if not html or "@s" not in html:
+        return html
+    if mapping is None:
+        with _placeholders_lock:
+            mapping = dict(_placeholders)
+
+    def expand_token(match):
+        return mapping.get(match.group(0), match.group(0))
+
+    def expand_attr(match):
+        value = match.group(1)
+        if not _PLACEHOLDER_RE.search(value):
+            return match.group(0)
+        value = _PLACEHOLDER_RE.sub(expand_token, value)
+        # 占位符与追加样式之间可能缺少分号
+        value = re.sub(r"(?<=[^;\s])\s+(?=[\w-]+\s*:)", ";", value)
+        return f'style="{value}"'
+
+    return _STYLE_ATTR_RE.sub(expand_attr, html)
+
+
+def count_tokens(text: str) -> int:
+    """估算 token 数：优先使用 litellm 的分词器，失败时按字符数粗略估算"""
+    try:
+        import litellm
+
+        from src.ai_write_x.config.config import Config
+
+        return litellm.token_counter(model=Config.get_instance().api_model, text=text)
+    except Exception:
+        return len(text) // 2
+
+
+def prepare_template(html: str, use_compress: bool = True) -> str:
+    """模板填充前的预处理：压缩 HTML、折叠重复样式，并报告 token 变化"""
+    prepared = utils.compress_html(html, use_compress)
+    if TEMPLATE_BUDGET_CONFIGS["collapse_styles"]:
+        prepared, mapping = collapse_styles(prepared)
+    else:
+        mapping = {}
+
+    if TEMPLATE_BUDGET_CONFIGS["report_tokens"]:
+        before, after = count_tokens(html), count_tokens(prepared)
+        saved = (1 - after / before) * 100 if before else 0.0
+        log.print_log(
+            f"模板预处理：{len(html)} -> {len(prepared)} 字符，约 {before} -> {after} tokens"
+            f"（减少 {saved:.0f}%，折叠样式 {len(mapping)} 个）"
+        )
+    return prepared
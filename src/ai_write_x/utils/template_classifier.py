@@ -0,0 +1,202 @@
+import math
+import random
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from src.ai_write_x.config.config import DEFAULT_TEMPLATE_CATEGORIES
+from src.ai_write_x.utils.template_registry import TemplateEntry, TemplateRegistry
+
+
+# 按话题选择模板的配置
+TEMPLATE_CLASSIFIER_CONFIGS = {
+    "enabled": True,  # 关闭后未指定模板时随机选择
+    "min_score": 0.05,  # 最佳分类的相似度低于该值时视为无法判断，分类为“其他”，选择模板时随机
+    "fallback_category": "其他",
+    "ngram_range": (2, 3),  # 字符 n-gram 长度范围
+    "keyword_weight": 0.7,  # 分类质心中种子词所占的权重，其余为该分类模板中的文字
+}
+
+# 各默认分类的种子词，与该分类模板中的文字一起构成分类的语料（模板较少的分类主要依赖种子词）
+CATEGORY_KEYWORDS = {
+    "科技数码": "科技 数码 人工智能 AI 大模型 算法 芯片 半导体 手机 电脑 互联网 软件 硬件 机器人 "
+    "自动驾驶 新能源汽车 电动车 5G 云计算 数据 编程 程序员 开源 苹果 华为 小米 发布会 量子 航天",
+    "财经投资": "财经 投资 股市 股票 基金 理财 经济 金融 银行 利率 降息 加息 房价 楼市 A股 港股 美股 "
+    "汇率 通胀 债券 黄金 比特币 上市 财报 营收 GDP 消费 企业 公司 市场 资本",
+    "教育学习": "教育 学习 学校 学生 老师 高考 中考 考研 大学 课程 考试 升学 培训 读书 知识 教学 "
+    "孩子 家长 作业 留学 毕业 招生 学历 成绩 教材 课堂 技能 学霸",
+    "健康养生": "健康 养生 医疗 医院 医生 疾病 运动 健身 减肥 饮食 营养 睡眠 中医 药物 疫苗 "
+    "病毒 癌症 血压 血糖 心脏 免疫 体检 保健 长寿 锻炼 身体 心理健康",
+    "美食旅行": "美食 旅行 旅游 景点 餐厅 小吃 菜谱 做饭 烹饪 酒店 度假 出行 机票 自驾 "
+    "攻略 打卡 风景 城市 古镇 火锅 咖啡 甜品 特产 假期 签证 高铁 民宿",
+    "时尚生活": "时尚 生活 穿搭 美妆 护肤 潮流 品牌 服装 化妆 发型 家居 装修 购物 奢侈品 "
+    "设计 审美 生活方式 宠物 香水 包包 鞋子 口红 秀场 模特 极简",
+    "职场发展": "职场 工作 求职 面试 招聘 简历 跳槽 升职 加薪 裁员 管理 领导 同事 创业 "
+    "职业规划 中年危机 能力 效率 团队 老板 员工 薪资 加班 副业 打工人 内卷 沟通",
+    "情感心理": "情感 心理 爱情 婚姻 恋爱 分手 家庭 亲情 友情 孤独 焦虑 抑郁 情绪 治愈 成长 "
+    "人生 幸福 温暖 思念 父母 亲子 自我 内心 陪伴 散文 回忆",
+    "娱乐八卦": "娱乐 八卦 明星 演员 歌手 综艺 电影 电视剧 票房 偶像 粉丝 恋情 官宣 热搜 "
+    "演唱会 颁奖 导演 剧集 网红 直播 短视频 爆料 塌房 红毯",
+    "新闻时事": "新闻 时事 政策 国际 国内 政府 外交 会议 事件 社会 突发 事故 灾害 地震 "
+    "选举 总统 联合国 峰会 领导人 发布 通报 调查 法律 法院 警方 民生 报道 局势 冲突",
+    "其他": "",
+}
+
+_NON_WORD_RE = re.compile(r"[\s\W_]+")
+
+
+def _ngrams(text: str) -> Counter:
+    low, high = TEMPLATE_CLASSIFIER_CONFIGS["ngram_range"]
+    grams: Counter = Counter()
+    # 按非文字字符切分后再取 n-gram，不跨越标点和空白
+    for chunk in _NON_WORD_RE.split(text.lower()):
+        for n in range(low, high + 1):
+            grams.update(chunk[i : i + n] for i in range(len(chunk) - n + 1))  # noqa: E203
+    return grams
+
+
+def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items()} if norm else {}
+
+
+def _cosine(query: Dict[str, float], vector: Dict[str, float]) -> float:
+    if len(query) > len(vector):
+        query, vector = vector, query
+    return sum(weight * vector.get(gram, 0.0) for gram, weight in query.items())
+
+
+class TemplateClassifier:
+    """
+    按话题/文章内容选择模板的轻量分类器
+
+    以各分类的种子词和模板中的文字为语料，预先计算字符 n-gram TF-IDF 向量：
+    每个分类一个质心向量，每个模板一个向量。查询时只对话题做一次 n-gram 统计，再与质心、
+    模板向量做稀疏点积。模板注册表变化时自动重建
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, registry: Optional[TemplateRegistry] = None):
+        self.registry = registry or TemplateRegistry.get_instance()
+        self._version = None
+        self._idf: Dict[str, float] = {}
+        self._centroids: Dict[str, Dict[str, float]] = {}
+        self._template_vectors: Dict[str, Dict[str, float]] = {}
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def classify(self, text: str) -> List[Tuple[str, float]]:
+        """返回各默认分类（模板目录中存在的）与文本的相似度，从高到低"""
+        self._ensure_built()
+        return self._classify(self._vectorize(text))
+
+    def best_category(self, text: str) -> str:
+        self._ensure_built()
+        return self._best_category(self._vectorize(text))
+
+    def rank_templates(
+        self, text: str, category: Optional[str] = None
+    ) -> List[Tuple[TemplateEntry, float]]:
+        """
+        按与文本的相似度给模板排序：指定分类时在该分类内排序，否则先判断分类再排序。
+        未指定分类且无法判断时返回空列表，由调用方随机选择；相似度相同的模板顺序随机
+        """
+        self._ensure_built()
+        query = self._vectorize(text)
+        if not category:
+            scores = self._classify(query)
+            if not scores or scores[0][1] < TEMPLATE_CLASSIFIER_CONFIGS["min_score"]:
+                return []
+            category = scores[0][0]
+        ranked = [
+            (entry, _cosine(query, self._template_vectors.get(entry.path, {})))
+            for entry in self.registry.templates(category)
+        ]
+        # 先打乱再稳定排序，相似度相同（如都为 0）时不总是选中同一个模板
+        random.shuffle(ranked)
+        return sorted(ranked, key=lambda item: item[1], reverse=True)
+
+    def _classify(self, query: Dict[str, float]) -> List[Tuple[str, float]]:
+        scores = [(name, _cosine(query, centroid)) for name, centroid in self._centroids.items()]
+        return sorted(scores, key=lambda item: item[1], reverse=True)
+
+    def _best_category(self, query: Dict[str, float]) -> str:
+        settings = TEMPLATE_CLASSIFIER_CONFIGS
+        scores = self._classify(query)
+        if scores and scores[0][1] >= settings["min_score"]:
+            return scores[0][0]
+        return settings["fallback_category"]
+
+    def _vectorize(self, text: str) -> Dict[str, float]:
+        grams = _ngrams(text or "")
+        return _normalize(
+            {gram: count * self._idf[gram] for gram, count in grams.items() if gram in self._idf}
+        )
+
+    def _ensure_built(self):
+        version = self.registry.version
+        if version == self._version:
+            return
+        with self._build_lock:
+            if version != self._version:
+                self._build()
+                self._version = version
+
+    def _build(self):
+        categories = [
+            name
+            for name in DEFAULT_TEMPLATE_CATEGORIES.values()
+            if name in self.registry.categories()
+        ]
+        template_grams = {
+            entry.path: _ngrams(BeautifulSoup(entry.content, "html.parser").get_text(" "))
+            for name in categories
+            for entry in self.registry.templates(name)
+        }
+        keyword_grams = {
+            name: _ngrams(CATEGORY_KEYWORDS.get(name, "") + " " + name) for name in categories
+        }
+        category_grams = {}
+        for name in categories:
+            grams = Counter()
+            for entry in self.registry.templates(name):
+                grams.update(template_grams[entry.path])
+            category_grams[name] = grams
+
+        # IDF 以分类为文档计算：只在少数分类中出现的 n-gram 区分度高
+        document_frequency: Counter = Counter()
+        for name in categories:
+            document_frequency.update(set(keyword_grams[name]) | set(category_grams[name]))
+        total = len(categories)
+        self._idf = {
+            gram: math.log((1 + total) / (1 + df)) + 1 for gram, df in document_frequency.items()
+        }
+
+        def tfidf(grams: Counter) -> Dict[str, float]:
+            # 次线性 TF，长模板不会因为字数多而占优
+            return _normalize(
+                {gram: (1 + math.log(count)) * self._idf[gram] for gram, count in grams.items()}
+            )
+
+        # 质心 = 种子词向量与模板文字向量按权重混合，避免种子词被模板中大量的示例正文淹没
+        weight = TEMPLATE_CLASSIFIER_CONFIGS["keyword_weight"]
+        self._centroids = {}
+        for name in categories:
+            centroid = Counter()
+            for gram, value in tfidf(keyword_grams[name]).items():
+                centroid[gram] += weight * value
+            for gram, value in tfidf(category_grams[name]).items():
+                centroid[gram] += (1 - weight) * value
+            self._centroids[name] = _normalize(centroid)
+        self._template_vectors = {path: tfidf(grams) for path, grams in template_grams.items()}
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.ai_write_x.utils import log
+from src.ai_write_x.utils.path_manager import PathManager
+
+
+# 模板注册表配置
+TEMPLATE_REGISTRY_CONFIGS = {
+    "check_interval": 2.0,  # 两次检查模板目录是否变化（mtime）的最小间隔（秒）
+}
+
+# 模板目录下不属于分类的目录
+EXCLUDED_TEMPLATE_DIRS = {"components", "__pycache__", ".git"}
+
+
+@dataclass
+class TemplateEntry:
+    path: str
+    name: str
+    category: str
+    size: int
+    mtime: float
+    ctime: float
+    sha1: str
+    section_count: int
+    content: str = field(repr=False)
+    # 预处理（压缩、折叠样式）后的内容和 token 数，首次使用时计算
+    prepared: Dict[bool, str] = field(default_factory=dict, repr=False)
+    tokens: Dict[bool, int] = field(default_factory=dict)
+
+
+class TemplateRegistry:
+    """
+    模板注册表
+
+    启动后首次使用时扫描一次模板目录，把各分类的模板列表、原始内容、大小、章节数、内容哈希
+    保存在内存中；之后每隔 check_interval 秒最多检查一次目录和文件的 mtime，只重新读取有变化的文件。
+    模板选择和读取都是内存查找，由 ReadTemplateTool、/api/templates 和 /api/config/templates 共用；
+    通过接口修改模板后调用 invalidate() 立即生效
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, template_dir=None):
+        self._template_dir = template_dir
+        # (路径 -> 模板, 分类 -> 路径列表)，整体替换，读取时无需加锁
+        self._state: Tuple[Dict[str, TemplateEntry], Dict[str, List[str]]] = ({}, {})
+        self._signature: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._scan_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @property
+    def template_dir(self) -> str:
+        return str(self._template_dir or PathManager.get_template_dir())
+
+    # ==================== 查询 ====================
+
+    def categories(self) -> List[str]:
+        self._ensure_fresh()
+        return sorted(self._state[1])
+
+    def templates(self, category: Optional[str] = None) -> List[TemplateEntry]:
+        """指定分类（不存在时为空）或全部分类的模板，按分类、文件名排序"""
+        self._ensure_fresh()
+        entries, categories = self._state
+        if category:
+            paths = categories.get(category, [])
+        else:
+            paths = [path for name in sorted(categories) for path in categories[name]]
+        return [entries[path] for path in paths]
+
+    def find(self, category: str, name: str) -> Optional[TemplateEntry]:
+        name = name if name.endswith(".html") else f"{name}.html"
+        return self.get(os.path.join(self.template_dir, category, name))
+
+    def get(self, path: str) -> Optional[TemplateEntry]:
+        self._ensure_fresh()
+        return self._state[0].get(os.path.normpath(str(path)))
+
+    def choose(self, category: Optional[str] = None, count: int = 1) -> List[TemplateEntry]:
+        """随机选择最多 count 个不重复的模板"""
+        candidates = self.templates(category)
+        return random.sample(candidates, min(max(count, 1), len(candidates)))
+
+    def read(self, path: str, use_compress: bool = True) -> str:
+        """读取预处理后的模板内容，同一模板只预处理一次；不在模板目录中的文件直接从磁盘读取"""
+        from src.ai_write_x.utils import template_budget
+
+        entry = self.get(path)
+        if entry is None:
+            with open(path, "r", encoding="utf-8") as f:
+                return template_budget.prepare_template(f.read(), use_compress)
+
+        prepared = entry.prepared.get(use_compress)
+        if prepared is None:
+            prepared = template_budget.prepare_template(entry.content, use_compress)
+            entry.prepared[use_compress] = prepared
+        return prepared
+
+    def token_count(self, path: str, use_compress: bool = True) -> Optional[int]:
+        """预处理后模板的 token 数（首次调用时计算）"""
+        from src.ai_write_x.utils import template_budget
+
+        entry = self.get(path)
+        if entry is None:
+            return None
+        if use_compress not in entry.tokens:
+            entry.tokens[use_compress] = template_budget.count_tokens(
+                self.read(path, use_compress)
+            )
+        return entry.tokens[use_compress]
+
+    def stats(self) -> Dict[str, int]:
+        self._ensure_fresh()
+        entries, categories = self._state
+        return {
+            "categories": len(categories),
+            "templates": len(entries),
+            "bytes": sum(entry.size for entry in entries.values()),
+        }
+
+    @property
+    def version(self) -> int:
+        """模板集合的版本标识，任一模板或分类变化后改变，供基于模板内容的缓存判断是否失效"""
+        self._ensure_fresh()
+        return hash(self._signature)
+
+    def invalidate(self):
+        """下次查询时重新检查模板目录"""
+        self._checked_at = 0.0
+
+    # ==================== 扫描 ====================
+
+    def _ensure_fresh(self):
+        interval = TEMPLATE_REGISTRY_CONFIGS["check_interval"]
+        if self._signature is not None and time.monotonic() - self._checked_at < interval:
+            return
+        with self._scan_lock:
+            if self._signature is not None and time.monotonic() - self._checked_at < interval:
+                return
+            try:
+                self._refresh()
+            except Exception as e:
+                log.print_log(f"扫描模板目录失败: {str(e)}", "warning")
+            self._checked_at = time.monotonic()
+
+    def _scan(self) -> Dict[str, List[os.DirEntry]]:
+        files: Dict[str, List[os.DirEntry]] = {}
+        template_dir = self.template_dir
+        if not os.path.isdir(template_dir):
+            return files
+        for category in os.scandir(template_dir):
+            if not category.is_dir() or category.name in EXCLUDED_TEMPLATE_DIRS:
+                continue
+            files[category.name] = sorted(
+                (f for f in os.scandir(category.path) if f.name.endswith(".html") and f.is_file()),
+                key=lambda f: f.name,
+            )
+        return files
+
+    def _refresh(self):
+        files = self._scan()
+        stats = {
+            category: [(os.path.normpath(f.path), f.stat()) for f in entries]
+            for category, entries in files.items()
+        }
+        signature = tuple(
+            (path, st.st_mtime_ns, st.st_size)
+            for category in sorted(stats)
+            for path, st in stats[category]
+        ) + tuple(sorted(stats))
+        if signature == self._signature:
+            return
+
+        previous = self._state[0]
+        entries: Dict[str, TemplateEntry] = {}
+        categories: Dict[str, List[str]] = {}
+        for category, items in stats.items():
+            categories[category] = []
+            for path, st in items:
+                entry = previous.get(path)
+                if entry is None or entry.mtime != st.st_mtime or entry.size != st.st_size:
+                    entry = self._load(path, category, st)
+                entries[path] = entry
+                categories[category].append(path)
+
+        self._state, self._signature = (entries, categories), signature
+
+    @staticmethod
+    def _load(path: str, category: str, st: os.stat_result) -> TemplateEntry:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        return TemplateEntry(
+            path=path,
+            name=os.path.splitext(os.path.basename(path))[0],
+            category=category,
+            size=st.st_size,
+            mtime=st.st_mtime,
+            ctime=st.st_ctime,
+            sha1=hashlib.sha1(content.encode("utf-8")).hexdigest(),
+            section_count=content.count("<section"),
+            content=content,
+        )
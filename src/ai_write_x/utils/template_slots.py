@@ -0,0 +1,442 @@
+import copy
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import markdown
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from src.ai_write_x.utils import log
+from src.ai_write_x.utils.content_parser import ContentParser
+
+
+# 基于槽位的模板本地填充配置
+TEMPLATE_SLOT_CONFIGS = {
+    "enabled": True,  # 关闭后模板填充全部交给大模型
+    "min_paragraph_slots": 3,  # 段落槽位少于该数量的模板（如纯 section 排版）交给大模型填充
+    "max_entries": 64,  # 模板索引缓存条数
+    "stale_text_length": 4,  # 未被填充且不少于该字数的模板原文视为旧内容，连同变空的容器清除
+    "rewrite_headings": False,  # 是否调用大模型把过长的标题改写到模板原标题的长度附近
+}
+
+_HEADINGS = ("h1", "h2", "h3", "h4")
+_SKIP_PARENTS = {"svg", "style", "script", "head", "title"}
+_ROOTS = ("body", "html", "[document]")
+
+
+class TemplateSlotEngine:
+    """
+    基于槽位的模板填充引擎
+
+    每个模板只分析一次，得到由章节标题、小标题、段落、列表、引用槽位组成的骨架索引（按内容哈希缓存）；
+    填充时把 ContentParser 解析出的 Markdown 章节按顺序映射到槽位：
+    多出的内容复制同类槽位，多余的槽位连同变空的容器一起移除，未覆盖的模板原文被清除。
+    模板结构不适合时返回 None，由调用方交给大模型填充
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or TEMPLATE_SLOT_CONFIGS["max_entries"]
+        self._index: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._index_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    # ==================== 模板分析 ====================
+
+    def get_index(self, html: str) -> Optional[Dict[str, Any]]:
+        key = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        with self._index_lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+                return self._index[key]
+
+        index = self.analyze(BeautifulSoup(html, "html.parser"))
+        with self._index_lock:
+            self._index[key] = index
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+        return index
+
+    def analyze(self, soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+        """
+        生成骨架索引，槽位以其在 soup.find_all(True) 中的位置表示。
+        章节标题取出现至少两次的最高一级标题（h2~h4），第一个 h1 为文章标题
+        """
+        tags = soup.find_all(True)
+        position = {id(tag): i for i, tag in enumerate(tags)}
+        usable = [tag for tag in tags if self._is_text_slot(tag)]
+
+        title = next((tag for tag in usable if tag.name == "h1"), None)
+        counts = {name: sum(tag.name == name for tag in usable) for name in _HEADINGS[1:]}
+        section_tag = next((name for name in _HEADINGS[1:] if counts[name] >= 2), None)
+
+        sections: List[Dict[str, Any]] = [{"heading": None, "container": None, "slots": []}]
+        slot_ids = set()
+        for tag in usable:
+            if tag is title or any(id(parent) in slot_ids for parent in tag.parents):
+                continue
+            if tag.name == section_tag:
+                sections.append({"heading": position[id(tag)], "container": None, "slots": []})
+            elif tag.name in _HEADINGS:
+                sections[-1]["slots"].append(("heading", position[id(tag)]))
+            elif tag.name in ("ul", "ol"):
+                if not tag.find("li"):
+                    continue
+                sections[-1]["slots"].append(("list", position[id(tag)]))
+            elif tag.name == "blockquote":
+                sections[-1]["slots"].append(("quote", position[id(tag)]))
+            elif tag.name in ("p", "li"):
+                sections[-1]["slots"].append(("paragraph", position[id(tag)]))
+            else:
+                continue
+            slot_ids.add(id(tag))
+
+        if not sections[0]["slots"]:
+            sections.pop(0)
+
+        paragraph_slots = sum(kind == "paragraph" for s in sections for kind, _ in s["slots"])
+        if paragraph_slots < TEMPLATE_SLOT_CONFIGS["min_paragraph_slots"]:
+            return None
+
+        # 章节容器：包含该章节标题、且不包含其他章节标题和文章标题的最外层元素
+        heading_tags = [tags[s["heading"]] for s in sections if s["heading"] is not None]
+        for section in sections:
+            if section["heading"] is None:
+                continue
+            node = tags[section["heading"]]
+            others = [h for h in heading_tags if h is not node] + ([title] if title else [])
+            while node.parent is not None and node.parent.name not in _ROOTS:
+                parent = node.parent
+                # bs4 的 Tag 按内容比较相等，这里必须按对象比较
+                if any(parent is ancestor for other in others for ancestor in other.parents):
+                    break
+                node = parent
+            section["container"] = position[id(node)]
+
+        return {
+            "title": position[id(title)] if title else None,
+            "sections": sections,
+            "paragraph_slots": paragraph_slots,
+        }
+
+    @staticmethod
+    def _is_text_slot(tag: Tag) -> bool:
+        if tag.name not in _HEADINGS + ("p", "li", "ul", "ol", "blockquote"):
+            return False
+        if any(parent.name in _SKIP_PARENTS for parent in tag.parents):
+            return False
+        return bool(tag.get_text(strip=True))
+
+    # ==================== 填充 ====================
+
+    def fill(self, html: str, content: str, title: str = "") -> Optional[str]:
+        """把 Markdown 文章填充到模板中，返回填充后的 HTML；模板不适合或内容无法解析时返回 None"""
+        if not html or not content:
+            return None
+        index = self.get_index(html)
+        if index is None:
+            return None
+
+        parser = ContentParser()
+        parsed = parser.parse(content)
+        content_type = parsed.metadata.get("content_type")
+        if content_type == "html":
+            return None
+        body = parsed.content if content_type == "markdown" else content
+        # 标题含特殊字符（如 平台|话题）时 ContentParser 不会移除标题行
+        body = re.sub(r"^\s*#\s+[^\n]*\n", "", body, count=1)
+        article = parser.parse_markdown_blocks(body)
+        if not article:
+            return None
+
+        return _SlotFiller(html, index).fill(article, title or parsed.title)
+
+
+class _SlotFiller:
+    """单次填充的状态（每次填充新建，支持多个模板候选并发填充）"""
+
+    def __init__(self, html: str, index: Dict[str, Any]):
+        self.index = index
+        self.soup = BeautifulSoup(html, "html.parser")
+        self.tags = self.soup.find_all(True)
+        self.filled: set = set()
+        # 每类槽位的原始样本，本章节没有同类槽位时复制
+        self.prototypes: Dict[str, Tag] = {}
+        for section in index["sections"]:
+            for kind, i in section["slots"]:
+                self.prototypes.setdefault(kind, copy.copy(self.tags[i]))
+
+    def fill(self, article: List[Dict[str, Any]], title: str) -> str:
+        if self.index["title"] is not None and title:
+            self._set_heading(self.tags[self.index["title"]], title)
+        if self.soup.title and title:
+            self.soup.title.string = title
+
+        self._fill_sections(self.index["sections"], article)
+        self._clear_stale_text()
+        return str(self.soup)
+
+    def _fill_sections(self, sections, article):
+        template_intro = sections[0] if sections[0]["heading"] is None else None
+        template_titled = [s for s in sections if s["heading"] is not None]
+        article_intro = article[0]["blocks"] if not article[0]["title"] else []
+        article_titled = [s for s in article if s["title"]]
+
+        headings = [s["title"] for s in article_titled[: len(template_titled)]]
+        limits = [
+            len(self.tags[s["heading"]].get_text(strip=True))
+            for s in template_titled[: len(headings)]
+        ]
+        headings = self._rewrite_headings(headings, limits)
+
+        # 模板没有导语槽位时，导语并入第一个章节；模板没有章节时，全部内容并入导语
+        if template_intro is None and template_titled:
+            blocks = list(article_intro)
+            if article_titled:
+                blocks += article_titled[0]["blocks"]
+            pairs = [(template_titled[0], headings[0] if headings else "", blocks)]
+            start = 1
+        else:
+            pairs = [(template_intro, "", list(article_intro))] if template_intro else []
+            start = 0
+            if not template_titled:
+                for section in article_titled:
+                    pairs[0][2].append({"type": "heading", "text": section["title"]})
+                    pairs[0][2].extend(section["blocks"])
+
+        for i in range(start, len(template_titled)):
+            if i < len(article_titled):
+                pairs.append((template_titled[i], headings[i], list(article_titled[i]["blocks"])))
+            else:
+                self._remove_section(template_titled[i])
+
+        # 文章章节多于模板时，多出的章节以小标题的形式并入最后一个章节
+        if template_titled and len(article_titled) > len(template_titled):
+            last_blocks = pairs[-1][2]
+            for section in article_titled[len(template_titled):]:
+                last_blocks.append({"type": "heading", "text": section["title"]})
+                last_blocks.extend(section["blocks"])
+
+        for template_section, heading, blocks in pairs:
+            self._fill_section(template_section, heading, blocks)
+
+    def _fill_section(self, section, heading, blocks):
+        last = None
+        if section["heading"] is not None:
+            last = self.tags[section["heading"]]
+            self._set_heading(last, heading)
+
+        slots = [(kind, self.tags[i]) for kind, i in section["slots"]]
+        cursor = 0
+        for block in blocks:
+            kind = block["type"]
+            match = self._next_slot(slots, cursor, kind)
+            if match is not None:
+                # 跳过的槽位不再使用
+                for _, skipped in slots[cursor:match]:
+                    self._remove(skipped)
+                target = slots[match][1]
+                cursor = match + 1
+            else:
+                target = self._clone(slots, kind, last)
+                if target is None:
+                    # 没有同类槽位：列表拆成段落，小标题、引用以段落呈现
+                    for text in self._as_paragraphs(block):
+                        target = self._clone(slots, "paragraph", last)
+                        if target is None:
+                            break
+                        self._set_inline(target, text)
+                        last = target
+                    continue
+            self._apply(target, block)
+            last = target
+
+        for _, unused in slots[cursor:]:
+            self._remove(unused)
+
+    @staticmethod
+    def _next_slot(slots, cursor, kind) -> Optional[int]:
+        accepted = ("quote", "paragraph") if kind == "quote" else (kind,)
+        for j in range(cursor, len(slots)):
+            if slots[j][0] in accepted:
+                return j
+        return None
+
+    def _clone(self, slots, kind, last) -> Optional[Tag]:
+        """复制本章节（没有时取整个模板）的同类槽位，插入到上一个已填充元素之后"""
+        source = next(
+            (tag for k, tag in reversed(slots) if k == kind and not tag.decomposed),
+            self.prototypes.get(kind),
+        )
+        anchor = last if last is not None and not last.decomposed else None
+        if anchor is None:
+            anchor = next((tag for _, tag in slots if not tag.decomposed), None)
+        if source is None or anchor is None:
+            return None
+        clone = copy.copy(source)
+        if anchor is last:
+            anchor.insert_after(clone)
+        else:
+            anchor.insert_before(clone)
+        return clone
+
+    @staticmethod
+    def _as_paragraphs(block) -> List[str]:
+        if block["type"] == "list":
+            return [f"• {item}" for item in block["items"]]
+        if block["type"] == "heading":
+            return [f"**{block['text']}**"]
+        return [block["text"]]
+
+    def _apply(self, target: Tag, block):
+        if block["type"] == "list":
+            self._set_list(target, block["items"])
+        elif block["type"] == "heading":
+            self._set_heading(target, block["text"])
+        else:
+            self._set_inline(target, block["text"])
+
+    # ==================== 元素操作 ====================
+
+    @staticmethod
+    def _innermost(tag: Tag) -> Tag:
+        """只有一个子元素且没有直接文本时向内深入，保留外层包裹元素（如带样式的 span）"""
+        while True:
+            children = [
+                c for c in tag.children if not (isinstance(c, NavigableString) and not c.strip())
+            ]
+            if len(children) != 1 or not isinstance(children[0], Tag):
+                return tag
+            if children[0].name in ("svg", "img", "br"):
+                return tag
+            tag = children[0]
+
+    def _set_inline(self, tag: Tag, text: str):
+        target = self._innermost(tag)
+        target.clear()
+        rendered = markdown.markdown(text).strip()
+        rendered = re.sub(r"^<p>(.*)</p>$", r"\1", rendered, flags=re.DOTALL)
+        for node in list(BeautifulSoup(rendered, "html.parser").contents):
+            target.append(node)
+        self.filled.add(id(tag))
+
+    def _set_heading(self, tag: Tag, text: str):
+        """标题中开头的短序号、图标（不超过 3 个字）保留，其余替换为新标题"""
+        target = self._innermost(tag)
+        keep = []
+        for child in list(target.children):
+            if isinstance(child, Tag) and (
+                child.name in ("svg", "img") or len(child.get_text(strip=True)) <= 3
+            ):
+                keep.append(child)
+            elif isinstance(child, NavigableString) and not child.strip():
+                continue
+            else:
+                break
+        target.clear()
+        for child in keep:
+            target.append(child)
+        target.append(NavigableString(text))
+        self.filled.add(id(tag))
+
+    def _set_list(self, tag: Tag, items: List[str]):
+        item_proto = tag.find("li")
+        item_proto = copy.copy(item_proto) if item_proto else None
+        for li in tag.find_all("li"):
+            li.decompose()
+        for text in items:
+            li = copy.copy(item_proto) if item_proto else self.soup.new_tag("li")
+            tag.append(li)
+            self._set_inline(li, text)
+        self.filled.add(id(tag))
+
+    def _remove(self, tag: Tag):
+        """移除槽位；因此变空（没有文字、图片、SVG）的外层容器一并移除"""
+        if tag.decomposed:
+            return
+        parent = tag.parent
+        tag.decompose()
+        while parent is not None and parent.name not in _ROOTS:
+            if parent.get_text(strip=True) or parent.find(["img", "svg"]):
+                break
+            grandparent = parent.parent
+            parent.decompose()
+            parent = grandparent
+
+    def _remove_section(self, section):
+        for _, i in section["slots"]:
+            self._remove(self.tags[i])
+        self._remove(self.tags[section["container"]])
+
+    def _clear_stale_text(self):
+        """清除没有被新内容覆盖的模板原文（序号、图标等很短的装饰文字保留）"""
+        min_length = TEMPLATE_SLOT_CONFIGS["stale_text_length"]
+        root = self.soup.body or self.soup
+        for text in list(root.find_all(string=True)):
+            if len(text.strip()) < min_length:
+                continue
+            parents = list(text.parents)
+            if any(p.name in _SKIP_PARENTS for p in parents):
+                continue
+            if any(id(p) in self.filled for p in parents):
+                continue
+            parent = text.parent
+            text.extract()
+            if not parent.get_text(strip=True) and not parent.find(["img", "svg"]):
+                self._remove(parent)
+
+    def _rewrite_headings(self, headings: List[str], limits: List[int]) -> List[str]:
+        """可选：一次调用大模型把明显超出模板标题长度的标题改写得更短，失败时保留原标题"""
+        if not TEMPLATE_SLOT_CONFIGS["rewrite_headings"]:
+            return headings
+        targets = [
+            i for i, (h, limit) in enumerate(zip(headings, limits)) if len(h) > max(limit * 1.5, 8)
+        ]
+        if not targets:
+            return headings
+
+        try:
+            from src.ai_write_x.core.agent_factory import LLMPool
+
+            llm = LLMPool.get_instance().get_default()
+            request = "\n".join(f"{headings[i]}（不超过{max(limits[i], 6)}字）" for i in targets)
+            answer = llm.call(
+                [
+                    {
+                        "role": "user",
+                        "content": "把下面每行标题改写得更简短，保持原意，按相同顺序每行输出一个标题，"
+                        f"不要编号和其他说明：\n{request}",
+                    }
+                ]
+            )
+            lines = [line.strip() for line in str(answer).splitlines() if line.strip()]
+            if len(lines) != len(targets):
+                return headings
+            rewritten = list(headings)
+            for i, line in zip(targets, lines):
+                rewritten[i] = line
+            return rewritten
+        except Exception as e:
+            log.print_log(f"标题改写失败，使用原标题: {str(e)}", "warning")
+            return headings
+
+
+def fill_template(html: str, content: str, title: str = "") -> Optional[str]:
+    """本地填充模板，失败或模板不适合时返回 None"""
+    if not TEMPLATE_SLOT_CONFIGS["enabled"]:
+        return None
+    try:
+        return TemplateSlotEngine.get_instance().fill(html, content, title)
+    except Exception as e:
+        log.print_log(f"模板本地填充失败，改用大模型填充: {str(e)}", "warning")
+        return None
@@ -0,0 +1,201 @@
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from src.ai_write_x.utils.path_manager import PathManager
+
+# MinHash 参数：64 个哈希函数，LSH 分成 32 段、每段 2 行。
+# Jaccard 相似度 0.5 的两段文本至少落入同一个桶的概率约为 1 - 0.75^32 ≈ 99.99%
+_NUM_PERM = 64
+_ROWS_PER_BAND = 2
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x70C1C)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(_NUM_PERM)
+]
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_topic(text: str) -> str:
+    """全角转半角、小写，去掉标点和空白，只保留文字和数字"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _NON_WORD_RE.sub("", text)
+
+
+def char_ngrams(normalized: str, n: int = 2) -> Set[str]:
+    """字符 n-gram 集合，适合没有分词的中文标题"""
+    if len(normalized) <= n:
+        return {normalized} if normalized else set()
+    return {"".join(gram) for gram in zip(*(normalized[k:] for k in range(n)))}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signature(shingles: Set[str]) -> List[int]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in shingles
+    ]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def lsh_keys(signature: List[int]) -> List[int]:
+    """把签名切段，每段（连同段号）哈希成一个 63 位整数作为桶键"""
+    keys = []
+    for band, rows in enumerate(zip(*[iter(signature)] * _ROWS_PER_BAND)):
+        data = band.to_bytes(2, "little") + b"".join(r.to_bytes(8, "little") for r in rows)
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little") >> 1)
+    return keys
+
+
+class TopicIndex:
+    """
+    已生成话题/标题的近似重复索引（SQLite，MinHash + LSH）
+
+    - 文本规范化后取字符二元组，计算 MinHash 签名并按段写入桶
+    - 查询时只取与候选落在同一个桶里的条目，再用精确 Jaccard 相似度确认，
+      查询成本与索引规模无关
+    - 只比较保留期（retention）内的条目，过期条目在写入时清理
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    DEFAULT_THRESHOLD = 0.5
+    DEFAULT_RETENTION = 30 * 24 * 3600
+
+    def __init__(self, db_path=None, threshold=DEFAULT_THRESHOLD, retention=DEFAULT_RETENTION):
+        self.db_path = str(db_path or PathManager.get_cache_dir() / "topic_index.db")
+        self.threshold = threshold
+        self.retention = retention
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_normalized ON entries(normalized);
+            CREATE TABLE IF NOT EXISTS buckets (
+                key INTEGER NOT NULL,
+                entry_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_buckets_key ON buckets(key);
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def add(self, text: str, created_at=None) -> bool:
+        """加入一条已生成的话题或标题，文本无有效字符或已存在时返回 False"""
+        normalized = normalize_topic(text)
+        if not normalized:
+            return False
+
+        created_at = created_at or time.time()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT id FROM entries WHERE normalized = ?", (normalized,)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE entries SET created_at = ? WHERE id = ?", (created_at, row[0])
+                )
+                self._conn.commit()
+                return False
+
+            cursor = self._conn.execute(
+                "INSERT INTO entries (text, normalized, created_at) VALUES (?, ?, ?)",
+                (text, normalized, created_at),
+            )
+            keys = lsh_keys(minhash_signature(char_ngrams(normalized)))
+            self._conn.executemany(
+                "INSERT INTO buckets (key, entry_id) VALUES (?, ?)",
+                [(key, cursor.lastrowid) for key in keys],
+            )
+            self._prune(time.time())
+            self._conn.commit()
+        return True
+
+    def find_similar(self, text: str, threshold=None) -> Optional[Tuple[str, float]]:
+        """查找保留期内与 text 最相似且不低于阈值的条目，返回 (原文, 相似度)"""
+        threshold = self.threshold if threshold is None else threshold
+        normalized = normalize_topic(text)
+        if not normalized:
+            return None
+
+        shingles = char_ngrams(normalized)
+        keys = lsh_keys(minhash_signature(shingles))
+        placeholders = ",".join("?" * len(keys))
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT e.text, e.normalized FROM buckets b "
+                "JOIN entries e ON e.id = b.entry_id "
+                f"WHERE b.key IN ({placeholders}) AND e.created_at >= ?",
+                (*keys, time.time() - self.retention),
+            ).fetchall()
+
+        best = None
+        for entry_text, entry_normalized in rows:
+            similarity = jaccard(shingles, char_ngrams(entry_normalized))
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (entry_text, similarity)
+        return best
+
+    def is_duplicate(self, text: str, threshold=None) -> bool:
+        return self.find_similar(text, threshold) is not None
+
+    def count(self) -> int:
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def backfill_from_articles(self, article_dir=None) -> int:
+        """
+        用文章目录中已保存的文章标题初始化索引（仅在索引为空时执行）
+        文件名形如 "平台_话题"（标题中的 | 被替换为 _），同时索引完整标题和去掉平台前缀的话题
+        """
+        if self.count():
+            return 0
+
+        article_dir = Path(article_dir or PathManager.get_article_dir())
+        added = 0
+        for pattern in ("*.html", "*.md", "*.txt"):
+            for file_path in article_dir.glob(pattern):
+                created_at = file_path.stat().st_mtime
+                title = file_path.stem
+                added += self.add(title, created_at)
+                if "_" in title:
+                    added += self.add(title.split("_", 1)[1], created_at)
+        return added
+
+    def _prune(self, now):
+        expired = now - self.retention
+        self._conn.execute(
+            "DELETE FROM buckets WHERE entry_id IN "
+            "(SELECT id FROM entries WHERE created_at < ?)",
+            (expired,),
+        )
+        self._conn.execute("DELETE FROM entries WHERE created_at < ?", (expired,))
@@ -222,20 +222,23 @@ def download_and_save_image(image_url, local_image_folder):
 
 
 def compress_html(content, use_compress=True):
-    if use_compress:
+    """压缩 HTML：移除注释和标签间空白，合并连续空白，去掉内联样式中多余的空格"""
+    if not use_compress:
         return content
 
     # 移除注释
     content = re.sub(r"<!--.*?-->", "", content, flags=re.DOTALL)
-    # 移除换行和制表符
-    content = re.sub(r"[\n\t]+", "", content)
-    # 移除多余空格（保留属性分隔空格）
+    # 连续空白（含换行、制表符）合并为一个空格，避免英文单词被粘连
     content = re.sub(r"\s+", " ", content)
-    # 移除=、>、<、;、: 前后的空格
-    content = re.sub(r"\s*([=><;,:])\s*", r"\1", content)
     # 移除标签间空格
     content = re.sub(r">\s+<", "><", content)
-    return content
+    # 内联样式：移除 ; : , 前后的空格和末尾的分号
+    content = re.sub(
+        r'style="([^"]*)"',
+        lambda m: 'style="' + re.sub(r"\s*([;:,])\s*", r"\1", m.group(1)).strip(" ;") + '"',
+        content,
+    )
+    return content.strip()
 
 
 def decompress_html(compressed_content, use_compress=True):
@@ -687,3 +690,9 @@ def get_cover_path(article_path):
                 pass
 
     return cover_path
+
+
+def get_variants_dir(article_path) -> Path:
+    """文章多平台版本的保存目录：与文章同名的 .variants 目录（文章列表不会把其中的文件当作文章）"""
+    article_path = Path(article_path)
+    return article_path.with_name(article_path.stem + ".variants")
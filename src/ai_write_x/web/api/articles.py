@@ -8,6 +8,7 @@ import uuid
 from pydantic import BaseModel
 from typing import List, Optional
 import json
+import shutil
 
 from src.ai_write_x.config.config import Config
 from src.ai_write_x.utils.path_manager import PathManager
@@ -45,6 +46,12 @@ async def list_articles():
             stat = file_path.stat()
             title = file_path.stem.replace("_", "|")
             status = get_publish_status(title)
+            variants_dir = utils.get_variants_dir(file_path)
+            variants = (
+                sorted(p.stem for p in variants_dir.iterdir() if p.is_file())
+                if variants_dir.is_dir()
+                else []
+            )
 
             articles.append(
                 {
@@ -57,6 +64,7 @@ async def list_articles():
                         "%Y-%m-%d %H:%M:%S"
                     ),
                     "status": status,
+                    "variants": variants,
                 }
             )
 
@@ -107,6 +115,8 @@ async def delete_article(article_path: str):
     file_path = Path(article_path)
     if file_path.exists():
         file_path.unlink()
+        # 同时删除多平台版本
+        shutil.rmtree(utils.get_variants_dir(file_path), ignore_errors=True)
         return {"status": "success", "message": "文章已删除"}
     raise HTTPException(status_code=404, detail="文章不存在")
 
@@ -4,15 +4,17 @@
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import asyncio
+import os
 import time
 import queue
 
-from ..state import get_app_state
+from ..log_stream import LogStreamBridge, is_final_payload
 
 from src.ai_write_x.config.config import Config
 from src.ai_write_x.crew_main import ai_write_x_main
+from src.ai_write_x.core.batch_generation import BatchRunner, build_batch_tasks
 from src.ai_write_x.tools import hotnews
 from src.ai_write_x.utils import utils, log
 
@@ -22,6 +24,7 @@ router = APIRouter(prefix="/api", tags=["generate"])
 _current_process = None
 _current_log_queue = None
 _task_status = {"status": "idle", "error": None}
+_current_batch: Optional[BatchRunner] = None
 
 
 class ReferenceConfig(BaseModel):
@@ -41,6 +44,19 @@ class GenerateRequest(BaseModel):
     reference: Optional[ReferenceConfig] = None
 
 
+class BatchGenerateRequest(BaseModel):
+    """批量生成请求"""
+
+    topics: List[str] = []
+    hot_count: int = 0  # 额外从热榜选取的话题数
+    max_workers: Optional[int] = None
+    platform: Optional[str] = ""
+
+
+def _batch_running() -> bool:
+    return _current_batch is not None and _current_batch.is_running()
+
+
 @router.get("/config/validate")
 async def validate_config():
     """
@@ -81,6 +97,8 @@ async def generate_content(request: GenerateRequest):
 
     if _current_process and _current_process.is_alive():
         raise HTTPException(status_code=409, detail="任务正在运行中,请先停止当前任务")
+    if _batch_running():
+        raise HTTPException(status_code=409, detail="批量任务正在运行中,请先停止批量任务")
 
     try:
         config = Config.get_instance()
@@ -130,6 +148,7 @@ async def generate_content(request: GenerateRequest):
             _current_process, _current_log_queue = result
             _task_status = {"status": "running", "error": None}
             _current_process.start()
+            LogStreamBridge.get_instance().attach(_current_process, _current_log_queue)
 
             return {
                 "status": "success",
@@ -161,6 +180,7 @@ async def stop_generation():
 
     try:
         log.print_log("正在停止任务...", "info")
+        LogStreamBridge.get_instance().detach()
 
         # 首先尝试优雅终止
         _current_process.terminate()
@@ -233,120 +253,130 @@ async def get_generation_status():
 
 @router.websocket("/ws/generate/logs")
 async def websocket_logs(websocket: WebSocket):
-    """WebSocket日志连接 - 统一处理主进程和子进程日志"""
+    """
+    WebSocket日志连接 - 主进程和子进程日志由 LogStreamBridge 推送，
+    连接后先补发当前任务已有的消息；多条消息合并为一帧 {"type": "batch", "messages": [...]}
+    """
     await websocket.accept()
 
-    global _current_log_queue, _current_process
+    bridge = LogStreamBridge.get_instance()
+    subscriber = bridge.subscribe()
+    try:
+        while True:
+            payloads = await bridge.next_batch(subscriber)
+            if len(payloads) == 1:
+                await websocket.send_json(payloads[0])
+            else:
+                await websocket.send_json({"type": "batch", "messages": payloads})
 
-    # 初始化文件日志处理器
-    from datetime import datetime
-    from src.ai_write_x.utils.path_manager import PathManager
+            # 任务完成或失败后结束连接
+            if any(is_final_payload(payload) for payload in payloads):
+                break
 
-    app_state = get_app_state()
-    log_file = PathManager.get_log_dir() / f"WEB_{datetime.now().strftime('%Y-%m-%d')}.log"
-    log.LogManager.get_instance().set_file_handler(log_file)
-    file_handler = log.LogManager.get_instance().get_file_handler()
+    except WebSocketDisconnect:
+        log.print_log("WebSocket 连接断开", "info")
+    except Exception as e:
+        log.print_log(f"WebSocket 错误: {str(e)}", "error")
+    finally:
+        bridge.unsubscribe(subscriber)
+        if websocket.client_state.name != "DISCONNECTED":
+            try:
+                await websocket.close()
+            except RuntimeError:
+                pass
+
+
+@router.post("/generate/batch")
+async def generate_batch(request: BatchGenerateRequest):
+    """批量生成：多个话题在有界进程池中并发执行"""
+    global _current_batch
+
+    if (_current_process and _current_process.is_alive()) or _batch_running():
+        raise HTTPException(status_code=409, detail="任务正在运行中,请先停止当前任务")
+
+    config = Config.get_instance()
+    if not config.validate_config():
+        raise HTTPException(status_code=400, detail=f"配置错误: {config.error_message}")
+
+    # 热榜选题可能需要请求接口，放到线程中避免阻塞事件循环
+    tasks = await asyncio.to_thread(
+        build_batch_tasks, config, request.topics, request.hot_count, request.platform or ""
+    )
+    if not tasks:
+        raise HTTPException(status_code=400, detail="请至少提供一个话题或热榜话题数")
+
+    os.environ[config.api_key_name] = config.api_key
+    os.environ["MODEL"] = config.api_model
+    os.environ["OPENAI_API_BASE"] = config.api_apibase
 
     try:
-        while True:
-            # 1. 检查子进程状态
-            if _current_process and not _current_process.is_alive():
-                exit_code = _current_process.exitcode
-                if exit_code != 0:
-                    # 进程异常退出,发送失败消息
-                    await websocket.send_json(
-                        {
-                            "type": "failed",
-                            "message": f"任务执行失败,退出码: {exit_code}",
-                            "error": f"进程异常退出(exitcode={exit_code})",
-                        }
-                    )
-                    break
+        runner = BatchRunner(
+            tasks,
+            request.max_workers,
+            config_data={"custom_template_category": "", "custom_template": ""},
+        )
+        runner.start()
+    except Exception as e:
+        log.print_log(f"批量生成启动失败: {str(e)}", "error")
+        raise HTTPException(status_code=500, detail=str(e))
 
-            # 2. 检查子进程日志队列
-            if _current_log_queue:
-                try:
-                    msg = _current_log_queue.get_nowait()
+    _current_batch = runner
+    return {"status": "success", **runner.summary()}
 
-                    # 发送到前端
-                    await websocket.send_json(
-                        {
-                            "type": msg.get("type", "info"),
-                            "message": msg.get("message", ""),
-                            "timestamp": msg.get("timestamp", time.time()),
-                        }
-                    )
 
-                    # 保存到文件
-                    if file_handler:
-                        file_handler.write_log(msg)
-
-                    # 检查任务完成
-                    if msg.get("type") == "internal":
-                        if "任务执行完成" in msg.get("message", ""):
-                            # 先清空队列中剩余的消息
-                            while True:
-                                try:
-                                    remaining_msg = _current_log_queue.get_nowait()
-                                    await websocket.send_json(
-                                        {
-                                            "type": remaining_msg.get("type", "info"),
-                                            "message": remaining_msg.get("message", ""),
-                                            "timestamp": remaining_msg.get(
-                                                "timestamp", time.time()
-                                            ),
-                                        }
-                                    )
-                                    if file_handler:
-                                        file_handler.write_log(remaining_msg)
-                                except queue.Empty:
-                                    break
-
-                            # 最后发送完成消息
-                            await websocket.send_json(
-                                {
-                                    "type": "completed",
-                                    "message": "任务执行完成",
-                                    "timestamp": time.time(),
-                                }
-                            )
-                            break
-                        elif "任务执行失败" in msg.get("message", ""):
-                            await websocket.send_json(
-                                {
-                                    "type": "failed",
-                                    "message": "任务执行失败",
-                                    "error": msg.get("error", "未知错误"),
-                                    "timestamp": time.time(),
-                                }
-                            )
-                            break
+@router.get("/generate/batch/status")
+async def get_batch_status():
+    if _current_batch is None:
+        return {"status": "idle"}
+    return _current_batch.summary()
 
-                except queue.Empty:
-                    pass
 
-            # 3. 检查主进程日志队列
-            if app_state.log_queue:
-                try:
-                    main_msg = app_state.log_queue.get_nowait()
+@router.post("/generate/batch/stop")
+async def stop_batch():
+    if not _batch_running():
+        return {"status": "info", "message": "没有正在运行的批量任务"}
 
-                    # 发送到前端
-                    await websocket.send_json(
-                        {
-                            "type": main_msg.get("type", "info"),
-                            "message": main_msg.get("message", ""),
-                            "timestamp": main_msg.get("timestamp", time.time()),
-                        }
-                    )
+    await asyncio.to_thread(_current_batch.cancel)
+    return {"status": "success", "message": "批量任务已停止"}
 
-                    # 保存到文件
-                    if file_handler:
-                        file_handler.write_log(main_msg)
 
-                except queue.Empty:
-                    pass
+@router.websocket("/ws/generate/batch/logs")
+async def websocket_batch_logs(websocket: WebSocket):
+    """批量任务日志：每条消息带 task_id，全部任务结束后发送 batch_completed 及汇总"""
+    await websocket.accept()
+    runner = _current_batch
 
-            await asyncio.sleep(0.1)
+    try:
+        if runner is None:
+            await websocket.send_json({"type": "failed", "message": "没有批量任务"})
+            return
+
+        subscriber = runner.subscribe()
+        try:
+            while True:
+                # 阻塞等待放到线程中，不占用事件循环；日志由执行器的转发线程取出
+                try:
+                    msg = await asyncio.to_thread(subscriber.get, True, 1.0)
+                except queue.Empty:
+                    continue
+                if msg is None:
+                    await websocket.send_json(
+                        {"type": "batch_completed", "timestamp": time.time(), **runner.summary()}
+                    )
+                    break
+                if msg.get("type") == "token":
+                    # 批量日志只显示状态，不逐段显示各任务的大模型输出
+                    continue
+                await websocket.send_json(
+                    {
+                        "type": msg.get("type", "info"),
+                        "message": msg.get("message", ""),
+                        "task_id": msg.get("task_id", ""),
+                        "timestamp": msg.get("timestamp", time.time()),
+                    }
+                )
+        finally:
+            runner.unsubscribe(subscriber)
 
     except WebSocketDisconnect:
         log.print_log("WebSocket 连接断开", "info")
@@ -372,7 +402,8 @@ async def get_hot_topics():
         platform = utils.get_random_platform(config.platforms)
 
         # 选择平台话题 - 前5个热门话题根据权重选一个
-        topic = hotnews.select_platform_topic(platform, 5)
+        # 缓存命中时毫秒级返回；未命中需请求热榜接口，放到线程中避免阻塞事件循环
+        topic = await asyncio.to_thread(hotnews.select_platform_topic, platform, 5)
 
         log.print_log(f"获取到热搜话题: 平台={platform}, 话题={topic}", "info")
 
@@ -383,6 +414,19 @@ async def get_hot_topics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/hot-topics/rising")
+async def get_rising_topics(window: int = 3600, platform: Optional[str] = None, limit: int = 20):
+    """
+    获取最近 window 秒内排名上升或新上榜的热搜话题（基于本地热榜快照，不发起网络请求）
+    """
+    store = hotnews.get_hotnews_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="热榜快照库不可用")
+
+    topics = await asyncio.to_thread(store.rising, platform, window, limit)
+    return {"status": "success", "window": window, "topics": topics}
+
+
 @router.get("/logs/latest")
 async def get_latest_log():
     """获取最新的日志文件"""
@@ -392,6 +436,11 @@ async def get_latest_log():
     if not log_dir.exists():
         return {"error": "日志目录不存在"}
 
+    # 先写入缓冲中的日志
+    file_handler = log.LogManager.get_instance().get_file_handler()
+    if file_handler:
+        await asyncio.to_thread(file_handler.flush)
+
     # 查找最新的WEB_*.log文件
     log_files = sorted(log_dir.glob("WEB_*.log"), key=lambda p: p.stat().st_mtime, reverse=True)
     if not log_files:
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+import time
+
+from src.ai_write_x.core.job_queue import (
+    JobQueue,
+    JobSupervisor,
+    CronSchedule,
+    JOB_STATES,
+    JOB_QUEUE_CONFIGS,
+)
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+class JobPayload(BaseModel):
+    """任务内容，topic 为空时执行前按热搜模式选题"""
+
+    topic: Optional[str] = ""
+    platform: Optional[str] = ""
+    urls: List[str] = []
+    reference_ratio: float = 0.0
+    custom_template_category: Optional[str] = ""
+    custom_template: Optional[str] = ""
+
+
+class EnqueueRequest(JobPayload):
+    priority: int = 0
+    count: int = 1  # 一次加入的任务数（用于热搜选题）
+    delay: int = 0  # 延迟执行的秒数
+    max_attempts: Optional[int] = None
+
+
+class ScheduleRequest(BaseModel):
+    name: str
+    cron: str  # 五段式 cron 表达式，如 "0 8 * * *"
+    payload: JobPayload = JobPayload()
+    count: int = 1
+    priority: int = 0
+
+
+@router.get("")
+async def list_jobs(state: Optional[str] = None, limit: int = 50):
+    if state and state not in JOB_STATES:
+        raise HTTPException(status_code=400, detail=f"无效的任务状态: {state}")
+
+    job_queue = JobQueue.get_instance()
+    jobs = await asyncio.to_thread(job_queue.list_jobs, state, limit)
+    supervisor = JobSupervisor.get_instance()
+    return {
+        "status": "success",
+        "stats": job_queue.stats(),
+        "supervisor_running": supervisor.is_running(),
+        "jobs": jobs,
+    }
+
+
+def _require_supervisor():
+    """任务调度未运行时加入的任务不会执行，直接拒绝"""
+    if not JobSupervisor.get_instance().is_running():
+        raise HTTPException(
+            status_code=409,
+            detail="任务调度未运行，请先调用 /api/jobs/supervisor/start 开启",
+        )
+
+
+@router.post("/supervisor/start")
+async def start_supervisor():
+    supervisor = JobSupervisor.get_instance()
+    # 启动时恢复中断的任务，涉及数据库操作
+    await asyncio.to_thread(supervisor.start)
+    JOB_QUEUE_CONFIGS["enabled"] = True
+    return {"status": "success", "supervisor_running": supervisor.is_running()}
+
+
+@router.post("/supervisor/stop")
+async def stop_supervisor():
+    supervisor = JobSupervisor.get_instance()
+    await asyncio.to_thread(supervisor.stop)
+    JOB_QUEUE_CONFIGS["enabled"] = False
+    return {"status": "success", "supervisor_running": supervisor.is_running()}
+
+
+@router.post("")
+async def enqueue_jobs(request: EnqueueRequest):
+    _require_supervisor()
+    payload = request.model_dump(include=set(JobPayload.model_fields))
+    payload["topic"] = (payload["topic"] or "").strip()
+    count = max(1, min(request.count, 100))
+    run_after = time.time() + max(0, request.delay)
+
+    job_ids = await asyncio.to_thread(
+        JobQueue.get_instance().enqueue_many,
+        payload,
+        count,
+        request.priority,
+        run_after,
+        request.max_attempts,
+    )
+    return {"status": "success", "job_ids": job_ids}
+
+
+@router.get("/schedules")
+async def list_schedules():
+    return {"status": "success", "schedules": JobQueue.get_instance().list_schedules()}
+
+
+@router.post("/schedules")
+async def add_schedule(request: ScheduleRequest):
+    try:
+        CronSchedule(request.cron)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _require_supervisor()
+
+    schedule_id = await asyncio.to_thread(
+        JobQueue.get_instance().add_schedule,
+        request.name,
+        request.cron,
+        request.payload.model_dump(),
+        request.count,
+        request.priority,
+    )
+    return {"status": "success", "schedule_id": schedule_id}
+
+
+@router.post("/schedules/{schedule_id}/toggle")
+async def toggle_schedule(schedule_id: int, enabled: bool):
+    if not JobQueue.get_instance().set_schedule_enabled(schedule_id, enabled):
+        raise HTTPException(status_code=404, detail="定时任务不存在")
+    return {"status": "success"}
+
+
+@router.delete("/schedules/{schedule_id}")
+async def remove_schedule(schedule_id: int):
+    if not JobQueue.get_instance().remove_schedule(schedule_id):
+        raise HTTPException(status_code=404, detail="定时任务不存在")
+    return {"status": "success"}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: int):
+    job = JobQueue.get_instance().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return {"status": "success", "job": job}
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: int):
+    cancelled = await asyncio.to_thread(JobSupervisor.get_instance().cancel, job_id)
+    if not cancelled:
+        raise HTTPException(status_code=400, detail="任务不在排队或运行中")
+    return {"status": "success", "message": "任务已取消"}
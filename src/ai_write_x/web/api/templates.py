@@ -7,6 +7,7 @@ from fastapi.responses import HTMLResponse, Response
 from pydantic import BaseModel
 
 from src.ai_write_x.utils.path_manager import PathManager
+from src.ai_write_x.utils.template_registry import TemplateRegistry
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
@@ -50,18 +51,16 @@ class TemplateRename(BaseModel):
 @router.get("/categories")
 async def list_categories():
     """获取所有分类"""
-    template_dir = PathManager.get_template_dir()
-    categories = []
-
-    # 排除的目录名称
-    excluded_dirs = {"components", "__pycache__", ".git"}
-
-    for item in template_dir.iterdir():
-        if item.is_dir() and item.name not in excluded_dirs:
-            template_count = len(list(item.glob("*.html")))
-            categories.append(
-                {"name": item.name, "path": str(item), "template_count": template_count}
-            )
+    registry = TemplateRegistry.get_instance()
+    template_dir = Path(registry.template_dir)
+    categories = [
+        {
+            "name": name,
+            "path": str(template_dir / name),
+            "template_count": len(registry.templates(name)),
+        }
+        for name in registry.categories()
+    ]
 
     return {"status": "success", "data": categories}
 
@@ -76,6 +75,7 @@ async def create_category(category: CategoryCreate):
         raise HTTPException(status_code=409, detail="分类已存在")
 
     category_path.mkdir(parents=True, exist_ok=True)
+    TemplateRegistry.get_instance().invalidate()
     return {"status": "success", "message": "分类已创建"}
 
 
@@ -95,6 +95,7 @@ async def rename_category(category_name: str, rename_data: CategoryRename):
     # 重命名目录
     old_path.rename(new_path)
 
+    TemplateRegistry.get_instance().invalidate()
     return {
         "status": "success",
         "message": "分类已重命名",
@@ -117,6 +118,7 @@ async def delete_category(category_name: str, force: bool = False):
         raise HTTPException(status_code=400, detail=f"分类包含{len(templates)}个模板,无法删除")
 
     shutil.rmtree(category_path)
+    TemplateRegistry.get_instance().invalidate()
     return {"status": "success", "message": "分类已删除"}
 
 
@@ -137,43 +139,18 @@ async def get_default_template_categories():
 @router.get("/")
 async def list_templates(category: str = None):
     """获取模板列表"""
-    templates = []
-    template_dir = PathManager.get_template_dir()
-
-    # 排除的目录名称
-    excluded_dirs = {"components", "__pycache__", ".git"}
-
-    if category:
-        category_path = template_dir / category
-        if category_path.exists():
-            for file in category_path.glob("*.html"):
-                templates.append(
-                    {
-                        "name": file.stem,
-                        "path": str(file),
-                        "category": category,
-                        "size": f"{file.stat().st_size / 1024:.2f} KB",
-                        "create_time": datetime.fromtimestamp(file.stat().st_ctime).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
-                    }
-                )
-    else:
-        # 返回所有分类的模板 - 添加过滤
-        for category_dir in template_dir.iterdir():
-            if category_dir.is_dir() and category_dir.name not in excluded_dirs:  # 添加过滤条件
-                for file in category_dir.glob("*.html"):
-                    templates.append(
-                        {
-                            "name": file.stem,
-                            "path": str(file),
-                            "category": category_dir.name,
-                            "size": f"{file.stat().st_size / 1024:.2f} KB",
-                            "create_time": datetime.fromtimestamp(file.stat().st_ctime).strftime(
-                                "%Y-%m-%d %H:%M:%S"
-                            ),
-                        }
-                    )
+    templates = [
+        {
+            "name": entry.name,
+            "path": entry.path,
+            "category": entry.category,
+            "size": f"{entry.size / 1024:.2f} KB",
+            "create_time": datetime.fromtimestamp(entry.ctime).strftime("%Y-%m-%d %H:%M:%S"),
+            "section_count": entry.section_count,
+            "hash": entry.sha1,
+        }
+        for entry in TemplateRegistry.get_instance().templates(category)
+    ]
 
     return {"status": "success", "data": templates}
 
@@ -198,6 +175,7 @@ async def update_template_content(template_path: str, update: TemplateContentUpd
         raise HTTPException(status_code=404, detail="模板不存在")
 
     file_path.write_text(update.content, encoding="utf-8")
+    TemplateRegistry.get_instance().invalidate()
     return {"status": "success", "message": "模板已保存"}
 
 
@@ -220,6 +198,7 @@ async def delete_template(template_path: str):
     file_path = Path(template_path)
     if file_path.exists():
         file_path.unlink()
+        TemplateRegistry.get_instance().invalidate()
         return {"status": "success", "message": "模板已删除"}
     raise HTTPException(status_code=404, detail="模板不存在")
 
@@ -236,6 +215,7 @@ async def create_template(template: TemplateCreate):
         raise HTTPException(status_code=409, detail="模板已存在")
 
     file_path.write_text(template.content, encoding="utf-8")
+    TemplateRegistry.get_instance().invalidate()
     return {"status": "success", "message": "模板已创建", "path": str(file_path)}
 
 
@@ -255,6 +235,7 @@ async def rename_template(rename_data: TemplateRename):
     # 重命名文件
     source.rename(target_path)
 
+    TemplateRegistry.get_instance().invalidate()
     return {"status": "success", "message": "模板已重命名", "path": str(target_path)}
 
 
@@ -271,6 +252,7 @@ async def copy_template(copy_data: TemplateCopy):
 
     target_path = target_dir / f"{copy_data.new_name}.html"
     shutil.copy2(source, target_path)
+    TemplateRegistry.get_instance().invalidate()
     return {"status": "success", "path": str(target_path)}
 
 
@@ -287,4 +269,5 @@ async def move_template(move_data: TemplateMove):
 
     target_path = target_dir / source.name
     shutil.move(str(source), str(target_path))
+    TemplateRegistry.get_instance().invalidate()
     return {"status": "success", "path": str(target_path)}
@@ -19,15 +19,20 @@ from src.ai_write_x.version import get_version_with_prefix
 from src.ai_write_x.utils.path_manager import PathManager
 from src.ai_write_x.config.config import Config
 from src.ai_write_x.utils import utils
+from src.ai_write_x.tools import hotnews
+from src.ai_write_x.core.job_queue import JobSupervisor, JOB_QUEUE_CONFIGS
+from src.ai_write_x.core.worker_pool import WorkerPool, WORKER_POOL_CONFIGS
 
 # 导入状态管理
 from .state import app_state
+from .log_stream import LogStreamBridge
 
 # 导入API路由
 from .api.config import router as config_router
 from .api.templates import router as templates_router
 from .api.articles import router as articles_router
 from .api.generate import router as generate_router
+from .api.jobs import router as jobs_router
 
 # 添加全局状态
 app_shutdown_event = asyncio.Event()
@@ -36,11 +41,11 @@ app_shutdown_event = asyncio.Event()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
-        import queue
         from src.ai_write_x.utils import comm, log
 
-        # 初始化主进程日志队列
-        app_state.log_queue = queue.Queue()
+        # 初始化主进程日志队列：主进程和子进程日志都由推送桥转发给 /ws/generate/logs
+        app_state.log_queue = LogStreamBridge.get_instance()
+        app_state.log_queue.start(asyncio.get_running_loop())
         app_state.is_running = True
 
         # 初始化 UI 模式
@@ -54,6 +59,21 @@ async def lifespan(app: FastAPI):
         if not app_state.config.load_config():
             log.print_log("配置加载失败，使用默认配置", "warning")
 
+        # 后台定时预取热榜，热搜模式选题直接读取快照
+        if hotnews.HOTNEWS_CONFIGS["prefetch_enabled"]:
+            hotnews.HotNewsPrefetcher.get_instance().start()
+
+        # 预热常驻工作进程，首个生成任务无需等待进程启动和依赖导入
+        if WORKER_POOL_CONFIGS["enabled"]:
+            try:
+                WorkerPool.get_instance().start()
+            except Exception as e:
+                log.print_log(f"工作进程预热失败，将在首次生成时启动: {str(e)}", "warning")
+
+        # 持久化任务队列：执行排队任务和定时任务
+        if JOB_QUEUE_CONFIGS["enabled"]:
+            JobSupervisor.get_instance().start()
+
     except Exception as e:
         log.print_log(f"Web服务启动失败: {str(e)}", "error")
 
@@ -61,6 +81,11 @@ async def lifespan(app: FastAPI):
 
     # 关闭时执行
     app_state.is_running = False
+    LogStreamBridge.get_instance().stop()
+    hotnews.HotNewsPrefetcher.get_instance().stop()
+    if JOB_QUEUE_CONFIGS["enabled"]:
+        JobSupervisor.get_instance().stop()
+    WorkerPool.get_instance().shutdown()
     log.print_log("AIWriteX Web服务正在关闭", "info")
 
 
@@ -96,6 +121,7 @@ app.include_router(config_router)
 app.include_router(templates_router)
 app.include_router(articles_router)
 app.include_router(generate_router)
+app.include_router(jobs_router)
 
 
 @app.get("/", response_class=HTMLResponse)
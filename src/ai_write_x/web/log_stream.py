@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import asyncio
+import collections
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.ai_write_x.utils import log
+from src.ai_write_x.utils.path_manager import PathManager
+
+
+# WebSocket 日志推送配置
+LOG_STREAM_CONFIGS = {
+    "replay_size": 2000,  # 保留当前任务最近的消息条数，WebSocket 连接（重连）后先补发
+    # 流式输出片段单独保留的条数：一次很长的输出不会把进度等状态消息挤出补发缓冲
+    "token_replay_size": 200,
+    "max_batch": 500,  # 一帧最多合并的消息条数
+    "read_timeout": 0.5,  # 读取线程等待子进程日志的超时（秒），超时后检查进程是否已退出
+}
+
+
+def ws_payload(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """日志消息转为推送给前端的数据，流式输出片段额外带上流标识"""
+    payload = {
+        "type": msg.get("type", "info"),
+        "message": msg.get("message", ""),
+        "timestamp": msg.get("timestamp", time.time()),
+    }
+    if payload["type"] == "token":
+        payload.update(
+            stream_id=msg.get("stream_id", ""), stage=msg.get("stage", ""), end=msg.get("end")
+        )
+    return payload
+
+
+def is_final_payload(payload: Dict[str, Any]) -> bool:
+    return payload.get("type") in ("completed", "failed")
+
+
+class LogStreamBridge:
+    """
+    日志推送桥
+
+    一个常驻读取线程阻塞读取当前任务子进程的日志队列（批量帧展开），主进程日志通过 put() 直接提交；
+    消息转为推送数据后用 call_soon_threadsafe 交给事件循环，追加到补发缓冲并放入每个订阅者的
+    asyncio.Queue。/ws/generate/logs 的每个连接是一个订阅者，等待新消息并把已到达的消息合并为一帧发送。
+    同时把消息（流式片段除外）交给文件日志处理器，由其后台线程批量写入。
+    有订阅者时置位流式输出接收标志，交互生成的子进程据此决定是否流式请求大模型
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: List[asyncio.Queue] = []
+        self._replay = collections.deque(maxlen=LOG_STREAM_CONFIGS["replay_size"])
+        self._token_replay = collections.deque(maxlen=LOG_STREAM_CONFIGS["token_replay_size"])
+        self._process = None
+        self._process_queue = None
+        self._attached = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        # 任务子进程以 spawn 方式启动，标志需从 spawn 上下文创建才能随启动参数传入
+        self._listeners = multiprocessing.get_context("spawn").Event()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    # ==================== 生命周期 ====================
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """在 Web 服务启动时调用，loop 为服务所在的事件循环"""
+        self._loop = loop
+        self._stopped = False
+        # 按日期写入 WEB_<日期>.log，由文件处理器的写入线程批量写入
+        log.LogManager.get_instance().set_file_handler(PathManager.get_log_dir() / "WEB_{date}.log")
+        log.set_token_listeners(self._listeners)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="log-stream", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._attached:
+            self._stopped = True
+            self._attached.notify_all()
+        file_handler = log.LogManager.get_instance().get_file_handler()
+        if file_handler:
+            file_handler.flush()
+
+    def attach(self, process, process_queue):
+        """
+        开始转发新任务的日志（在事件循环中、子进程启动后调用），补发缓冲只保留新任务的消息：
+        先清空缓冲再交给读取线程，新任务最先到达的消息不会被清除
+        """
+        self._replay.clear()
+        self._token_replay.clear()
+        with self._attached:
+            self._process, self._process_queue = process, process_queue
+            self._attached.notify_all()
+
+    def detach(self):
+        """停止转发当前任务的日志（任务被停止时调用）"""
+        with self._attached:
+            self._process, self._process_queue = None, None
+
+    # ==================== 订阅 ====================
+
+    def subscribe(self) -> asyncio.Queue:
+        """在事件循环中调用：返回订阅队列，其中已放入补发缓冲中的消息（与流式片段按时间合并）"""
+        subscriber: asyncio.Queue = asyncio.Queue()
+        if self._replay or self._token_replay:
+            replay = sorted(
+                [*self._replay, *self._token_replay], key=lambda payload: payload["timestamp"]
+            )
+            subscriber.put_nowait(replay)
+        self._subscribers.append(subscriber)
+        self._listeners.set()
+        return subscriber
+
+    def unsubscribe(self, subscriber: asyncio.Queue):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+        if not self._subscribers:
+            self._listeners.clear()
+
+    @staticmethod
+    async def next_batch(subscriber: asyncio.Queue) -> List[Dict[str, Any]]:
+        """等待新消息，并取出已到达的其余消息，最多 max_batch 条"""
+        payloads = list(await subscriber.get())
+        while len(payloads) < LOG_STREAM_CONFIGS["max_batch"]:
+            try:
+                payloads.extend(subscriber.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return payloads
+
+    # ==================== 发布 ====================
+
+    def put(self, msg: Dict[str, Any], *args, **kwargs):
+        """主进程日志入口（comm 的 Web 日志队列），接口同队列的 put"""
+        self._write_file([msg])
+        self._publish([ws_payload(msg)])
+
+    def _publish(self, payloads: List[Dict[str, Any]]):
+        if payloads:
+            self._call_in_loop(self._dispatch, payloads)
+
+    def _call_in_loop(self, callback, *args):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _dispatch(self, payloads: List[Dict[str, Any]]):
+        for payload in payloads:
+            if payload["type"] == "token":
+                self._token_replay.append(payload)
+            else:
+                self._replay.append(payload)
+        for subscriber in self._subscribers:
+            subscriber.put_nowait(payloads)
+
+    def _write_file(self, messages: List[Dict[str, Any]]):
+        file_handler = log.LogManager.get_instance().get_file_handler()
+        if not file_handler:
+            return
+        for msg in messages:
+            if msg.get("type") != "token":
+                file_handler.write_log(msg)
+
+    # ==================== 读取线程 ====================
+
+    def _run(self):
+        settings = LOG_STREAM_CONFIGS
+        while True:
+            with self._attached:
+                while self._process_queue is None and not self._stopped:
+                    self._attached.wait()
+                if self._stopped:
+                    return
+                process, process_queue = self._process, self._process_queue
+
+            try:
+                frame = process_queue.get(timeout=settings["read_timeout"])
+            except queue.Empty:
+                self._check_exit(process, process_queue)
+                continue
+            except (OSError, ValueError, EOFError):
+                # 队列已关闭
+                self._release(process_queue)
+                continue
+
+            messages = log.unpack_messages(frame)
+            # 合并已到达的其余消息，一次交给事件循环
+            self._forward(messages + self._drain(process_queue, settings["max_batch"]))
+
+    def _drain(self, process_queue, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """非阻塞取出队列中已到达的消息，最多 limit 条（不限时取完为止）"""
+        messages: List[Dict[str, Any]] = []
+        while limit is None or len(messages) < limit:
+            try:
+                messages.extend(log.unpack_messages(process_queue.get_nowait()))
+            except (queue.Empty, OSError, ValueError, EOFError):
+                break
+        return messages
+
+    def _forward(self, messages: List[Dict[str, Any]]):
+        self._write_file(messages)
+        self._publish(self._to_payloads(messages))
+
+    def _to_payloads(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        payloads = []
+        for msg in messages:
+            payloads.append(ws_payload(msg))
+            if msg.get("type") != "internal":
+                continue
+            if "任务执行完成" in msg.get("message", ""):
+                payloads.append(
+                    {"type": "completed", "message": "任务执行完成", "timestamp": time.time()}
+                )
+            elif "任务执行失败" in msg.get("message", ""):
+                payloads.append(
+                    {
+                        "type": "failed",
+                        "message": "任务执行失败",
+                        "error": msg.get("error", "未知错误"),
+                        "timestamp": time.time(),
+                    }
+                )
+        return payloads
+
+    def _check_exit(self, process, process_queue):
+        """
+        队列暂时为空时检查子进程：已退出则先转发队列中剩余的消息（退出前最后写入的消息可能在
+        读取超时后才到达），异常退出时再发送失败消息，然后停止读取该队列
+        """
+        try:
+            if process is None or process.is_alive():
+                return
+            exit_code = process.exitcode
+        except Exception:
+            exit_code = None
+        self._forward(self._drain(process_queue))
+        if exit_code != 0:
+            self._publish(
+                [
+                    {
+                        "type": "failed",
+                        "message": f"任务执行失败,退出码: {exit_code}",
+                        "error": f"进程异常退出(exitcode={exit_code})",
+                        "timestamp": time.time(),
+                    }
+                ]
+            )
+        self._release(process_queue)
+
+    def _release(self, process_queue):
+        with self._attached:
+            if self._process_queue is process_queue:
+                self._process, self._process_queue = None, None
@@ -645,26 +645,13 @@ class CreativeWorkshopManager {
             this.logWebSocket.onmessage = (event) => {      
                 try {      
                     const data = JSON.parse(event.data);      
-                      
-                    if (data.message && data.message.includes('[PROGRESS:')) {                          
-                        // 提取所有进度标记  
-                        const progressMarkers = data.message.match(/\[PROGRESS:[^\]]+\]/g); 
-                    }  
-                    // 将消息加入队列而不是直接处理  
-                    this.messageQueue.push(data);  
-                      
-                    // 如果没有在处理队列,启动处理  
-                    if (!this.isProcessingQueue) {  
-                        this.processMessageQueue();  
-                    }  
-                        
-                    // 转发到全局日志面板      
-                    this.appendLog(data.message, data.type, false, data.timestamp);  
-                        
-                    // 检查完成状态      
-                    if (data.type === 'completed' || data.type === 'failed') {      
-                        this.handleGenerationComplete(data);      
-                    }      
+
+                    // 服务端把同时到达的多条消息合并为一帧
+                    if (data.type === 'batch') {
+                        (data.messages || []).forEach(message => this.handleLogMessage(message));
+                    } else {
+                        this.handleLogMessage(data);
+                    }
                 } catch (error) {      
                     console.error('解析日志消息失败:', error);      
                 }      
@@ -682,6 +669,30 @@ class CreativeWorkshopManager {
         }      
     }    
       
+    handleLogMessage(data) {
+        // 大模型流式输出片段：只追加到日志详情面板，不参与进度解析
+        if (data.type === 'token') {
+            this.appendTokens(data);
+            return;
+        }
+
+        // 将消息加入队列而不是直接处理  
+        this.messageQueue.push(data);  
+          
+        // 如果没有在处理队列,启动处理  
+        if (!this.isProcessingQueue) {  
+            this.processMessageQueue();  
+        }  
+            
+        // 转发到全局日志面板      
+        this.appendLog(data.message, data.type, false, data.timestamp);  
+            
+        // 检查完成状态      
+        if (data.type === 'completed' || data.type === 'failed') {      
+            this.handleGenerationComplete(data);      
+        }      
+    }
+
     // 处理消息队列  
     async processMessageQueue() {  
         this.isProcessingQueue = true;  
@@ -942,6 +953,32 @@ class CreativeWorkshopManager {
         }    
     }
 
+    // 同一次大模型调用的输出片段追加到同一条日志中，实时显示生成内容
+    appendTokens(data) {
+        const logsOutput = document.getElementById('logs-output');
+        if (!logsOutput || !data.stream_id) return;
+
+        let entry = logsOutput.querySelector(`.log-entry.token[data-stream-id="${data.stream_id}"]`);
+        if (!entry) {
+            if (!data.message) return;
+            entry = document.createElement('div');
+            entry.className = 'log-entry token';
+            entry.dataset.streamId = data.stream_id;
+            entry.innerHTML = '<span class="log-message"></span>';
+            logsOutput.appendChild(entry);
+        }
+
+        entry.querySelector('.log-message').textContent += data.message || '';
+        if (data.end) {
+            entry.classList.add('token-end');
+        }
+
+        const logsContainer = logsOutput.parentElement;
+        if (logsContainer) {
+            logsContainer.scrollTop = logsContainer.scrollHeight;
+        }
+    }
+
     appendLog(message, type = 'info', skipGlobal = false, timestamp = null) {  
         // 过滤 internal 类型  
         if (type === 'internal') {  
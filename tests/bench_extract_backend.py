@@ -0,0 +1,84 @@
+"""
+页面解析后端基准：对 tests/fixtures/pages 下的合成页面（按常见站点结构手写并填充正文，
+不是真实保存的网页）分别用 BeautifulSoup 和 lxml 后端
+执行完整的提取流程（解析、发布时间、标题、正文），校验两者结果一致并对比耗时。
+
+用法：python tests/bench_extract_backend.py [重复次数]
+"""
+
+import sys
+import os
+import time
+
+# 获取当前文件的绝对路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 找到项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录添加到 Python 搜索路径
+sys.path.append(project_root)
+
+from requests.compat import chardet  # noqa 402
+from src.ai_write_x.tools import search_template  # noqa 402
+
+FIXTURE_DIR = os.path.join(current_dir, "fixtures", "pages")
+
+
+def run_pipeline(raw, encoding, backend):
+    """与 _extract_url_content 相同的提取流程，返回 (结果, 耗时毫秒)"""
+    start = time.perf_counter()
+    page_doc, pub_time, used = search_template._parse_page(raw, encoding, backend)
+    meaningful = search_template._has_meaningful_content(page_doc, used)
+    title = search_template._extract_title_from_page(page_doc, used)
+    content = search_template._extract_full_article_content(page_doc, used)
+    elapsed = (time.perf_counter() - start) * 1000
+    return (pub_time, title, meaningful, content), elapsed
+
+
+def bench(repeat):
+    backends = [
+        search_template.get_extract_backend("bs4"),
+        search_template.get_extract_backend("lxml"),
+    ]
+    if backends[1] is backends[0]:
+        print("未安装 lxml / cssselect，无法对比")
+        return False
+
+    all_equal = True
+    totals = [0.0, 0.0]
+    print(f"{'页面':<28}{'大小KB':>8}{'bs4 ms':>10}{'lxml ms':>10}{'加速':>8}  一致")
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+            raw = f.read()
+        encoding = chardet.detect(raw)["encoding"] or "utf-8"
+
+        results, timings = [], []
+        for backend in backends:
+            best = None
+            for _ in range(repeat):
+                result, elapsed = run_pipeline(raw, encoding, backend)
+                best = elapsed if best is None else min(best, elapsed)
+            results.append(result)
+            timings.append(best)
+
+        equal = results[0] == results[1]
+        all_equal = all_equal and equal
+        totals = [t + b for t, b in zip(totals, timings)]
+        print(
+            f"{name:<28}{len(raw) / 1024:>8.0f}{timings[0]:>10.1f}{timings[1]:>10.1f}"
+            f"{timings[0] / timings[1]:>7.1f}x  {'是' if equal else '否'}"
+        )
+        if not equal:
+            for label, a, b in zip(("pub_time", "title", "meaningful", "content"), *results):
+                if a != b:
+                    print(
+                        f"    {label} 不一致:\n"
+                        f"      bs4 : {str(a)[:200]!r}\n      lxml: {str(b)[:200]!r}"
+                    )
+
+    print(f"{'合计':<28}{'':>8}{totals[0]:>10.1f}{totals[1]:>10.1f}{totals[0] / totals[1]:>7.1f}x")
+    return all_equal
+
+
+if __name__ == "__main__":
+    ok = bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,528 @@
+"""
+端到端流水线基准：不访问网络、不调用真实大模型，测量流水线中非大模型部分的开销。
+
+- 离线 LLM 替身（FakeLLM）通过 LLMPool.set_llm_class 接入 AgentFactory，按智能体角色返回
+  固定的 ReAct 文本（先调用工具，再给出 Final Answer），可用 --latency 模拟每次调用的延迟
+- 本地 HTTP 服务提供 tests/fixtures 下的热榜接口数据（知微、tophub、vvhan）和参考文章页面，
+  热榜接口的请求被改写到本地服务，其余外部请求直接报错
+- 驱动 UnifiedContentWorkflow.execute 完整执行，统计各阶段的墙钟时间、CPU 时间和峰值内存，
+  并校验保存的文章和各平台发布前的格式化结果
+- AIForge 联网搜索依赖外部服务，基准中不配置其 KEY：热搜模式走"未找到最新信息"分支，
+  借鉴模式（--urls）走参考文章提取
+
+用法：python tests/bench_pipeline.py [--runs 3] [--latency 0] [--mode template|design|both]
+                                    [--urls] [--json 结果文件] [--verbose]
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import http.server
+import json
+import random
+import re
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+# 获取当前文件的绝对路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 找到项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录添加到 Python 搜索路径
+sys.path.append(project_root)
+
+os.environ["OTEL_SDK_DISABLED"] = "true"
+os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+os.environ["AIWRITEX_LLM_CACHE"] = "off"
+
+import requests  # noqa 402
+from crewai import LLM  # noqa 402
+from crewai.utilities import I18N  # noqa 402
+from src.ai_write_x.utils.path_manager import PathManager  # noqa 402
+
+FIXTURE_DIR = os.path.join(current_dir, "fixtures")
+
+# 热榜接口 -> 本地数据文件
+FIXTURE_ROUTES = {
+    "trends.zhiweidata.com": "/hotnews/zhiwei.json",
+    "tophub.today": "/hotnews/tophub.html",
+    "api.vvhan.com": "/hotnews/vvhan.json",
+}
+
+# 借鉴模式使用的参考文章
+REFERENCE_PAGES = ["pages/sina_finance_news.html", "pages/wechat_article.html"]
+
+REFERENCE_TOPIC = "全球经济展望"
+
+# 每个智能体的推理轮数上限：替身每个任务最多两轮（调用工具、给出答案），
+# 输出异常时尽快结束并在校验中报错，而不是重试到 CrewAI 的默认上限
+BENCH_MAX_ITER = 4
+
+# CrewAI 每隔几次工具调用会在工具结果后追加格式说明（i18n 的 tools 片段），取工具结果时去掉
+FORMAT_REMINDER = I18N().slice("tools").split("{tools}", 1)[0].strip()
+
+
+# ==================== 离线 LLM ====================
+
+
+class FakeLLM(LLM):
+    """
+    离线 LLM 替身：根据系统提示中的智能体角色返回固定内容，输出只取决于输入，结果可复现。
+    同一进程内所有阶段共享同一个实例（LLMPool），基础写作的结果供后续阶段使用
+    """
+
+    latency = 0.0  # 每次调用模拟的延迟（秒）
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._article = ""
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        FakeLLM.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        observation = self._observation(messages)
+
+        if "内容创作专家" in prompt:
+            if observation is None:
+                return self._action("aiforge_search_tool", self._search_args(prompt))
+            self._article = self._write_article(prompt, observation)
+            return self._final(self._article)
+        if "维度化创意专家" in prompt:
+            return self._final(self._article + "\n\n## 换个角度\n\n" + self._paragraph(3))
+        if "模板调整与内容填充专家" in prompt:
+            if observation is None:
+                return self._action("read_template_tool", {})
+            return self._final(self._fill_template(observation))
+        if "微信排版专家" in prompt or "HTML排版" in prompt:
+            return self._final(self._design())
+        return self._final(self._article or self._paragraph(1))
+
+    @staticmethod
+    def _observation(messages):
+        """工具调用结果：crewai 把 Observation 追加在 assistant 消息中，只取工具的输出"""
+        for message in reversed(messages):
+            content = str(message.get("content", ""))
+            if message.get("role") == "assistant" and "Observation:" in content:
+                observation = content.split("Observation:", 1)[1]
+                return observation.split(FORMAT_REMINDER, 1)[0].strip()
+        return None
+
+    @staticmethod
+    def _action(tool, args):
+        return (
+            f"Thought: 需要先使用工具 {tool}\n"
+            f"Action: {tool}\n"
+            f"Action Input: {json.dumps(args, ensure_ascii=False)}"
+        )
+
+    @staticmethod
+    def _final(answer):
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    @staticmethod
+    def _search_args(prompt):
+        def field(name, default):
+            match = re.search(rf"{name}=(.*)", prompt)
+            return match.group(1).strip() if match else default
+
+        urls = re.findall(r"https?://[^\s'\"\],]+", field("urls", ""))
+        try:
+            ratio = float(field("reference_ratio", "0"))
+        except ValueError:
+            ratio = 0.0
+        return {"topic": field("topic", ""), "urls": urls, "reference_ratio": ratio}
+
+    @staticmethod
+    def _paragraph(seed):
+        sentences = [
+            "这一变化背后有着复杂的社会和经济因素。",
+            "多位业内人士认为，短期波动并不改变长期趋势。",
+            "数据显示，相关指标在过去一段时间内持续改善。",
+            "普通人最关心的，依然是它对日常生活的实际影响。",
+            "从更长的时间维度看，这只是结构性调整的一个片段。",
+            "专家建议保持理性，既不过度乐观，也不必过分担忧。",
+        ]
+        return "".join(sentences[(seed + i) % len(sentences)] for i in range(len(sentences)))
+
+    def _write_article(self, prompt, observation):
+        match = re.search(r"基于话题'(.+?)'", prompt)
+        topic = match.group(1) if match else "无标题"
+        reference = re.sub(r"\s+", "", observation)[:300]
+        sections = [f"# {topic}", self._paragraph(0), "## 事件回顾", reference or self._paragraph(1)]
+        for i, heading in enumerate(("多方观点", "影响分析", "未来展望")):
+            sections += [f"## {heading}", self._paragraph(i + 2), f"> {self._paragraph(i)[:30]}"]
+            sections += [f"- 要点{j + 1}：{self._paragraph(i + j)[:24]}" for j in range(3)]
+        return "\n\n".join(sections)
+
+    def _paragraphs(self):
+        return [
+            line.strip("#>- ").strip()
+            for line in self._article.splitlines()
+            if line.strip() and not line.startswith("# ")
+        ]
+
+    def _fill_template(self, template_html):
+        """按顺序用文章段落替换模板中各段落、标题的文字，保留标签和样式"""
+        paragraphs = iter(self._paragraphs())
+
+        def replace(match):
+            text = next(paragraphs, None)
+            return match.group(0) if text is None else f"{match.group(1)}{text}{match.group(3)}"
+
+        pattern = r"(<(?:p|h[1-6])\b[^>]*>)(.*?)(</(?:p|h[1-6])>)"
+        return re.sub(pattern, replace, template_html, flags=re.S)
+
+    def _design(self):
+        style = "margin:16px;padding:16px;border-radius:12px;box-shadow:0 2px 8px rgba(0,0,0,.1)"
+        blocks = [
+            f'<section style="{style}"><p>{text}</p></section>' for text in self._paragraphs()
+        ]
+        return "<div>" + "".join(blocks) + "</div>"
+
+
+# ==================== 本地 HTTP 服务 ====================
+
+
+class _FixtureHandler(http.server.SimpleHTTPRequestHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURE_DIR, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """在随机端口上提供 tests/fixtures 目录，并把热榜接口的请求改写到这里"""
+
+    def __init__(self):
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._original_send = requests.adapters.HTTPAdapter.send
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        original_send, base_host = self._original_send, urlparse(self.base_url).netloc
+
+        def send(adapter, request, **kwargs):
+            host = urlparse(request.url).netloc
+            if host in FIXTURE_ROUTES:
+                request.url = self.url(FIXTURE_ROUTES[host])
+            elif host != base_host:
+                raise requests.ConnectionError(f"基准测试禁止访问外部网络：{request.url}")
+            return original_send(adapter, request, **kwargs)
+
+        requests.adapters.HTTPAdapter.send = send
+        return self
+
+    def stop(self):
+        requests.adapters.HTTPAdapter.send = self._original_send
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ==================== 阶段计量 ====================
+
+
+def _rss_mb():
+    """当前常驻内存（MB）：优先读 /proc，否则使用进程池的实现（psutil 或 getrusage 峰值）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        from src.ai_write_x.core.worker_pool import _rss_mb as pool_rss_mb
+
+        return pool_rss_mb()
+
+
+class StageMeter:
+    """按阶段记录墙钟时间、CPU 时间（进程内所有线程）和阶段内的峰值内存，阶段可以嵌套"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = {}  # 阶段 -> [(wall_ms, cpu_ms, peak_mb), ...]
+        self._active = {}  # 进行中的阶段 -> 当前峰值
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._sample, daemon=True).start()
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            rss = _rss_mb()
+            with self._lock:
+                for key, peak in self._active.items():
+                    self._active[key] = max(peak, rss)
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        key = object()
+        with self._lock:
+            self._active[key] = _rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = (time.perf_counter() - wall) * 1000
+            cpu = (time.process_time() - cpu) * 1000
+            with self._lock:
+                peak = max(self._active.pop(key), _rss_mb())
+                self.samples.setdefault(stage, []).append((wall, cpu, peak))
+
+    def wrap(self, owner, attr, stage):
+        """把 owner.attr 替换为计时版本（owner 可以是实例或类）"""
+        original = getattr(owner, attr)
+
+        def wrapped(*args, **kwargs):
+            with self.measure(stage):
+                return original(*args, **kwargs)
+
+        setattr(owner, attr, wrapped)
+
+    def stop(self):
+        self._stopped.set()
+
+    def report(self):
+        rows = []
+        for stage, samples in self.samples.items():
+            walls, cpus, peaks = zip(*samples)
+            rows.append(
+                {
+                    "stage": stage,
+                    "count": len(samples),
+                    "wall_ms": round(statistics.median(walls), 2),
+                    "cpu_ms": round(statistics.median(cpus), 2),
+                    "peak_rss_mb": round(max(peaks), 1),
+                }
+            )
+        return rows
+
+
+# ==================== 执行 ====================
+
+
+def isolate_dirs(root):
+    """文章、缓存写到临时目录，不影响真实数据（需在创建各缓存单例之前调用）"""
+    article_dir, cache_dir = Path(root) / "article", Path(root) / "cache"
+    article_dir.mkdir()
+    cache_dir.mkdir()
+    PathManager.get_article_dir = staticmethod(lambda: article_dir)
+    PathManager.get_cache_dir = staticmethod(lambda: cache_dir)
+    return article_dir
+
+
+def prepare_config(mode, template="template1"):
+    from src.ai_write_x.config.config import Config
+
+    config = Config.get_instance()
+    if not config.config and not config.load_config():
+        raise RuntimeError("配置加载失败")
+
+    api = config.config["api"][config.api_type]
+    api["api_key"] = ["sk-bench"]
+    api["key_index"] = 0
+    provider = config.aiforge_config["default_llm_provider"]
+    config.aiforge_config["llm"][provider]["api_key"] = ""
+
+    config.config.update(
+        {
+            "auto_publish": False,
+            "article_format": "html",
+            "format_publish": True,
+            "use_template": mode == "template",
+            "template_category": "其他",
+            "template": template,
+        }
+    )
+    config.config.setdefault("dimensional_creative", {})["enabled"] = True
+    config.custom_topic = ""
+    return config
+
+
+def publish_prep(workflow, results):
+    """各平台发布前的格式化（不联网）：HTML 结果和 Markdown 原文各格式化一次"""
+    from src.ai_write_x.core.base_framework import ContentResult
+
+    final = results["final_content"]
+    html = ContentResult(
+        title=final.title,
+        content=results["formatted_content"],
+        summary=final.summary,
+        content_format="html",
+    )
+    outputs = {}
+    for name, adapter in workflow.platform_adapters.items():
+        outputs[name] = (adapter.format_content(html), adapter.format_content(final))
+    return outputs
+
+
+def run_once(workflow, meter, server, mode, use_urls, fanout=False):
+    from src.ai_write_x.tools import hotnews
+
+    errors = []
+    if use_urls:
+        topic, platform = REFERENCE_TOPIC, ""
+        urls, ratio = [server.url(page) for page in REFERENCE_PAGES], 0.3
+    else:
+        # 每次都重新请求并解析热榜，而不是命中进程内缓存或快照
+        hotnews.HotNewsAggregator.get_instance().clear()
+        with meter.measure("hotnews"):
+            platform = "微博"
+            topic = hotnews.select_platform_topic(platform, 5)
+        urls, ratio = [], 0.0
+
+    with meter.measure("total"):
+        results = workflow.execute(topic, platform=platform, urls=urls, reference_ratio=ratio)
+    with meter.measure("publish_prep"):
+        outputs = publish_prep(workflow, results)
+
+    saved = results["save_result"].get("path")
+    if not saved or not os.path.getsize(saved):
+        errors.append(f"文章未保存：{saved}")
+    if "<section" not in results["formatted_content"] and "<p" not in results["formatted_content"]:
+        errors.append(f"{mode} 阶段输出不是 HTML")
+    if re.search(r'style="[^"]*@s[0-9a-f]{6}', results["formatted_content"]):
+        errors.append("模板样式占位符未还原")
+    if topic not in results["base_content"].title:
+        errors.append(f"标题解析错误：{results['base_content'].title}")
+    errors += [f"{name} 格式化结果为空" for name, (a, b) in outputs.items() if not (a and b)]
+    if fanout:
+        variants = results["save_result"].get("variants", {})
+        from src.ai_write_x.config.config import Config
+
+        expected = set(workflow.platform_adapters) - {Config.get_instance().publish_platform}
+        missing = expected - set(variants)
+        errors += [f"{name} 平台版本未保存" for name in sorted(missing)]
+    return errors
+
+
+def bound_agent_iterations(max_iter):
+    """限制 AgentFactory 创建的智能体的推理轮数，返回恢复函数"""
+    from src.ai_write_x.core.agent_factory import AgentFactory
+
+    original = AgentFactory.create_agent
+
+    def create_agent(factory, *args, **kwargs):
+        agent = original(factory, *args, **kwargs)
+        agent.max_iter = max_iter
+        return agent
+
+    AgentFactory.create_agent = create_agent
+    return lambda: setattr(AgentFactory, "create_agent", original)
+
+
+def bench(args):
+    from src.ai_write_x.core import unified_workflow
+    from src.ai_write_x.core.agent_factory import LLMPool
+    from src.ai_write_x.core.content_generation import WorkflowCache
+    from src.ai_write_x.core.system_init import setup_aiwritex
+    from src.ai_write_x.tools import hotnews
+    from src.ai_write_x.tools.custom_tool import AIForgeSearchTool, ReadTemplateTool
+
+    hotnews.HOTNEWS_CONFIGS["snapshot_max_age"] = 0
+    unified_workflow.PLATFORM_FANOUT_CONFIGS["enabled"] = args.fanout
+    FakeLLM.latency = args.latency
+    LLMPool.get_instance().set_llm_class(FakeLLM)
+    WorkflowCache.get_instance().clear()
+    restore_create_agent = bound_agent_iterations(BENCH_MAX_ITER)
+
+    meter = StageMeter()
+    for owner, attr, stage in (
+        (unified_workflow.UnifiedContentWorkflow, "_generate_base_content", "write"),
+        (AIForgeSearchTool, "_run", "  search_tool"),
+        (unified_workflow.UnifiedContentWorkflow, "_apply_dimensional_creative_transformation",
+         "creative"),
+        (unified_workflow.UnifiedContentWorkflow, "_apply_template_formatting", "template"),
+        (ReadTemplateTool, "_run", "  read_template_tool"),
+        (unified_workflow.UnifiedContentWorkflow, "_apply_design_formatting", "design"),
+        (unified_workflow.UnifiedContentWorkflow, "_variant_stage", "variant"),
+        (unified_workflow.UnifiedContentWorkflow, "_save_content", "save"),
+        (unified_workflow.UnifiedContentWorkflow, "_record_generated_topic", "record_topic"),
+    ):
+        meter.wrap(owner, attr, stage)
+
+    modes = ["template", "design"] if args.mode == "both" else [args.mode]
+    server = FixtureServer().start()
+    errors = []
+    quiet = open(os.devnull, "w") if not args.verbose else None
+    try:
+        for mode in modes:
+            prepare_config(mode, args.template)
+            with meter.measure("setup"):
+                workflow = setup_aiwritex()
+            for i in range(args.runs):
+                random.seed(i)
+                with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+                    failures = run_once(workflow, meter, server, mode, args.urls, args.fanout)
+                errors += [f"[{mode}#{i}] {e}" for e in failures]
+    finally:
+        server.stop()
+        meter.stop()
+        LLMPool.get_instance().set_llm_class(None)
+        WorkflowCache.get_instance().clear()
+        restore_create_agent()
+        if quiet:
+            quiet.close()
+
+    rows = meter.report()
+    print(f"{'阶段':<22}{'次数':>6}{'墙钟 ms':>12}{'CPU ms':>12}{'峰值 MB':>10}")
+    for row in rows:
+        print(
+            f"{row['stage']:<22}{row['count']:>6}{row['wall_ms']:>12.1f}"
+            f"{row['cpu_ms']:>12.1f}{row['peak_rss_mb']:>10.1f}"
+        )
+    print(f"LLM 调用次数: {FakeLLM.calls}，模拟延迟: {args.latency}s/次（墙钟时间包含延迟）")
+    for error in errors:
+        print(f"校验失败: {error}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"args": vars(args), "stages": rows, "llm_calls": FakeLLM.calls, "errors": errors},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线端到端流水线基准")
+    parser.add_argument("--runs", type=int, default=3, help="每种模式执行次数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每次 LLM 调用模拟的延迟（秒）")
+    parser.add_argument("--mode", choices=["template", "design", "both"], default="both")
+    parser.add_argument("--urls", action="store_true", help="借鉴模式：从本地参考文章提取内容")
+    parser.add_argument(
+        "--template",
+        default="template1",
+        help="“其他”分类下使用的模板（template1 为纯 section 排版，走大模型填充；"
+        "其余模板一般可按槽位本地填充）",
+    )
+    parser.add_argument("--fanout", action="store_true", help="同时生成全部平台的版本")
+    parser.add_argument("--json", help="把统计结果写入 JSON 文件，便于对比")
+    parser.add_argument("--verbose", action="store_true", help="显示流水线日志输出")
+    args = parser.parse_args()
+
+    tmp_root = tempfile.mkdtemp(prefix="aiwritex_bench_")
+    try:
+        isolate_dirs(tmp_root)
+        return bench(args)
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
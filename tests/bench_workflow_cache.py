@@ -0,0 +1,100 @@
+"""
+工作流构建开销基准：分别统计基础写作、维度化创意、模板、设计四个阶段创建智能体、工具、LLM
+和任务的耗时，对比不使用缓存（每次新建，等同于原来的行为）和使用进程级工作流缓存/LLM 客户端池。
+只做构建，不调用大模型；需要已有可加载的配置（API KEY 可以是任意值）。
+
+用法：python tests/bench_workflow_cache.py [重复次数]
+"""
+
+import sys
+import os
+import time
+
+# 获取当前文件的绝对路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 找到项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录添加到 Python 搜索路径
+sys.path.append(project_root)
+
+os.environ["OTEL_SDK_DISABLED"] = "true"
+os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+
+from src.ai_write_x.config.config import Config  # noqa 402
+from src.ai_write_x.core import content_generation  # noqa 402
+from src.ai_write_x.core.agent_factory import LLMPool  # noqa 402
+from src.ai_write_x.core.content_generation import ContentGenerationEngine  # noqa 402
+from src.ai_write_x.core.system_init import setup_aiwritex  # noqa 402
+from src.ai_write_x.creative.dimensional_engine import DimensionalCreativeEngine  # noqa 402
+
+
+def stage_configs(workflow):
+    config = Config.get_instance()
+    creative = DimensionalCreativeEngine(config.dimensional_creative_config)
+    dimensions = creative.select_dimensions(False, 2) or []
+    return {
+        "base": workflow.get_base_content_config(publish_platform=config.publish_platform),
+        "creative": creative._create_dimensional_workflow_config(dimensions),
+        "template": workflow._get_template_workflow_config(config.publish_platform),
+        "design": workflow._get_design_workflow_config(config.publish_platform),
+    }
+
+
+def build_once(workflow_config, cached):
+    """与 execute_workflow 相同的构建步骤（compile + Crew），返回耗时毫秒"""
+    from crewai import Crew, Process
+
+    if not cached:
+        LLMPool.get_instance().clear()
+    start = time.perf_counter()
+    engine = ContentGenerationEngine(workflow_config)
+    engine.compile()
+    Crew(
+        agents=list(engine.agents.values()),
+        tasks=list(engine.tasks.values()),
+        process=Process.sequential,
+        verbose=True,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    engine.release()
+    return elapsed
+
+
+def bench(repeat):
+    config = Config.get_instance()
+    if not config.load_config():
+        print("配置加载失败")
+        return False
+    api = config.config["api"][config.api_type]
+    if not any(api.get("api_key") or []):
+        api["api_key"] = ["sk-bench"]
+        api["key_index"] = 0
+
+    start = time.perf_counter()
+    workflow = setup_aiwritex()
+    print(f"setup_aiwritex: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    configs = stage_configs(workflow)
+    cache_configs = content_generation.WORKFLOW_CACHE_CONFIGS
+
+    print(f"{'阶段':<10}{'无缓存 ms':>12}{'缓存 ms':>12}{'加速':>8}")
+    totals = [0.0, 0.0]
+    for name, workflow_config in configs.items():
+        cache_configs["enabled"] = False
+        uncached = min(build_once(workflow_config, False) for _ in range(repeat))
+
+        cache_configs["enabled"] = True
+        build_once(workflow_config, True)  # 预热缓存
+        cached = min(build_once(workflow_config, True) for _ in range(repeat))
+
+        totals = [totals[0] + uncached, totals[1] + cached]
+        print(f"{name:<10}{uncached:>12.2f}{cached:>12.2f}{uncached / cached:>7.1f}x")
+
+    print(f"{'合计':<10}{totals[0]:>12.2f}{totals[1]:>12.2f}{totals[0] / totals[1]:>7.1f}x")
+    print(f"缓存统计: {content_generation.WorkflowCache.get_instance().stats()}")
+    return True
+
+
+if __name__ == "__main__":
+    ok = bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,110 @@
+"""
+任务队列的基本检查：cron 表达式解析与下次触发时间、失败重试的指数退避与最大尝试次数。
+使用临时数据库，不启动调度器和生成进程。
+
+用法：python tests/test_job_queue.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# 获取当前文件的绝对路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 找到项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录添加到 Python 搜索路径
+sys.path.append(project_root)
+
+from src.ai_write_x.core.job_queue import CronSchedule, JobQueue, JOB_QUEUE_CONFIGS  # noqa 402
+
+
+def check_cron_parsing():
+    cron = CronSchedule("*/15 8-10 * * 1,3")
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == {8, 9, 10}
+    assert cron.weekdays == {1, 3}
+
+    # 周日写作 0 或 7 等价
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+    # 单个数字加步长表示从该值到上限
+    assert CronSchedule("5/20 * * * *").minutes == {5, 25, 45}
+
+    for expr in ("* * * *", "60 * * * *", "* 24 * * *", "5-1 * * * *", "*/0 * * * *"):
+        try:
+            CronSchedule(expr)
+        except ValueError:
+            continue
+        raise AssertionError(f"应拒绝非法表达式: {expr}")
+
+
+def check_cron_next_after():
+    base = datetime(2024, 1, 1, 7, 59, 30).timestamp()  # 2024-01-01 是周一
+    # 每天 8:00：当天 8:00
+    assert datetime.fromtimestamp(CronSchedule("0 8 * * *").next_after(base)) == datetime(
+        2024, 1, 1, 8, 0
+    )
+    # 不含当前分钟：8:00 之后的下一次是次日
+    at_eight = datetime(2024, 1, 1, 8, 0).timestamp()
+    assert datetime.fromtimestamp(CronSchedule("0 8 * * *").next_after(at_eight)) == datetime(
+        2024, 1, 2, 8, 0
+    )
+    # 周三 9:30
+    assert datetime.fromtimestamp(CronSchedule("30 9 * * 3").next_after(base)) == datetime(
+        2024, 1, 3, 9, 30
+    )
+    # 日和周同时限定时满足任一即可：1 月 5 日（周五）早于之后的第一个周日（1 月 7 日）
+    assert datetime.fromtimestamp(CronSchedule("0 0 5 * 0").next_after(base)) == datetime(
+        2024, 1, 5, 0, 0
+    )
+    # 2 月 29 日：跨年查找到下一个闰年
+    feb29 = datetime(2024, 3, 1).timestamp()
+    assert datetime.fromtimestamp(CronSchedule("0 0 29 2 *").next_after(feb29)) == datetime(
+        2028, 2, 29, 0, 0
+    )
+
+
+def check_retry_backoff():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        job_id = queue.enqueue({"topic": "测试"}, max_attempts=3)
+        base = JOB_QUEUE_CONFIGS["retry_base_delay"]
+
+        for attempt in (1, 2):
+            job = queue.claim()
+            assert job and job["id"] == job_id and job["attempts"] == attempt
+            before = time.time()
+            assert queue.fail(job_id, "出错") == "queued"
+
+            # 延迟按 base * 2^(n-1) 递增，带 ±10% 抖动
+            delay = queue.get(job_id)["run_after"] - before
+            expected = min(JOB_QUEUE_CONFIGS["retry_max_delay"], base * 2 ** (attempt - 1))
+            assert expected * 0.89 <= delay <= expected * 1.11, (attempt, delay)
+
+            # 退避期间不会被取出
+            assert queue.claim() is None
+            queue._conn.execute("UPDATE jobs SET run_after = 0 WHERE id = ?", (job_id,))
+
+        # 第三次失败达到最大尝试次数，不再重试
+        assert queue.claim()["attempts"] == 3
+        assert queue.fail(job_id, "出错") == "failed"
+        assert queue.get(job_id)["state"] == "failed"
+
+        # 批量加入：相同内容的多个任务，按 ID 顺序取出
+        batch = queue.enqueue_many({"topic": "批量"}, 3, priority=5)
+        assert len(batch) == 3 and [queue.claim()["id"] for _ in batch] == batch
+
+        # retry=False（取消）直接失败
+        other = queue.enqueue({"topic": "取消"})
+        queue.claim()
+        assert queue.fail(other, "已取消", retry=False) == "failed"
+        queue._conn.close()
+
+
+if __name__ == "__main__":
+    check_cron_parsing()
+    check_cron_next_after()
+    check_retry_backoff()
+    print("任务队列检查通过")
@@ -0,0 +1,126 @@
+"""
+模板槽位填充检查：用随包模板填充一篇带导语、章节、列表和引用的文章，
+确认每段内容都出现在结果中、模板原有文案没有残留；不适合槽位填充的模板返回 None。
+
+用法：python tests/test_template_slots.py
+"""
+
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+# 获取当前文件的绝对路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 找到项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录添加到 Python 搜索路径
+sys.path.append(project_root)
+
+from src.ai_write_x.utils.template_slots import (  # noqa 402
+    TEMPLATE_SLOT_CONFIGS,
+    TemplateSlotEngine,
+    _SKIP_PARENTS,
+)
+
+TEMPLATE_DIR = os.path.join(project_root, "knowledge", "templates")
+
+# 每段内容都带唯一标记，便于在结果中逐一查找
+TITLE = "槽位填充检查标题"
+SECTIONS = ["第一章节检查", "第二章节检查", "第三章节检查"]
+ARTICLE = f"""# {TITLE}
+
+导语段落检查甲，介绍文章背景。
+
+## {SECTIONS[0]}
+
+正文段落检查乙，第一章节的第一段。
+
+- 列表项检查丙
+- 列表项检查丁
+
+正文段落检查戊，第一章节的第二段。
+
+## {SECTIONS[1]}
+
+> 引用检查己，一句引用。
+
+正文段落检查庚，第二章节的正文。
+
+## {SECTIONS[2]}
+
+正文段落检查辛，第三章节的正文。
+
+正文段落检查壬，全文结尾。
+"""
+MARKERS = [
+    "导语段落检查甲",
+    "正文段落检查乙",
+    "列表项检查丙",
+    "列表项检查丁",
+    "正文段落检查戊",
+    "引用检查己",
+    "正文段落检查庚",
+    "正文段落检查辛",
+    "正文段落检查壬",
+] + SECTIONS
+
+
+def read_template(relative_path):
+    with open(os.path.join(TEMPLATE_DIR, relative_path), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def visible_texts(html):
+    """页面中可见的文字片段（样式、脚本、SVG 中的除外）"""
+    soup = BeautifulSoup(html, "html.parser")
+    root = soup.body or soup
+    return [
+        text.strip()
+        for text in root.find_all(string=True)
+        if text.strip() and not any(p.name in _SKIP_PARENTS for p in text.parents)
+    ]
+
+
+def check_fill(relative_path):
+    html = read_template(relative_path)
+    filled = TemplateSlotEngine().fill(html, ARTICLE, TITLE)
+    assert filled is not None, f"{relative_path} 应可本地填充"
+
+    text = " ".join(visible_texts(filled))
+    for marker in MARKERS:
+        assert marker in text, f"{relative_path} 缺少内容：{marker}"
+    assert TITLE in text
+
+    # 章节标题落在标题元素中；模板有列表槽位时列表项落在 li 中
+    soup = BeautifulSoup(filled, "html.parser")
+    headings = [tag.get_text(strip=True) for tag in soup.find_all(["h1", "h2", "h3", "h4"])]
+    for heading in [TITLE] + SECTIONS:
+        assert any(heading in h for h in headings), f"{relative_path} 标题未填入：{heading}"
+    index = TemplateSlotEngine().get_index(html)
+    if any(kind == "list" for section in index["sections"] for kind, _ in section["slots"]):
+        items = [li.get_text(strip=True) for li in soup.find_all("li")]
+        assert items == ["列表项检查丙", "列表项检查丁"], f"{relative_path} 列表项：{items}"
+
+    # 内容按原文顺序出现
+    positions = [text.index(marker) for marker in MARKERS[:-len(SECTIONS)]]
+    assert positions == sorted(positions), f"{relative_path} 内容顺序错误"
+
+    # 不少于 stale_text_length 个字的模板原文都应被替换或清除
+    min_length = TEMPLATE_SLOT_CONFIGS["stale_text_length"]
+    remaining = set(visible_texts(filled))
+    stale = [t for t in visible_texts(html) if len(t) >= min_length and t in remaining]
+    assert not stale, f"{relative_path} 残留模板原文：{stale[:3]}"
+
+
+def check_unsuitable(relative_path):
+    html = read_template(relative_path)
+    assert TemplateSlotEngine().fill(html, ARTICLE, TITLE) is None, f"{relative_path} 应返回 None"
+
+
+if __name__ == "__main__":
+    for path in ("其他/template4.html", "其他/template3.html", "科技数码/t1.html"):
+        check_fill(path)
+    for path in ("其他/template1.html", "尚未适配/template26.html"):
+        check_unsuitable(path)
+    print("模板槽位填充检查通过")
@@ -0,0 +1,140 @@
+"""
+已编译工作流缓存检查：同一个带工具的工作流连续执行多次，每次都命中缓存，
+且每次执行的状态独立（任务新建、工具调用计数不累计，第三次起不会出现 CrewAI 的格式提醒）。
+使用离线 LLM 替身，不访问网络。
+
+用法：python tests/test_workflow_cache.py
+"""
+
+import os
+import sys
+
+# 获取当前文件的绝对路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# 找到项目根目录
+project_root = os.path.dirname(current_dir)
+# 将根目录添加到 Python 搜索路径
+sys.path.append(project_root)
+
+os.environ["OTEL_SDK_DISABLED"] = "true"
+os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+os.environ["AIWRITEX_LLM_CACHE"] = "off"
+
+from crewai import LLM  # noqa 402
+from crewai.tools import BaseTool  # noqa 402
+
+from src.ai_write_x.config.config import Config  # noqa 402
+from src.ai_write_x.core.agent_factory import LLMPool  # noqa 402
+from src.ai_write_x.core.base_framework import (  # noqa 402
+    AgentConfig,
+    ContentType,
+    TaskConfig,
+    WorkflowConfig,
+    WorkflowType,
+)
+from src.ai_write_x.core.content_generation import (  # noqa 402
+    ContentGenerationEngine,
+    WorkflowCache,
+    WORKFLOW_CACHE_CONFIGS,
+)
+from src.ai_write_x.core.tool_registry import GlobalToolRegistry  # noqa 402
+
+RUNS = 4
+TOOL_OUTPUT = "检查工具的输出"
+
+
+class EchoTool(BaseTool):
+    name: str = "echo_check_tool"
+    description: str = "返回固定文字"
+
+    def _run(self) -> str:
+        return TOOL_OUTPUT
+
+
+class FakeLLM(LLM):
+    """先调用工具，拿到工具结果后给出最终答案；记录每次看到的工具结果"""
+
+    observations = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        last = messages[-1] if isinstance(messages, list) else {}
+        content = str(last.get("content", ""))
+        if last.get("role") == "assistant" and "Observation:" in content:
+            observation = content.split("Observation:", 1)[1].strip()
+            FakeLLM.observations.append(observation)
+            return f"Thought: I now know the final answer\nFinal Answer: 结果：{observation}"
+        return "Thought: 先调用工具\nAction: echo_check_tool\nAction Input: {}"
+
+
+def workflow_config():
+    return WorkflowConfig(
+        name="cache_check",
+        description="缓存检查",
+        workflow_type=WorkflowType.SEQUENTIAL,
+        content_type=ContentType.ARTICLE,
+        agents=[
+            AgentConfig(
+                name="writer",
+                role="检查员",
+                goal="调用工具并返回结果",
+                backstory="用于缓存检查",
+                tools=["echo_check_tool"],
+                llm_config={"model": "openai/cache-check", "api_key": "sk-check"},
+                memory=False,
+                verbose=False,
+            )
+        ],
+        tasks=[
+            TaskConfig(
+                name="check",
+                description="调用 echo_check_tool 并返回结果",
+                agent_name="writer",
+                expected_output="工具结果",
+            )
+        ],
+    )
+
+
+def check_repeated_runs():
+    config = workflow_config()
+    cache = WorkflowCache.get_instance()
+    agents, tasks = [], []
+    for i in range(RUNS):
+        engine = ContentGenerationEngine(config)
+        result = engine.execute_workflow({"parse_result": False})
+        assert result.content.strip() == f"结果：{TOOL_OUTPUT}", (i, result.content)
+        agents.append(engine.agents["writer"])
+        tasks.append(engine.tasks["check"])
+
+    # 智能体复用，任务每次新建
+    assert all(agent is agents[0] for agent in agents)
+    assert len({id(task) for task in tasks}) == RUNS
+    assert all(task.used_tools == 1 for task in tasks), [task.used_tools for task in tasks]
+    # 工具结果不带格式提醒（累计调用次数为 3 的倍数时 CrewAI 会追加）
+    assert FakeLLM.observations == [TOOL_OUTPUT] * RUNS, FakeLLM.observations
+    # 放回缓存时清除了智能体的运行状态
+    assert agents[0].formatting_errors == 0 and not agents[0].tools_results
+
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == RUNS - 1, stats
+
+
+if __name__ == "__main__":
+    # 缓存键包含全局 LLM 配置，需要先加载配置（API KEY 可以是任意值）
+    config = Config.get_instance()
+    if not config.load_config():
+        sys.exit("配置加载失败")
+    api = config.config["api"][config.api_type]
+    if not any(api.get("api_key") or []):
+        api["api_key"] = ["sk-check"]
+        api["key_index"] = 0
+    GlobalToolRegistry.get_instance().register_tool("echo_check_tool", EchoTool)
+    LLMPool.get_instance().set_llm_class(FakeLLM)
+    WORKFLOW_CACHE_CONFIGS["enabled"] = True
+    WorkflowCache.get_instance().clear()
+    try:
+        check_repeated_runs()
+    finally:
+        LLMPool.get_instance().set_llm_class(None)
+        WorkflowCache.get_instance().clear()
+    print("工作流缓存检查通过")